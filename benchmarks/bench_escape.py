@@ -0,0 +1,96 @@
+"""
+Measure what HTML escaping adds to rendering time.
+
+Renders the site's content, repeated to a realistic size, with the escaping
+layer in place and with it swapped out, and reports the relative overhead
+for serialization (to_html) and for the whole render (parse + to_html).
+Text values are escaped once when a LeafNode is built, so serialization
+only pays for attribute escaping.
+
+Usage: python3 benchmarks/bench_escape.py [--repeat N] [--max-overhead PCT]
+"""
+import gc
+import os
+import sys
+import time
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+import htmlnode
+from markdown_parser import markdown_to_htmlnode
+
+def load_corpus(copies):
+    texts = []
+    for dirpath, _, filenames in os.walk(os.path.join(ROOT, "content")):
+        for name in sorted(filenames):
+            if name.endswith(".md"):
+                with open(os.path.join(dirpath, name), 'r') as f:
+                    texts.append(f.read())
+    return "\n\n".join(texts * copies)
+
+def unescaped_props_to_html(self):
+    if not self.props:
+        return ""
+    return " ".join(f'{key}="{value}"' for key, value in self.props.items())
+
+def unescaped_leaf_to_html(self):
+    if self.tag == None:
+        return self._value
+    props_str = self.props_to_html()
+    return f"<{self.tag}{' ' + props_str if props_str else ''}>{self._value}</{self.tag}>"
+
+ORIGINALS = (htmlnode.LeafNode.to_html, htmlnode.HTMLNode.props_to_html, htmlnode.escape_text)
+
+def use_escaping(enabled):
+    leaf_to_html, props_to_html, escape_text = ORIGINALS
+    htmlnode.LeafNode.to_html = leaf_to_html if enabled else unescaped_leaf_to_html
+    htmlnode.HTMLNode.props_to_html = props_to_html if enabled else unescaped_props_to_html
+    htmlnode.escape_text = escape_text if enabled else (lambda value: value)
+
+def time_once(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+def compare(func, rounds):
+    """Best time of func with and without escaping, alternating runs so
+    machine noise hits both variants equally."""
+    escaped = raw = float("inf")
+    gc.disable()
+    try:
+        for _ in range(rounds):
+            use_escaping(True)
+            escaped = min(escaped, time_once(func))
+            use_escaping(False)
+            raw = min(raw, time_once(func))
+    finally:
+        use_escaping(True)
+        gc.enable()
+    return raw, escaped
+
+def report(label, raw, escaped):
+    overhead = (escaped - raw) / raw * 100
+    print(f"{label:<14} {raw * 1000:8.2f} ms -> {escaped * 1000:8.2f} ms  ({overhead:+.1f}%)")
+    return overhead
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--copies", type=int, default=200, help="times to repeat the content corpus")
+    parser.add_argument("--repeat", type=int, default=20, help="timing rounds, best is reported")
+    parser.add_argument("--max-overhead", type=float, default=None, help="exit 1 above this percentage")
+    args = parser.parse_args()
+
+    markdown = load_corpus(args.copies)
+    tree = markdown_to_htmlnode(markdown)
+    print(f"output size: {len(tree.to_html()) / 1024:.0f} KiB")
+
+    serialize = report("to_html", *compare(tree.to_html, args.repeat))
+    render = report("parse+to_html", *compare(lambda: markdown_to_htmlnode(markdown).to_html(), max(3, args.repeat // 4)))
+
+    if args.max_overhead is not None and max(serialize, render) > args.max_overhead:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
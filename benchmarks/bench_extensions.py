@@ -0,0 +1,74 @@
+"""
+Measure block and inline dispatch cost as extensions are added.
+
+Registers N block and N inline extensions, none of which match the site's
+content, and times rendering the content against a plain build, with and
+without trigger characters, then compares the registry's combined-regex
+block dispatch with trying each extension's regex in turn.
+
+Usage: python3 benchmarks/bench_extensions.py [--extensions N] [--copies N]
+"""
+import os
+import sys
+import time
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from extensions import ExtensionRegistry, default_registry
+from markdown_parser import markdown_to_htmlnode
+from markdown_to_blocks import markdown_to_blocks
+
+def load_corpus(copies):
+    texts = []
+    for dirpath, _, filenames in os.walk(os.path.join(ROOT, "content")):
+        for name in sorted(filenames):
+            if name.endswith(".md"):
+                with open(os.path.join(dirpath, name), 'r') as f:
+                    texts.append(f.read())
+    return "\n\n".join(texts * copies)
+
+def best(func, rounds):
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def register(registry, count, triggers=True):
+    for i in range(count):
+        registry.register_block(f"block{i}", rf":::ext{i}\b", None, ":" if triggers else None)
+        registry.register_inline(f"inline{i}", rf"\{{ext{i} [^}}]*\}}", None, "{" if triggers else None)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--extensions", type=int, default=100, help="block and inline extensions to register")
+    parser.add_argument("--copies", type=int, default=100, help="times to repeat the content corpus")
+    parser.add_argument("--repeat", type=int, default=5, help="timing rounds, best is reported")
+    args = parser.parse_args()
+
+    markdown = load_corpus(args.copies)
+    blocks = markdown_to_blocks(markdown)
+    render = lambda: markdown_to_htmlnode(markdown).to_html()
+
+    plain = best(render, args.repeat)
+    print(f"render, no extensions              {plain * 1000:8.1f} ms")
+    for triggers in (True, False):
+        register(default_registry, args.extensions, triggers)
+        extended = best(render, args.repeat)
+        label = "with triggers" if triggers else "no triggers"
+        print(f"render, {args.extensions:>4} x2, {label:<13}  {extended * 1000:8.1f} ms  ({(extended - plain) / plain * 100:+.1f}%)")
+        for i in range(args.extensions):
+            default_registry.unregister(f"block{i}")
+            default_registry.unregister(f"inline{i}")
+
+    registry = ExtensionRegistry()
+    register(registry, args.extensions)
+    combined = best(lambda: [registry.match_block(block) for block in blocks], args.repeat)
+    linear = best(lambda: [next((ext for ext in registry.blocks if ext.regex.match(block)), None) for block in blocks], args.repeat)
+    print(f"block dispatch, {len(blocks)} blocks: combined {combined * 1000:.1f} ms, one by one {linear * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    main()
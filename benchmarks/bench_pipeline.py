@@ -0,0 +1,109 @@
+"""
+Measure how much the read/render/write pipeline overlaps I/O with rendering.
+
+Generates a site of small pages and builds it three ways: one page at a
+time with generate_page(), through BuildSession's pipeline, and through
+the pipeline with worker processes. --latency adds a delay to every file read, the
+way a network filesystem would, to show the time the CPU used to spend
+waiting.
+
+Usage: python3 benchmarks/bench_pipeline.py [--pages N] [--latency MS] [--workers N] [--repeat N]
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import contextlib
+from unittest import mock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from output_writer import OutputWriter
+from page import generate_page
+from session import BuildConfig, BuildSession
+
+PAGE = """# Post {i}
+
+Some text with **bold**, _italic_ and a [link](/posts/{i}).
+
+```python
+def post_{i}():
+    return {i}
+```
+
+- one
+- two
+""" + "\n\nA longer paragraph of words to render. " * 20
+
+def make_site(directory, pages):
+    for i in range(pages):
+        path = os.path.join(directory, "content", f"post{i}", "index.md")
+        os.makedirs(os.path.dirname(path))
+        with open(path, "w") as f:
+            f.write(PAGE.format(i=i))
+    os.makedirs(os.path.join(directory, "static"))
+    with open(os.path.join(directory, "template.html"), "w") as f:
+        f.write("<html><title>{{ Title }}</title>{{ Content }}</html>")
+
+@contextlib.contextmanager
+def slow_reads(latency):
+    real_open = open
+
+    def slow_open(path, mode="r", *args, **kwargs):
+        if "r" in mode and str(path).endswith(".md"):
+            time.sleep(latency)
+        return real_open(path, mode, *args, **kwargs)
+
+    with mock.patch("builtins.open", slow_open):
+        yield
+
+def sequential(directory, out):
+    writer = OutputWriter(out)
+    content = os.path.join(directory, "content")
+    for dirpath, _, filenames in os.walk(content):
+        for name in filenames:
+            rel_path = os.path.relpath(os.path.join(dirpath, name), content)
+            to_path = os.path.join(out, os.path.splitext(rel_path)[0] + ".html")
+            writer.make_dirs([os.path.dirname(to_path)])
+            generate_page(os.path.join(dirpath, name), os.path.join(directory, "template.html"), to_path, "/", writer)
+
+def pipelined(directory, out, workers=None):
+    # No build cache, and a new session each round, so every page renders
+    config = BuildConfig.from_root(directory, output_dir=out, cache_dir=None, workers=workers)
+    with BuildSession(config) as session:
+        session.build()
+
+def best(func, rounds):
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--pages", type=int, default=500, help="pages in the generated site")
+    parser.add_argument("--latency", type=float, default=2.0, help="milliseconds added to every source read")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes for the last run")
+    parser.add_argument("--repeat", type=int, default=3, help="timing rounds, best is reported")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory, open(os.devnull, "w") as devnull, \
+            contextlib.redirect_stdout(devnull), slow_reads(args.latency / 1000):
+        make_site(directory, args.pages)
+        runs = [
+            ("sequential", lambda: sequential(directory, os.path.join(directory, "a"))),
+            ("pipeline", lambda: pipelined(directory, os.path.join(directory, "b"))),
+            (f"pipeline, {args.workers} workers",
+             lambda: pipelined(directory, os.path.join(directory, "c"), args.workers)),
+        ]
+        results = [(name, best(run, args.repeat)) for name, run in runs]
+    baseline = results[0][1]
+    for name, elapsed in results:
+        print(f"{name:<24} {elapsed * 1000:8.0f} ms  {args.pages / elapsed:7.0f} pages/s  x{baseline / elapsed:.2f}")
+
+if __name__ == "__main__":
+    main()
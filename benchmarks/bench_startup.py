@@ -0,0 +1,76 @@
+"""
+Measure CLI startup: wall time of a no-op build and where import time goes.
+
+Copies the site (src/, content/, static/, template.html) to a temporary
+directory, builds it once, then times repeated no-op builds against the
+bare interpreter start, and prints the slowest imports reported by
+python -X importtime for a no-op and for a forced build.
+
+Usage: python3 benchmarks/bench_startup.py [--runs N] [--top N]
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def copy_site(dest):
+    for name in ("src", "content", "static"):
+        shutil.copytree(os.path.join(ROOT, name), os.path.join(dest, name),
+                        ignore=shutil.ignore_patterns("__pycache__"))
+    shutil.copy(os.path.join(ROOT, "template.html"), dest)
+
+def run(args, cwd):
+    return subprocess.run([sys.executable, *args], cwd=cwd, capture_output=True, text=True, check=True)
+
+def best_wall_time(args, cwd, runs):
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        run(args, cwd)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def slowest_imports(args, cwd, top):
+    """Top-level entries of -X importtime output sorted by cumulative time."""
+    stderr = run(["-X", "importtime", *args], cwd).stderr
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Nested imports are indented; keep only what the script imports directly
+        if name.startswith("  "):
+            continue
+        entries.append((int(cumulative), name.strip()))
+    entries.sort(reverse=True)
+    return entries[:top]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--runs", type=int, default=10, help="timing runs, best is reported")
+    parser.add_argument("--top", type=int, default=8, help="number of imports to list")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        copy_site(tmp)
+        run(["src/main.py"], tmp)
+
+        bare = best_wall_time(["-c", "pass"], tmp, args.runs)
+        noop = best_wall_time(["src/main.py"], tmp, args.runs)
+        forced = best_wall_time(["src/main.py", "--force"], tmp, max(1, args.runs // 2))
+        print(f"bare interpreter: {bare * 1000:7.1f} ms")
+        print(f"no-op build:      {noop * 1000:7.1f} ms  (+{(noop - bare) * 1000:.1f} ms over bare)")
+        print(f"forced build:     {forced * 1000:7.1f} ms")
+
+        for label, cli in (("no-op build", ["src/main.py"]), ("forced build", ["src/main.py", "--force"])):
+            print(f"\nslowest top-level imports, {label}:")
+            for cumulative, name in slowest_imports(cli, tmp, args.top):
+                print(f"  {cumulative / 1000:7.1f} ms  {name}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Compare peak memory of in-memory and streamed page rendering.
+
+Generates a large markdown file of mixed blocks, renders it both ways with
+generate_page() and reports the tracemalloc peak of each. The streamed peak
+should stay near the size of the largest block however big the file gets.
+
+Usage: python3 benchmarks/bench_stream_memory.py [--mib N]
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from output_writer import OutputWriter
+from page import generate_page
+
+SECTION = """## Section {n}
+
+Paragraph {n} with **bold**, _italic_, `code` and a [link](/page/{n}).
+
+```python
+def function_{n}(x):
+    return x * {n}
+```
+
+- item one
+- item two
+
+"""
+
+def write_source(path, size):
+    written = 0
+    n = 0
+    with open(path, "w") as f:
+        f.write("# Generated reference\n\n")
+        while written < size:
+            chunk = SECTION.format(n=n)
+            f.write(chunk)
+            written += len(chunk)
+            n += 1
+
+def measure(source, template, to_path, stream):
+    writer = OutputWriter(os.path.dirname(to_path))
+    tracemalloc.start()
+    start = time.perf_counter()
+    generate_page(source, template, to_path, "/", writer, stream=stream)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--mib", type=float, default=4, help="size of the generated markdown file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "big.md")
+        write_source(source, int(args.mib * 1024 * 1024))
+        template = os.path.join(ROOT, "template.html")
+        print(f"source size: {os.path.getsize(source) / 1024 / 1024:.1f} MiB")
+        for stream in (False, True):
+            peak, elapsed = measure(source, template, os.path.join(tmp, "out", f"{stream}.html"), stream)
+            label = "streamed" if stream else "in memory"
+            print(f"{label:<10} peak {peak / 1024 / 1024:8.1f} MiB  {elapsed:6.2f} s")
+
+if __name__ == "__main__":
+    main()
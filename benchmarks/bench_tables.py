@@ -0,0 +1,56 @@
+"""
+Measure how GFM table rendering scales with the number of rows.
+
+Builds tables like the generated reference pages (a few columns, inline
+code and emphasis in the cells) at growing row counts, renders each, and
+reports the time per row. The per-row cost should stay flat as tables
+grow; a growing ratio means some step re-scans the table.
+
+Usage: python3 benchmarks/bench_tables.py [--rows N] [--columns N] [--repeat N]
+"""
+import os
+import sys
+import time
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from markdown_parser import markdown_to_htmlnode
+from markdown_to_blocks import BlockType, block_to_block_type
+
+def make_table(rows, columns):
+    header = "| " + " | ".join(f"Column {i}" for i in range(columns)) + " |"
+    delimiter = "|" + "|".join([":---", ":---:", "---:"][i % 3] for i in range(columns)) + "|"
+    cells = ["`name-{row}`", "**{row}**", "_text {row}_", "[ref](/ref/{row})", "a \\| b"]
+    lines = [header, delimiter]
+    for row in range(rows):
+        lines.append("| " + " | ".join(cells[i % len(cells)].format(row=row) for i in range(columns)) + " |")
+    return "# Reference\n\n" + "\n".join(lines) + "\n"
+
+def best(func, rounds):
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--rows", type=int, default=10000, help="rows of the largest table")
+    parser.add_argument("--columns", type=int, default=5, help="columns per table")
+    parser.add_argument("--repeat", type=int, default=3, help="timing rounds, best is reported")
+    args = parser.parse_args()
+
+    for rows in (args.rows // 100, args.rows // 10, args.rows):
+        markdown = make_table(rows, args.columns)
+        block = markdown.split("\n\n")[1]
+        classify = best(lambda: block_to_block_type(block), args.repeat)
+        assert block_to_block_type(block) == BlockType.TABLE
+        render = best(lambda: markdown_to_htmlnode(markdown).to_html(), args.repeat)
+        print(f"{rows:>7} rows  {len(markdown) / 1024:8.0f} KiB  classify {classify * 1000:7.2f} ms"
+              f"  render {render * 1000:9.1f} ms  ({render / rows * 1e6:.1f} us/row)")
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,5 @@ set -e
 cd src
 python3 main.py
 
-# Start the web server
-cd ../public
-python3 -m http.server 8888
\ No newline at end of file
+# Serve the site, rebuilding and live-reloading pages as sources change
+python3 preview.py --port 8888
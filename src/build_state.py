@@ -0,0 +1,112 @@
+# Build state for skipping no-op builds before the generator is imported.
+# Only os, stat and the builtin marshal module are used here, all of which
+# are loaded at interpreter startup anyway; json alone would pull in re.
+import os
+import stat
+import marshal
+
+STATE_VERSION = 2
+STATE_NAME = "build-state.bin"
+
+def snapshot(paths):
+    """
+    Record the mtime and size of every file under a set of paths.
+
+    Args:
+        paths (list[str]): Files or directories to record
+
+    Returns:
+        dict: File path -> (st_mtime_ns, st_size); missing paths map to None
+    """
+    stamps = {}
+    pending = list(paths)
+    while pending:
+        path = pending.pop()
+        try:
+            st = os.stat(path)
+        except OSError:
+            stamps[path] = None
+            continue
+        if not stat.S_ISDIR(st.st_mode):
+            stamps[path] = (st.st_mtime_ns, st.st_size)
+            continue
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.name == "__pycache__":
+                    continue
+                if entry.is_dir():
+                    pending.append(entry.path)
+                else:
+                    st = entry.stat()
+                    stamps[entry.path] = (st.st_mtime_ns, st.st_size)
+    return stamps
+
+def save(state_path, key, inputs, outputs, warnings=()):
+    """
+    Record a finished build.
+
+    Args:
+        state_path (str): Where to store the state
+        key (tuple): Everything besides files that the build depends on,
+            such as the command line and working directory
+        inputs (list[str]): Files and directories the build read
+        outputs (iterable[str]): Files the build produced
+        warnings (list[str]): The build's warnings, repeated by the no-op
+            builds after it
+    """
+    state = {
+        "version": STATE_VERSION,
+        "key": key,
+        "roots": list(inputs),
+        "inputs": snapshot(inputs),
+        "outputs": snapshot(sorted(outputs)),
+        "warnings": list(warnings),
+    }
+    os.makedirs(os.path.dirname(state_path), exist_ok=True)
+    tmp_path = state_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        marshal.dump(state, f)
+    os.replace(tmp_path, state_path)
+
+def _load(state_path):
+    try:
+        with open(state_path, "rb") as f:
+            state = marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if not isinstance(state, dict) or state.get("version") != STATE_VERSION:
+        return None
+    return state
+
+def recorded_warnings(state_path):
+    """
+    Return the warnings of the last recorded build, see save().
+
+    Args:
+        state_path (str): Where the state is stored
+
+    Returns:
+        list[str]: The warnings, empty if there is no state
+    """
+    state = _load(state_path)
+    return state["warnings"] if state is not None else []
+
+def is_up_to_date(state_path, key):
+    """
+    Check whether the last recorded build is still current: same key, no
+    input added, removed or modified, and every output untouched.
+
+    Args:
+        state_path (str): Where the state is stored
+        key (tuple): The key the new build would be saved with
+
+    Returns:
+        bool: True if building again would change nothing
+    """
+    state = _load(state_path)
+    if state is None or state["key"] != key:
+        return False
+    return (
+        snapshot(state["outputs"]) == state["outputs"]
+        and snapshot(state["roots"]) == state["inputs"]
+    )
@@ -0,0 +1,157 @@
+import os
+import time
+import hashlib
+import tempfile
+
+_generator_version = None
+
+def cache_key(*parts):
+    """
+    Hash a sequence of str or bytes parts into a cache key.
+
+    Args:
+        *parts (str | bytes): Values the cached result depends on
+
+    Returns:
+        str: Hex sha256 digest of the parts
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode("utf-8")
+        digest.update(len(part).to_bytes(8, "big"))
+        digest.update(part)
+    return digest.hexdigest()
+
+def generator_version():
+    """
+    Hash the generator's own source files, so cached results are never
+    reused by a different version of the code that produced them.
+
+    Returns:
+        str: Hex sha256 digest, the same on every machine for the same code
+    """
+    global _generator_version
+    if _generator_version is None:
+        src_dir = os.path.dirname(os.path.abspath(__file__))
+        parts = []
+        for name in sorted(os.listdir(src_dir)):
+            if name.endswith(".py") and not name.startswith("test_"):
+                with open(os.path.join(src_dir, name), "rb") as f:
+                    parts += [name, f.read()]
+        _generator_version = cache_key(*parts)
+    return _generator_version
+
+class DiskCache:
+    """
+    A directory of cached build results addressed by hash keys.
+
+    Entries live at <directory>/<namespace>/<key[:2]>/<key> and are written
+    with temp-file-plus-rename, so concurrent builds never read a partial
+    entry. Keys depend only on content, never on paths or mtimes, so the
+    directory can be saved and restored between machines, e.g. as a CI
+    cache, and trimmed with evict().
+    """
+
+    def __init__(self, directory, namespace):
+        self.directory = os.path.join(directory, namespace)
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key)
+
+    def get(self, key):
+        """
+        Look up a cached value.
+
+        Args:
+            key (str): Key from cache_key()
+
+        Returns:
+            bytes | None: The cached bytes, or None on a miss
+        """
+        try:
+            with open(self._path(key), "rb") as f:
+                data = f.read()
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        try:
+            # Reads count as use, so evict() drops the least recently used
+            os.utime(self._path(key))
+        except OSError:
+            pass
+        return data
+
+    def __contains__(self, key):
+        return os.path.exists(self._path(key))
+
+    def put(self, key, data):
+        """
+        Store a value.
+
+        Args:
+            key (str): Key from cache_key()
+            data (bytes): Value to store
+        """
+        path = self._path(key)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+def evict(directory, max_bytes=None, max_age=None, now=None):
+    """
+    Trim a cache directory, deleting the least recently used entries of
+    every namespace first.
+
+    Args:
+        directory (str): The directory passed to DiskCache
+        max_bytes (int): Delete entries until at most this many bytes
+            remain (default: no limit)
+        max_age (float): Delete entries unused for more than this many
+            seconds (default: no limit)
+        now (float): The current time (default: time.time())
+
+    Returns:
+        tuple[int, int]: Entries deleted and bytes freed
+    """
+    now = time.time() if now is None else now
+    entries = []
+    with os.scandir(directory) as namespaces:
+        for namespace in namespaces:
+            # Files at the top level, like the build state, are not entries
+            if not namespace.is_dir():
+                continue
+            for dirpath, _, filenames in os.walk(namespace.path):
+                for name in filenames:
+                    path = os.path.join(dirpath, name)
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    entries.append((st.st_mtime, st.st_size, path))
+    entries.sort()
+    total = sum(size for _, size, _ in entries)
+    deleted = freed = 0
+    for mtime, size, path in entries:
+        too_old = max_age is not None and now - mtime > max_age
+        too_big = max_bytes is not None and total - freed > max_bytes
+        if not (too_old or too_big):
+            break
+        try:
+            os.unlink(path)
+        except OSError:
+            continue
+        deleted += 1
+        freed += size
+    return deleted, freed
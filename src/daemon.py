@@ -0,0 +1,209 @@
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import threading
+import socketserver
+
+from session import BuildConfig, BuildSession
+
+SOCKET_NAME = "daemon.sock"
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Serve newline-delimited JSON requests until the client hangs up."""
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                response = self.server.build_daemon.handle(request)
+            except Exception as e:
+                response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+class BuildDaemon:
+    """
+    A build server that keeps a BuildSession warm behind a Unix socket.
+
+    Clients send one JSON object per line and get one JSON object back per
+    line. Commands:
+        {"cmd": "render", "markdown": "..."}  -> {"ok": true, "html": "..."}
+        {"cmd": "rebuild", "paths": ["..."]}  -> rebuild what depends on paths
+        {"cmd": "build"}                      -> full build
+        {"cmd": "stats"}                      -> session and cache counters
+        {"cmd": "shutdown"}                   -> stop serving
+
+    Commands run one at a time; the session is not thread safe.
+    """
+
+    def __init__(self, session, socket_path):
+        self.session = session
+        self.socket_path = socket_path
+        self.started = time.time()
+        self.requests = {}
+        self._lock = threading.Lock()
+        self._server = None
+
+    def handle(self, request):
+        """
+        Run one request.
+
+        Args:
+            request (dict): The decoded request
+
+        Returns:
+            dict: The response
+
+        Raises:
+            ValueError: If the command is unknown
+        """
+        command = request.get("cmd")
+        handler = getattr(self, f"_cmd_{command}", None)
+        if handler is None:
+            raise ValueError(f"Unknown command: {command}")
+        with self._lock:
+            self.requests[command] = self.requests.get(command, 0) + 1
+            start = time.perf_counter()
+            response = handler(request)
+        response["ok"] = True
+        response["ms"] = round((time.perf_counter() - start) * 1000, 3)
+        return response
+
+    def _cmd_render(self, request):
+        return {"html": self.session.render_markdown(request["markdown"])}
+
+    def _cmd_rebuild(self, request):
+        return self._result(self.session.rebuild(request["paths"]))
+
+    def _cmd_build(self, request):
+        return self._result(self.session.build())
+
+    def _result(self, result):
+        return {
+            "summary": result.summary(),
+            "rendered": result.pages_rendered,
+            "changed": result.writer.changed,
+        }
+
+    def _cmd_stats(self, request):
+        session = self.session
+        caches = {}
+        for name, owner in (("highlight", session.highlighter), ("minify", session.minifier)):
+            cache = getattr(owner, "cache", None)
+            if cache is not None:
+                caches[name] = {"hits": cache.hits, "misses": cache.misses}
+        return {
+            "pages": len(session.pages),
+            "uptime": round(time.time() - self.started, 3),
+            "requests": dict(self.requests),
+            "caches": caches,
+        }
+
+    def _cmd_shutdown(self, request):
+        # shutdown() waits for serve_forever() to return, so not from here
+        threading.Thread(target=self._server.shutdown).start()
+        return {}
+
+    def serve_forever(self):
+        """Listen on the socket until a shutdown command arrives."""
+        if os.path.exists(self.socket_path):
+            if _is_listening(self.socket_path):
+                raise RuntimeError(f"A daemon is already listening on {self.socket_path}")
+            os.unlink(self.socket_path)
+        os.makedirs(os.path.dirname(os.path.abspath(self.socket_path)), exist_ok=True)
+
+        self._server = _Server(self.socket_path, _RequestHandler)
+        self._server.build_daemon = self
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            os.unlink(self.socket_path)
+
+def _is_listening(socket_path):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(socket_path)
+        except OSError:
+            return False
+    return True
+
+def request(socket_path, payload, timeout=None):
+    """
+    Send one request to a running daemon.
+
+    Args:
+        socket_path (str): The daemon's socket
+        payload (dict): The request, e.g. {"cmd": "stats"}
+        timeout (float): Seconds to wait for the response
+
+    Returns:
+        dict: The response
+
+    Raises:
+        RuntimeError: If the daemon reports an error
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path)
+        sock.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+        with sock.makefile("rb") as f:
+            response = json.loads(f.readline())
+    if not response.get("ok"):
+        raise RuntimeError(response.get("error", "daemon error"))
+    return response
+
+def main(argv=None):
+    """Command line entry point: run the daemon or talk to it."""
+    root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    parser = argparse.ArgumentParser(description="Keep a warm build session behind a Unix socket.")
+    parser.add_argument("--socket", default=os.path.join(root_dir, ".cache", SOCKET_NAME),
+                        help="socket path (default: .cache/daemon.sock)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve = commands.add_parser("serve", help="run the daemon")
+    serve.add_argument("base_path", nargs="?", default="/", help="base path for URLs (default: /)")
+    serve.add_argument("--minify", action="store_true", help="minify HTML pages and CSS assets")
+    render = commands.add_parser("render", help="render a markdown file, or - for stdin")
+    render.add_argument("file")
+    rebuild = commands.add_parser("rebuild", help="rebuild what depends on the given source files")
+    rebuild.add_argument("paths", nargs="+")
+    commands.add_parser("build", help="run a full build")
+    commands.add_parser("stats", help="print session and cache counters")
+    commands.add_parser("stop", help="shut the daemon down")
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        config = BuildConfig.from_root(root_dir, base_path=args.base_path, minify=args.minify)
+        with BuildSession(config) as session:
+            session.build()
+            print(f"Build daemon listening on {args.socket}")
+            BuildDaemon(session, args.socket).serve_forever()
+        return
+
+    if args.command == "render":
+        if args.file == "-":
+            markdown = sys.stdin.read()
+        else:
+            with open(args.file, 'r') as f:
+                markdown = f.read()
+        sys.stdout.write(request(args.socket, {"cmd": "render", "markdown": markdown})["html"] + "\n")
+    elif args.command == "rebuild":
+        paths = [os.path.abspath(path) for path in args.paths]
+        print(request(args.socket, {"cmd": "rebuild", "paths": paths})["summary"])
+    elif args.command == "build":
+        print(request(args.socket, {"cmd": "build"})["summary"])
+    elif args.command == "stats":
+        print(json.dumps(request(args.socket, {"cmd": "stats"}), indent=2))
+    elif args.command == "stop":
+        request(args.socket, {"cmd": "shutdown"})
+
+if __name__ == "__main__":
+    main()
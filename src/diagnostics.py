@@ -0,0 +1,230 @@
+import os
+from pathlib import Path
+
+from escape import escape_text
+
+ERROR = "error"
+WARNING = "warning"
+
+class Diagnostic:
+    """
+    One problem found in a source file.
+
+    Args:
+        severity (str): ERROR or WARNING
+        message (str): What is wrong
+        path (str): The source file, if known
+        line (int): 1-based line, if known
+        column (int): 1-based column, if known. Columns count from the
+            first non-blank character of the line, since block lines are
+            compared without their indentation
+    """
+
+    def __init__(self, severity, message, path=None, line=None, column=None):
+        self.severity = severity
+        self.message = message
+        self.path = path
+        self.line = line
+        self.column = column
+
+    def sort_key(self):
+        return (self.path or "", self.line or 0, self.column or 0, self.message)
+
+    def to_dict(self):
+        return {
+            "severity": self.severity, "message": self.message,
+            "path": self.path, "line": self.line, "column": self.column,
+        }
+
+    def __eq__(self, other):
+        return isinstance(other, Diagnostic) and self.to_dict() == other.to_dict()
+
+    def __str__(self):
+        location = self.path or "<input>"
+        if self.line is not None:
+            location += f":{self.line}"
+            if self.column is not None:
+                location += f":{self.column}"
+        return f"{location}: {self.severity}: {self.message}"
+
+    def __repr__(self):
+        return f"Diagnostic({self})"
+
+class Diagnostics:
+    """
+    Collects the problems found while parsing one source file, so parsing
+    can go on past them and report them all at once.
+
+    The parser calls at_block() before each block; problems inside the
+    block's text are then reported relative to where the block starts.
+
+    Args:
+        path (str): The source file the problems are reported against
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.items = []
+        self._line = None
+        self._block = None
+
+    def at_block(self, line, block):
+        """
+        Note which block is being parsed.
+
+        Args:
+            line (int): 1-based line the block starts on
+            block (str): The block, as iter_blocks() yields it
+        """
+        self._line = line
+        self._block = block
+
+    @property
+    def line(self):
+        """The line the current block starts on, see at_block()."""
+        return self._line
+
+    def error(self, message, line=None, column=None):
+        """Record an error, at a line of the file if given."""
+        self.items.append(Diagnostic(ERROR, message, self.path, line, column))
+
+    def warning(self, message, line=None, column=None):
+        """Record a warning, at a line of the file if given."""
+        self.items.append(Diagnostic(WARNING, message, self.path, line, column))
+
+    def block_error(self, message):
+        """Record an error at the start of the current block."""
+        self.error(message, self._line)
+
+    def error_in_text(self, message, text, offset):
+        """
+        Record an error at a position in inline text taken from the
+        current block.
+
+        Args:
+            message (str): What is wrong
+            text (str): The text being parsed, a piece of the block with
+                lines joined by spaces
+            offset (int): Position of the problem in text
+        """
+        line, column = self._locate(text, offset)
+        self.error(message, line, column)
+
+    def _locate(self, text, offset):
+        if self._block is None:
+            return None, None
+        # Joining lines with spaces keeps every offset of the block
+        flat = self._block.replace("\n", " ")
+        position = flat.find(text)
+        if position != -1:
+            position += offset
+        else:
+            # Text rebuilt from several indented lines: find the problem's
+            # surroundings instead
+            position = flat.find(text[offset:offset + 20])
+            if position == -1:
+                return self._line, None
+        line_start = self._block.rfind("\n", 0, position) + 1
+        return self._line + self._block.count("\n", 0, position), position - line_start + 1
+
+    @property
+    def errors(self):
+        return [item for item in self.items if item.severity == ERROR]
+
+class _PlainHighlighter:
+    """Stands in for Highlighter when only validating: code is not colored."""
+
+    def highlight(self, code, language=None):
+        return escape_text(code)
+
+    def prefetch(self, blocks):
+        pass
+
+def check_file(path):
+    """
+    Parse one markdown file without rendering a page and return every
+    problem found.
+
+    Args:
+        path (str): The markdown file
+
+    Returns:
+        list[Diagnostic]: The problems, in source order
+    """
+    # Imported here so worker processes only load the parser when used
+    from markdown_parser import markdown_to_htmlnode
+    from page import extract_title
+    from front_matter import split_front_matter
+
+    diagnostics = Diagnostics(path)
+    try:
+        with open(path, 'r') as f:
+            markdown = f.read()
+    except (OSError, UnicodeDecodeError) as e:
+        diagnostics.error(f"Cannot read file: {e}")
+        return diagnostics.items
+    _, markdown = split_front_matter(markdown, diagnostics)
+    try:
+        extract_title(markdown)
+    except ValueError as e:
+        diagnostics.error(str(e))
+    markdown_to_htmlnode(markdown, _PlainHighlighter(), diagnostics=diagnostics)
+    return diagnostics.items
+
+def check_files(paths, workers=None):
+    """
+    Check markdown files in parallel, see check_file().
+
+    Args:
+        paths (iterable[str]): The markdown files
+        workers (int): Worker processes (default: one per CPU); 1 checks
+            in this process
+
+    Returns:
+        list[Diagnostic]: Every problem, sorted by file, line and column
+    """
+    paths = sorted(paths)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(paths) < 2:
+        results = map(check_file, paths)
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        # Large chunks keep the per-task overhead down on sites with many
+        # small pages
+        chunksize = max(1, len(paths) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(check_file, paths, chunksize=chunksize))
+    return sorted((item for items in results for item in items), key=Diagnostic.sort_key)
+
+def check_site(content_dir, workers=None, config=None):
+    """
+    Check the markdown files under content_dir, see check_files().
+
+    Args:
+        content_dir (str): Directory of markdown pages
+        workers (int): See check_files()
+        config (BuildConfig): If given, only check the pages it builds:
+            those matching its include patterns, and drafts and scheduled
+            pages only if it builds them
+
+    Returns:
+        list[Diagnostic]: Every problem, sorted by file, line and column
+    """
+    from front_matter import read_front_matter
+
+    paths = []
+    for path in Path(content_dir).rglob("*.md"):
+        if config is not None:
+            if not config.includes(path.relative_to(content_dir).as_posix()):
+                continue
+            # Broken front matter is reported by check_file()
+            if not config.publishes(read_front_matter(path)):
+                continue
+        paths.append(str(path))
+    return check_files(paths, workers)
+
+def summarize(diagnostics):
+    """Return e.g. "2 errors, 1 warning" for a list of diagnostics."""
+    errors = sum(1 for item in diagnostics if item.severity == ERROR)
+    warnings = len(diagnostics) - errors
+    return f"{errors} error{'s' if errors != 1 else ''}, {warnings} warning{'s' if warnings != 1 else ''}"
@@ -0,0 +1,46 @@
+class Markup(str):
+    """A string that is already safe HTML and must not be escaped again."""
+    __slots__ = ()
+
+def escape_text(value):
+    """
+    Escape a string for use as HTML text content.
+
+    Args:
+        value (str): The text to escape
+
+    Returns:
+        str: The text with &, < and > escaped, or the input itself if it is
+            Markup or holds none of those characters
+    """
+    # Fast path: a few C-level substring scans per string, no per-character
+    # Python work, and the input is returned as is
+    if "&" in value or "<" in value or ">" in value:
+        if isinstance(value, Markup):
+            return value
+        return value.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+    return value
+
+def escape_attr(value):
+    """
+    Escape a value for use inside a double-quoted HTML attribute.
+
+    Args:
+        value (str): The attribute value to escape
+
+    Returns:
+        str: The value with &, <, > and " escaped, or the input itself if it
+            is Markup or holds none of those characters
+    """
+    if not isinstance(value, str):
+        value = str(value)
+    if "&" in value or "<" in value or ">" in value or '"' in value:
+        if isinstance(value, Markup):
+            return value
+        return (
+            value.replace("&", "&amp;")
+            .replace("<", "&lt;")
+            .replace(">", "&gt;")
+            .replace('"', "&quot;")
+        )
+    return value
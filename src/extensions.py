@@ -0,0 +1,237 @@
+import re
+import hashlib
+
+class BlockExtension:
+    """
+    A block syntax added to the parser.
+
+    Args:
+        name (str): Unique name of the extension
+        pattern (str): Regex matched at the start of a block
+        render (callable): render(block, match, parse_inline) -> HTMLNode,
+            where parse_inline(text) renders inline markdown to a list of
+            HTMLNodes
+        trigger (str): Every character a match can start with, if known
+    """
+
+    def __init__(self, name, pattern, render, trigger=None):
+        self.name = name
+        self.pattern = pattern
+        self.regex = re.compile(pattern)
+        self.render = render
+        self.trigger = trigger
+
+    def __repr__(self):
+        return f"BlockExtension({self.name}, {self.pattern})"
+
+class InlineExtension:
+    """
+    An inline syntax added to the parser. Inline extensions run on the text
+    left between the built-in emphasis and code syntax, so they never split
+    a pair of delimiters or rewrite inline code, and before images and
+    links. Text inside emphasis is not matched.
+
+    Args:
+        name (str): Unique name of the extension
+        pattern (str): Regex for the syntax within a line of text
+        render (callable): render(match) -> TextNode or HTMLNode
+        trigger (str): Every character a match can start with, if known
+    """
+
+    def __init__(self, name, pattern, render, trigger=None):
+        self.name = name
+        self.pattern = pattern
+        self.regex = re.compile(pattern)
+        self.render = render
+        self.trigger = trigger
+
+    def __repr__(self):
+        return f"InlineExtension({self.name}, {self.pattern})"
+
+class _Dispatch:
+    """
+    Extensions compiled for lookup: one combined regex per trigger
+    character, holding the extensions that can start with it, and one for
+    extensions without a trigger.
+    """
+
+    def __init__(self, extensions):
+        self.extensions = extensions
+        untriggered = [i for i, ext in enumerate(extensions) if not ext.trigger]
+        chars = sorted({char for ext in extensions for char in ext.trigger or ""})
+        # Untriggered extensions can match anywhere, so every table entry
+        # includes them, in registration order
+        self.by_char = {
+            char: _combine(extensions, [i for i, ext in enumerate(extensions)
+                                        if not ext.trigger or char in ext.trigger])
+            for char in chars
+        }
+        self.untriggered = _combine(extensions, untriggered) if untriggered else None
+        self.all = _combine(extensions, range(len(extensions)))
+        self.scan = re.compile("[" + re.escape("".join(chars)) + "]") if chars and not untriggered else None
+
+    def extension(self, match):
+        return self.extensions[int(match.lastgroup[4:])]
+
+def _combine(extensions, indexes):
+    # One named alternative per extension; lastgroup says which matched
+    return re.compile("|".join(f"(?P<_ext{i}>{extensions[i].pattern})" for i in indexes))
+
+class ExtensionRegistry:
+    """
+    The block and inline syntaxes the parser knows beyond the built-in ones.
+
+    Extensions are compiled into a dispatch table the first time they are
+    used after a change. Blocks look up the extensions for their first
+    character and try them all in one combined regex. Inline text is scanned
+    for trigger characters and only tried at those positions. Extensions
+    registered without a trigger have to be tried everywhere, so give one
+    whenever the syntax starts with a known character.
+
+    Earlier registrations win when several patterns match at the same
+    place. Since the patterns are combined, group names must be unique
+    across extensions and backreferences must use names.
+    """
+
+    def __init__(self):
+        self.blocks = []
+        self.inlines = []
+        # Bumped on every change, so in-memory caches can tell states of
+        # this registry apart; see fingerprint() for caches kept on disk
+        self.version = 0
+        self._fingerprint = None
+        self._block_dispatch = None
+        self._inline_dispatch = None
+
+    def register_block(self, name, pattern, render, trigger=None):
+        """
+        Add a block syntax, see BlockExtension.
+
+        Raises:
+            ValueError: If an extension with that name already exists
+        """
+        self._check_name(name)
+        self.blocks.append(BlockExtension(name, pattern, render, trigger))
+        self._changed()
+
+    def register_inline(self, name, pattern, render, trigger=None):
+        """
+        Add an inline syntax, see InlineExtension.
+
+        Raises:
+            ValueError: If an extension with that name already exists
+        """
+        self._check_name(name)
+        self.inlines.append(InlineExtension(name, pattern, render, trigger))
+        self._changed()
+
+    def unregister(self, name):
+        """Remove an extension by name, if registered."""
+        self.blocks = [ext for ext in self.blocks if ext.name != name]
+        self.inlines = [ext for ext in self.inlines if ext.name != name]
+        self._changed()
+
+    def _check_name(self, name):
+        if any(ext.name == name for ext in self.blocks + self.inlines):
+            raise ValueError(f"Extension already registered: {name}")
+
+    def _changed(self):
+        self.version += 1
+        self._fingerprint = None
+        self._block_dispatch = None
+        self._inline_dispatch = None
+
+    def fingerprint(self):
+        """
+        Hash the registered extensions: their kind, name, pattern, trigger
+        and the qualified name of their render function, in order. Unlike
+        version, it is the same in every process with the same extensions,
+        so caches shared across builds and machines can key on it.
+
+        Returns:
+            str: A hex digest
+        """
+        if self._fingerprint is None:
+            digest = hashlib.sha256()
+            for kind, extensions in (("block", self.blocks), ("inline", self.inlines)):
+                for ext in extensions:
+                    digest.update(repr((kind, ext.name, ext.pattern, ext.trigger, _qualified_name(ext.render))).encode())
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+    def match_block(self, block):
+        """
+        Find the extension that handles a block.
+
+        Args:
+            block (str): The block
+
+        Returns:
+            tuple[BlockExtension, re.Match] | None: The extension and its
+                own match of the block, or None
+        """
+        if not self.blocks:
+            return None
+        if self._block_dispatch is None:
+            self._block_dispatch = _Dispatch(self.blocks)
+        dispatch = self._block_dispatch
+        regex = dispatch.by_char.get(block[:1], dispatch.untriggered)
+        match = regex.match(block) if regex is not None else None
+        if match is None:
+            return None
+        extension = dispatch.extension(match)
+        return extension, extension.regex.match(block)
+
+    def iter_inline(self, text):
+        """
+        Find every inline extension match in a line of text.
+
+        Args:
+            text (str): The text
+
+        Yields:
+            tuple[InlineExtension, re.Match]: Each extension and its own
+                match, left to right and non-overlapping
+        """
+        if not self.inlines:
+            return
+        if self._inline_dispatch is None:
+            self._inline_dispatch = _Dispatch(self.inlines)
+        dispatch = self._inline_dispatch
+        if dispatch.scan is None:
+            matches = (match for match in dispatch.all.finditer(text) if match.end() > match.start())
+        else:
+            matches = _scan(dispatch, text)
+        for match in matches:
+            extension = dispatch.extension(match)
+            yield extension, extension.regex.match(text, match.start())
+
+def _qualified_name(function):
+    # Stable across processes, unlike the function's repr
+    name = getattr(function, "__qualname__", None) or type(function).__qualname__
+    return f"{getattr(function, '__module__', None)}.{name}"
+
+def _scan(dispatch, text):
+    # Jump from trigger character to trigger character, trying only the
+    # extensions that can start there
+    position = 0
+    while True:
+        found = dispatch.scan.search(text, position)
+        if found is None:
+            return
+        match = dispatch.by_char[found.group()].match(text, found.start())
+        if match is not None and match.end() > match.start():
+            yield match
+            position = match.end()
+        else:
+            position = found.start() + 1
+
+default_registry = ExtensionRegistry()
+
+def register_block(name, pattern, render, trigger=None):
+    """Add a block syntax to the default registry, see BlockExtension."""
+    default_registry.register_block(name, pattern, render, trigger)
+
+def register_inline(name, pattern, render, trigger=None):
+    """Add an inline syntax to the default registry, see InlineExtension."""
+    default_registry.register_inline(name, pattern, render, trigger)
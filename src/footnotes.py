@@ -0,0 +1,91 @@
+from htmlnode import LeafNode, ParentNode
+from toc import slugify
+
+class Footnotes:
+    """
+    The footnotes of one page, collected while the page is rendered.
+
+    Footnotes are numbered in the order they are first referenced, which
+    is known as soon as each reference is rendered, so a page can be
+    rendered in one pass even when definitions come after their
+    references. Definitions that are never referenced are numbered after
+    the rest, without a link back.
+    """
+
+    def __init__(self):
+        self.numbers = {}
+        self.definitions = {}
+        self._references = {}
+        # Line of each label's first reference, for reporting undefined ones
+        self._lines = {}
+
+    def _number(self, label):
+        if label not in self.numbers:
+            self.numbers[label] = len(self.numbers) + 1
+        return self.numbers[label]
+
+    def reference(self, label, line=None):
+        """
+        Record a reference to a footnote and return its superscript link.
+
+        Args:
+            label (str): The footnote label, e.g. "1" for [^1]
+            line (int): The line of the reference, if known
+
+        Returns:
+            ParentNode: <sup> linking to the definition, with an id the
+                definition links back to
+        """
+        number = self._number(label)
+        count = self._references.get(label, 0) + 1
+        self._references[label] = count
+        self._lines.setdefault(label, line)
+        slug = slugify(label)
+        ref_id = f"fnref-{slug}" if count == 1 else f"fnref-{slug}-{count}"
+        link = LeafNode("a", str(number), {"href": f"#fn-{slug}", "id": ref_id})
+        return ParentNode("sup", [link], {"class": "footnote-ref"})
+
+    def define(self, label, children):
+        """
+        Record a footnote definition. A later definition of the same label
+        replaces the earlier one.
+
+        Args:
+            label (str): The footnote label
+            children (list[HTMLNode]): The rendered footnote text
+        """
+        self.definitions[label] = children
+
+    def to_htmlnode(self, diagnostics=None):
+        """
+        Return the footnote list for the end of the page, or None if the
+        page defines no footnotes.
+
+        Args:
+            diagnostics (Diagnostics): If given, references to labels that
+                were never defined are reported there as warnings
+        """
+        if diagnostics is not None:
+            for label in self._references:
+                if label not in self.definitions:
+                    diagnostics.warning(f"Footnote [^{label}] is referenced but never defined", self._lines[label])
+        if not self.definitions:
+            return None
+        for label in self.definitions:
+            self._number(label)
+        items = []
+        for label, number in sorted(self.numbers.items(), key=lambda item: item[1]):
+            if label not in self.definitions:
+                continue
+            slug = slugify(label)
+            props = {"id": f"fn-{slug}"}
+            # Undefined references leave gaps the list must skip
+            if number != len(items) + 1:
+                props["value"] = str(number)
+            children = self.definitions[label]
+            if label in self._references:
+                backref = LeafNode("a", "↩", {"href": f"#fnref-{slug}", "class": "footnote-backref"})
+                children = children + [LeafNode(None, " "), backref]
+            paragraph = ParentNode("p", children)
+            items.append(ParentNode("li", [paragraph], props))
+        return ParentNode("section", [ParentNode("ol", items)], {"class": "footnotes"})
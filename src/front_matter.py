@@ -0,0 +1,161 @@
+import io
+import re
+import datetime
+
+# Opens and closes the metadata block at the top of a page
+FRONT_MATTER_DELIMITER = "---"
+
+_FIELD = re.compile(r"([A-Za-z_][\w-]*)[ \t]*:[ \t]*(.*)")
+
+_BOOLEANS = {"true": True, "yes": True, "false": False, "no": False}
+
+class PageMeta:
+    """
+    Metadata from a page's front matter: "key: value" lines between two
+    "---" lines at the very top of its source.
+
+    Example:
+        ---
+        draft: true
+        date: 2024-05-01
+        ---
+        # Title
+
+    Args:
+        fields (dict): Every key and its value, as written
+        draft (bool): The page is not ready to publish
+        date (datetime.date): The publish date; later dates are scheduled
+    """
+
+    def __init__(self, fields=None, draft=False, date=None):
+        self.fields = dict(fields or {})
+        self.draft = draft
+        self.date = date
+
+    def is_published(self, today, drafts=False, future=False):
+        """
+        Tell whether the page belongs in a build.
+
+        Args:
+            today (datetime.date): The build date
+            drafts (bool): Include drafts
+            future (bool): Include pages dated after today
+
+        Returns:
+            bool: True if the page should be built
+        """
+        if self.draft and not drafts:
+            return False
+        return future or self.date is None or self.date <= today
+
+    def to_dict(self):
+        return {"fields": self.fields, "draft": self.draft, "date": self.date and self.date.isoformat()}
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild the metadata of a page read earlier, see to_dict()."""
+        date = data["date"] and datetime.date.fromisoformat(data["date"])
+        return cls(data["fields"], data["draft"], date)
+
+    def __repr__(self):
+        return f"PageMeta({self.fields})"
+
+def _scan(lines):
+    # The lines of a front matter block, or None if the source has none;
+    # a line that is not "key: value" means the "---" was a rule after all
+    first = next(lines, None)
+    if first is None or first.strip() != FRONT_MATTER_DELIMITER:
+        return None, [first] if first is not None else []
+    consumed = [first]
+    for line in lines:
+        consumed.append(line)
+        stripped = line.strip()
+        if stripped == FRONT_MATTER_DELIMITER:
+            return consumed, []
+        if stripped and not _FIELD.fullmatch(stripped):
+            break
+    return None, consumed
+
+def _to_meta(block, diagnostics):
+    fields = {}
+    draft = False
+    date = None
+    for number, line in enumerate(block[1:-1], 2):
+        line = line.strip()
+        if not line:
+            continue
+        key, value = _FIELD.fullmatch(line).groups()
+        fields[key] = value
+        try:
+            if key == "draft":
+                if value.lower() not in _BOOLEANS:
+                    raise ValueError(f"Invalid draft flag in front matter: {value!r}, expected true or false")
+                draft = _BOOLEANS[value.lower()]
+            elif key == "date":
+                try:
+                    date = datetime.date.fromisoformat(value)
+                except ValueError:
+                    raise ValueError(f"Invalid date in front matter: {value!r}, expected YYYY-MM-DD") from None
+        except ValueError as e:
+            if diagnostics is None:
+                raise
+            diagnostics.error(str(e), number)
+    return PageMeta(fields, draft, date)
+
+def split_front_matter(markdown, diagnostics=None):
+    """
+    Separate a page's front matter from its markdown.
+
+    Args:
+        markdown (str): The page source
+        diagnostics (Diagnostics): If given, invalid values are reported
+            there and ignored instead of raising
+
+    Returns:
+        tuple[PageMeta, str]: The metadata, and the markdown with the front
+        matter turned into blank lines, so line numbers stay the same
+
+    Raises:
+        ValueError: If a known field has an invalid value and there are no
+            diagnostics
+    """
+    if not markdown.startswith(FRONT_MATTER_DELIMITER):
+        return PageMeta(), markdown
+    block, _ = _scan(iter(io.StringIO(markdown)))
+    if block is None:
+        return PageMeta(), markdown
+    size = sum(len(line) for line in block)
+    return _to_meta(block, diagnostics), "\n" * len(block) + markdown[size:]
+
+def read_front_matter(path, diagnostics=None):
+    """
+    Read a page's metadata without reading the rest of the file.
+
+    Args:
+        path (str): The markdown file
+        diagnostics (Diagnostics): See split_front_matter()
+
+    Returns:
+        PageMeta: The metadata, empty if the page has none
+    """
+    with open(path, 'r') as f:
+        block, _ = _scan(iter(f))
+    return PageMeta() if block is None else _to_meta(block, diagnostics)
+
+def blank_front_matter(lines):
+    """
+    Turn the front matter of a stream of lines into blank lines, for
+    parsers that read a file line by line.
+
+    Args:
+        lines (iterable[str]): Lines of markdown, with newlines
+
+    Yields:
+        str: The same lines, front matter blanked
+    """
+    lines = iter(lines)
+    block, consumed = _scan(lines)
+    if block is not None:
+        yield from ["\n"] * len(block)
+    yield from consumed
+    yield from lines
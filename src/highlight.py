@@ -0,0 +1,226 @@
+import re
+from collections import OrderedDict
+
+from cache import cache_key
+from escape import escape_text
+
+# Bump when the generated markup changes so stale cache entries are ignored
+HIGHLIGHTER_VERSION = "1"
+
+# Code blocks at least this many characters long are highlighted in the
+# worker pool instead of inline
+POOL_THRESHOLD = 32 * 1024
+
+_MEMORY_ENTRIES = 1024
+
+_NUMBER = r"\b0[xX][0-9a-fA-F]+\b|\b\d+(?:\.\d+)?(?:[eE][+-]?\d+)?\b"
+_DOUBLE_QUOTED = r'"(?:[^"\\\n]|\\.)*"'
+_SINGLE_QUOTED = r"'(?:[^'\\\n]|\\.)*'"
+
+def _lexer(keywords, comments, strings, builtins=""):
+    pattern = "|".join([
+        f"(?P<comment>{'|'.join(comments)})",
+        f"(?P<string>{'|'.join(strings)})",
+        f"(?P<number>{_NUMBER})",
+        r"(?P<word>[A-Za-z_$][A-Za-z0-9_$]*)",
+    ])
+    return re.compile(pattern), frozenset(keywords.split()), frozenset(builtins.split())
+
+_PYTHON = _lexer(
+    keywords="and as assert async await break class continue def del elif else except finally "
+             "for from global if import in is lambda nonlocal not or pass raise return try while "
+             "with yield None True False",
+    builtins="print len range str int float list dict set tuple open super isinstance self",
+    comments=[r"#[^\n]*"],
+    strings=[r'"""[\s\S]*?"""', r"'''[\s\S]*?'''", _DOUBLE_QUOTED, _SINGLE_QUOTED],
+)
+
+_JAVASCRIPT = _lexer(
+    keywords="break case catch class const continue default delete do else export extends "
+             "finally for function if import in instanceof let new return super switch this "
+             "throw try typeof var void while yield async await of null undefined true false",
+    builtins="console document window Math JSON Promise Array Object String Number",
+    comments=[r"//[^\n]*", r"/\*[\s\S]*?\*/"],
+    strings=[r"`(?:[^`\\]|\\.)*`", _DOUBLE_QUOTED, _SINGLE_QUOTED],
+)
+
+_GO = _lexer(
+    keywords="break case chan const continue default defer else fallthrough for func go goto "
+             "if import interface map package range return select struct switch type var "
+             "nil true false",
+    builtins="fmt len cap make new append panic recover string int error bool byte",
+    comments=[r"//[^\n]*", r"/\*[\s\S]*?\*/"],
+    strings=[r"`[^`]*`", _DOUBLE_QUOTED, _SINGLE_QUOTED],
+)
+
+_SHELL = _lexer(
+    keywords="if then else elif fi for while until do done case esac function in return export local",
+    builtins="echo cd ls cat grep sed awk python3 pip git set exit source",
+    comments=[r"(?<![\w$])#[^\n]*"],
+    strings=[_DOUBLE_QUOTED, r"'[^']*'"],
+)
+
+_JSON = _lexer(
+    keywords="true false null",
+    comments=[r"(?!x)x"],
+    strings=[_DOUBLE_QUOTED],
+)
+
+_CSS = _lexer(
+    keywords="important",
+    comments=[r"/\*[\s\S]*?\*/"],
+    strings=[_DOUBLE_QUOTED, _SINGLE_QUOTED],
+)
+
+LEXERS = {
+    "python": _PYTHON,
+    "py": _PYTHON,
+    "javascript": _JAVASCRIPT,
+    "js": _JAVASCRIPT,
+    "typescript": _JAVASCRIPT,
+    "ts": _JAVASCRIPT,
+    "go": _GO,
+    "bash": _SHELL,
+    "sh": _SHELL,
+    "shell": _SHELL,
+    "json": _JSON,
+    "css": _CSS,
+}
+
+def highlight(code, language=None):
+    """
+    Highlight a code block as HTML.
+
+    Args:
+        code (str): The source code
+        language (str): Language from the fence info string, if any
+
+    Returns:
+        str: Escaped HTML with tokens wrapped in <span class="hl-..."> elements
+    """
+    lexer = LEXERS.get((language or "").lower())
+    if lexer is None:
+        return escape_text(code)
+
+    pattern, keywords, builtins = lexer
+    parts = []
+    position = 0
+    for match in pattern.finditer(code):
+        kind = match.lastgroup
+        token = match.group()
+        if kind == "word":
+            if token in keywords:
+                kind = "keyword"
+            elif token in builtins:
+                kind = "builtin"
+            else:
+                continue
+        parts.append(escape_text(code[position:match.start()]))
+        parts.append(f'<span class="hl-{kind}">{escape_text(token)}</span>')
+        position = match.end()
+    parts.append(escape_text(code[position:]))
+    return "".join(parts)
+
+class Highlighter:
+    """
+    Cached front end for highlight().
+
+    Results are cached by (language, code hash) in memory and, when a
+    DiskCache is given, on disk across builds. Blocks of POOL_THRESHOLD
+    characters or more are highlighted in a process pool by prefetch().
+    """
+
+    def __init__(self, cache=None, workers=None, pool_threshold=POOL_THRESHOLD):
+        self.cache = cache
+        self.workers = workers
+        self.pool_threshold = pool_threshold
+        self._memory = OrderedDict()
+        self._pool = None
+
+    def _key(self, code, language):
+        return cache_key(HIGHLIGHTER_VERSION, (language or "").lower(), code)
+
+    def _lookup(self, key):
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return self._memory[key]
+        if self.cache is not None:
+            data = self.cache.get(key)
+            if data is not None:
+                result = data.decode("utf-8")
+                self._remember(key, result)
+                return result
+        return None
+
+    def _remember(self, key, result):
+        self._memory[key] = result
+        if len(self._memory) > _MEMORY_ENTRIES:
+            self._memory.popitem(last=False)
+
+    def _store(self, key, result):
+        self._remember(key, result)
+        if self.cache is not None:
+            self.cache.put(key, result.encode("utf-8"))
+
+    def highlight(self, code, language=None):
+        """
+        Highlight a code block, using the cache when possible.
+
+        Args:
+            code (str): The source code
+            language (str): Language from the fence info string, if any
+
+        Returns:
+            str: Escaped, highlighted HTML
+        """
+        key = self._key(code, language)
+        result = self._lookup(key)
+        if result is None:
+            result = highlight(code, language)
+            self._store(key, result)
+        return result
+
+    def prefetch(self, blocks):
+        """
+        Highlight a batch of code blocks ahead of rendering. Large uncached
+        blocks are spread over the worker pool; later highlight() calls for
+        the same blocks are then served from memory.
+
+        Args:
+            blocks (list[tuple]): List of (code, language) tuples
+        """
+        large = {}
+        for code, language in blocks:
+            key = self._key(code, language)
+            if key in large or self._lookup(key) is not None:
+                continue
+            if len(code) >= self.pool_threshold:
+                large[key] = (code, language)
+            else:
+                self._store(key, highlight(code, language))
+
+        # Starting the pool only pays off when blocks can run side by side
+        if len(large) < 2:
+            for key, (code, language) in large.items():
+                self._store(key, highlight(code, language))
+            return
+
+        if self._pool is None:
+            # Imported here: multiprocessing is slow to import and most
+            # builds never need the pool
+            from concurrent.futures import ProcessPoolExecutor
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        futures = {
+            key: self._pool.submit(highlight, code, language)
+            for key, (code, language) in large.items()
+        }
+        for key, future in futures.items():
+            self._store(key, future.result())
+
+    def close(self):
+        """Shut down the worker pool, if one was started."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+default_highlighter = Highlighter()
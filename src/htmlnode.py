@@ -1,3 +1,5 @@
+from escape import escape_attr, escape_text
+
 class HTMLNode:
     def __init__(self, tag: str = None, value: str = None, children = None, props: map = None):
         self.tag = tag
@@ -10,10 +12,10 @@ class HTMLNode:
 
     def props_to_html(self):
 
-        if self.props is None:
+        if not self.props:
             return ""
         
-        return " ".join(f'{key}="{value}"' for key, value in self.props.items())
+        return " ".join(f'{key}="{escape_attr(value)}"' for key, value in self.props.items())
         
         
     def __repr__(self):
@@ -25,13 +27,23 @@ class LeafNode(HTMLNode):
         if self.value == None:
             raise ValueError("All leaf nodes must have a value")
         
+    @property
+    def value(self):
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        # Escape once when the value is set, so serializing (possibly many
+        # times) costs nothing extra
+        self._value = value
+        self._escaped = escape_text(value) if value is not None else None
     
     def to_html(self):
         if self.tag == None:
-            return self.value
+            return self._escaped
         else:
             props_str = self.props_to_html()
-            return f"<{self.tag}{' ' + props_str if props_str else ''}>{self.value}</{self.tag}>"
+            return f"<{self.tag}{' ' + props_str if props_str else ''}>{self._escaped}</{self.tag}>"
     
     def __repr__(self):
         return f"LeafNode({self.tag}, {self.value}, {self.props})"
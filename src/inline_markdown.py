@@ -1,6 +1,6 @@
 from textnode import TextNode, TextType
 
-def split_nodes_delimiter(old_nodes, delimiter, text_type):
+def split_nodes_delimiter(old_nodes, delimiter, text_type, diagnostics=None):
     """
     Split text nodes based on a delimiter.
     
@@ -8,12 +8,14 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
         old_nodes (list[TextNode]): List of nodes to process
         delimiter (str): The delimiter to split on (e.g., "**" for bold)
         text_type (TextType): The type to assign to text between delimiters
+        diagnostics (Diagnostics): If given, an unclosed delimiter is
+            reported there and kept as literal text instead of raising
         
     Returns:
         list[TextNode]: New list of nodes with text between delimiters assigned the specified type
         
     Raises:
-        ValueError: If there are unclosed delimiters
+        ValueError: If there are unclosed delimiters and no diagnostics
     """
     new_nodes = []
     
@@ -33,7 +35,12 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
             
         # Check for unclosed delimiters
         if len(sections) % 2 == 0:
-            raise ValueError(f"Unclosed delimiter {delimiter}")
+            if diagnostics is None:
+                raise ValueError(f"Unclosed delimiter {delimiter}")
+            # Pair up the others; the last one stays as it was written
+            offset = len(old_node.text) - len(sections[-1]) - len(delimiter)
+            diagnostics.error_in_text(f"Unclosed delimiter {delimiter}", old_node.text, offset)
+            sections[-2:] = [sections[-2] + delimiter + sections[-1]]
             
         current_nodes = []
         # Process the sections
@@ -1,71 +1,219 @@
 import os
 import sys
-import shutil
-import logging
-from page import generate_pages_recursive
+import time
+import build_state
 
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
+# Everything else is imported inside main(), after the no-op check, so an
+# up-to-date build exits without loading the generator at all
 
-def copy_directory(src, dst):
-    """
-    Recursively copy a directory from src to dst.
-    First deletes the destination directory if it exists.
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Output mtime of reproducible builds unless SOURCE_DATE_EPOCH says
+# otherwise: 1980-01-01, the earliest time zip archives can hold
+REPRODUCIBLE_MTIME = 315532800
+
+def main():
+    """Main function to generate the static site."""
+    # Get the root directory (parent of src)
+    root_dir = os.path.dirname(SRC_DIR)
+    state_path = os.path.join(root_dir, ".cache", build_state.STATE_NAME)
     
-    Args:
-        src (str): Source directory path
-        dst (str): Destination directory path
-    """
-    # Delete destination directory if it exists
-    if os.path.exists(dst):
-        logging.info(f"Removing existing directory: {dst}")
-        shutil.rmtree(dst)
+    start = time.perf_counter()
+    argv = sys.argv[1:]
+    # Scheduled pages are published by the date alone, so it is part of the key
+    key = (
+        tuple(arg for arg in argv if arg != "--force"), os.getcwd(), os.environ.get("SOURCE_DATE_EPOCH"),
+        time.strftime("%Y-%m-%d"),
+    )
+    if "--force" not in argv and build_state.is_up_to_date(state_path, key):
+        print("Nothing to do: sources and outputs are unchanged")
+        finish_noop(argv, state_path, start)
+        return
     
-    # Create destination directory
-    logging.info(f"Creating directory: {dst}")
-    os.makedirs(dst)
+    import argparse
+    import datetime
+    import logging
+    from diagnostics import ERROR, WARNING
+    from manifest import MANIFEST_NAME
+    from renderers import RENDERERS, OutputTarget
+    from session import BuildConfig, BuildSession
     
-    # Walk through the source directory
-    for item in os.listdir(src):
-        src_path = os.path.join(src, item)
-        dst_path = os.path.join(dst, item)
-        
-        if os.path.isfile(src_path):
-            # Copy file
-            logging.info(f"Copying file: {src_path} -> {dst_path}")
-            shutil.copy2(src_path, dst_path)
-        else:
-            # Recursively copy directory
-            logging.info(f"Copying directory: {src_path} -> {dst_path}")
-            copy_directory(src_path, dst_path)
+    setup_logging()
+    
+    parser = argparse.ArgumentParser(description="Generate the static site.")
+    parser.add_argument("base_path", nargs="?", default="/", help="base path for URLs (default: /)")
+    parser.add_argument("--manifest", help=f"where to write the build manifest (default: docs/{MANIFEST_NAME})")
+    parser.add_argument("--minify", action="store_true", help="minify HTML pages and CSS assets")
+    parser.add_argument("--stream", action="store_true", default=None,
+                        help="render every page block by block with bounded memory (default: only huge pages)")
+    parser.add_argument("--target", action="append", default=[], choices=sorted(set(RENDERERS) - {"html"}),
+                        help="also render every page as NAME into docs/NAME/, from the same parse (repeatable)")
+    parser.add_argument("--sites", nargs="?", const=os.path.join(root_dir, "sites.json"), metavar="CONFIG",
+                        help="build every site and locale listed in CONFIG (default: sites.json) instead of one site")
+    parser.add_argument("--check", action="store_true",
+                        help="only validate the pages a build would render, in parallel, and report all problems "
+                             "without writing output")
+    parser.add_argument("--cache-dir", default=os.path.join(root_dir, ".cache"),
+                        help="where rendered pages and assets are cached across builds; CI can save and "
+                             "restore it (default: .cache)")
+    parser.add_argument("--cache-max-size", type=float, metavar="MIB",
+                        help="after building, trim the cache to this many MiB, least recently used first")
+    parser.add_argument("--cache-max-age", type=float, metavar="DAYS",
+                        help="after building, drop cache entries unused for this many days")
+    parser.add_argument("--reproducible", action="store_true",
+                        help="give every output the same mtime ($SOURCE_DATE_EPOCH, default 1980-01-01), "
+                             "so builds of the same sources are identical")
+    parser.add_argument("--metrics", metavar="PATH",
+                        help="write build counters and timings to PATH, as JSON if it ends in .json and in "
+                             "the Prometheus text format otherwise")
+    parser.add_argument("--only", action="append", default=[], metavar="GLOB",
+                        help="build only the pages whose path under content/ matches GLOB, e.g. 'blog/*' "
+                             "(repeatable); the others keep their outputs and listings from the last build")
+    parser.add_argument("--section", action="append", default=[], metavar="NAME",
+                        help="build only the pages under content/NAME/, like --only 'NAME/*' (repeatable)")
+    parser.add_argument("--drafts", action="store_true", help="also build pages marked 'draft: true' in their front matter")
+    parser.add_argument("--future", action="store_true",
+                        help="also build pages whose front matter date is after today ($SOURCE_DATE_EPOCH if set)")
+    parser.add_argument("--relative-urls", action="store_true",
+                        help="make links, images and stylesheets relative to each page instead of prefixing "
+                             "the base path, so the site works under any path or straight from disk")
+    parser.add_argument("--workers", type=int, metavar="N",
+                        help="render pages in N worker processes (default: 1, in this process; "
+                             "with --check, one per CPU)")
+    parser.add_argument("--force", action="store_true", help="build even if nothing changed since the last build")
+    args = parser.parse_args(argv)
+    
+    mtime = int(os.environ.get("SOURCE_DATE_EPOCH", REPRODUCIBLE_MTIME)) if args.reproducible else None
+    today = None
+    if "SOURCE_DATE_EPOCH" in os.environ:
+        today = datetime.datetime.fromtimestamp(int(os.environ["SOURCE_DATE_EPOCH"]), datetime.timezone.utc).date()
+    if args.sites and not args.check:
+        build_sites(args.sites, root_dir, state_path, key, args.cache_dir, mtime, args.drafts, args.future, today)
+        trim_cache(args)
+        return
+    
+    config = BuildConfig.from_root(
+        root_dir,
+        base_path=args.base_path,
+        minify=args.minify,
+        stream=args.stream,
+        manifest_path=args.manifest,
+        cache_dir=args.cache_dir,
+        mtime=mtime,
+        targets=[OutputTarget.from_root(root_dir, name) for name in args.target],
+        include=args.only + [f"{section.strip('/')}/*" for section in args.section],
+        drafts=args.drafts,
+        future=args.future,
+        today=today,
+        relative_urls=args.relative_urls,
+        workers=args.workers,
+    )
+    if args.check:
+        check(config)
+        return
+    with BuildSession(config) as session:
+        result = session.build()
+    logging.info(f"Build summary: {result.summary()}")
+    if args.metrics:
+        write_metrics(session.metrics, args.metrics)
+    trim_cache(args)
+    report(result.diagnostics)
+    if any(item.severity == ERROR for item in result.diagnostics):
+        # Not recorded as up to date, so the next run reports them again
+        sys.exit(1)
+    
+    # The generator's own code counts as an input, so editing it rebuilds
+    inputs = [config.content_dir, config.static_dir, config.template_path, SRC_DIR]
+    inputs += [os.path.join(root_dir, "template" + RENDERERS[name].extension) for name in args.target]
+    warnings = [str(item) for item in result.diagnostics if item.severity == WARNING]
+    build_state.save(state_path, key, inputs, result.writer.outputs, warnings)
 
-def main():
-    """Main function to generate the static site."""
-    # Get the base path from command line argument or use default
-    base_path = sys.argv[1] if len(sys.argv) > 1 else "/"
+def setup_logging():
+    import logging
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+
+def option_value(argv, name):
+    """Return the value of an option in argv, for the no-op path, which runs before argparse is loaded."""
+    for i, arg in enumerate(argv):
+        if arg == name and i + 1 < len(argv):
+            return argv[i + 1]
+        if arg.startswith(name + "="):
+            return arg[len(name) + 1:]
+    return None
+
+def finish_noop(argv, state_path, start):
+    """Repeat the last build's warnings and write --metrics for a build with nothing to do."""
+    warnings = build_state.recorded_warnings(state_path)
+    metrics_path = option_value(argv, "--metrics")
+    if not warnings and metrics_path is None:
+        return
+    import logging
+    setup_logging()
+    for line in warnings:
+        logging.warning(line)
+    if metrics_path is not None:
+        from metrics import Metrics
+        metrics = Metrics()
+        metrics.inc("builds", kind="noop")
+        metrics.observe("build_seconds", time.perf_counter() - start, kind="noop")
+        metrics.inc("diagnostics", len(warnings))
+        write_metrics(metrics, metrics_path)
+
+def report(diagnostics):
+    """Log every problem found in the pages, one line each."""
+    import logging
+    from diagnostics import ERROR
+    for item in diagnostics:
+        log = logging.error if item.severity == ERROR else logging.warning
+        log(str(item))
+
+def write_metrics(metrics, path):
+    """Write metrics to path, as JSON for .json files and Prometheus text otherwise."""
+    import logging
     
-    # Get the root directory (parent of src)
-    root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with open(path, 'w') as f:
+        f.write(metrics.to_json() if path.endswith(".json") else metrics.to_prometheus())
+    logging.info(f"Wrote build metrics: {path}")
+
+def trim_cache(args):
+    """Evict cache entries beyond the size and age limits, if any were given."""
+    import logging
+    from cache import evict
     
-    # Define paths
-    static_dir = os.path.join(root_dir, "static")
-    docs_dir = os.path.join(root_dir, "docs")  # Changed from public to docs
-    content_dir = os.path.join(root_dir, "content")
-    template_path = os.path.join(root_dir, "template.html")
+    if args.cache_max_size is None and args.cache_max_age is None or not os.path.isdir(args.cache_dir):
+        return
+    max_bytes = None if args.cache_max_size is None else int(args.cache_max_size * 1024 * 1024)
+    max_age = None if args.cache_max_age is None else args.cache_max_age * 24 * 60 * 60
+    deleted, freed = evict(args.cache_dir, max_bytes, max_age)
+    logging.info(f"Cache: evicted {deleted} entries, {freed / 1024:.0f} KiB")
+
+def check(config):
+    """Validate the pages config builds without building and exit 1 on errors."""
+    import logging
+    from diagnostics import ERROR, check_site, summarize
     
-    # Copy static files
-    logging.info("Starting static file copy")
-    copy_directory(static_dir, docs_dir)  # Changed from public to docs
-    logging.info("Finished static file copy")
+    diagnostics = check_site(config.content_dir, config.workers, config)
+    report(diagnostics)
+    logging.info(f"Check summary: {summarize(diagnostics)}")
+    if any(item.severity == ERROR for item in diagnostics):
+        sys.exit(1)
+
+def build_sites(config_path, root_dir, state_path, key, cache_dir, mtime=None, drafts=False, future=False, today=None):
+    """Build every site of a multi-site config and record the build."""
+    import logging
+    from multisite import MultiSiteBuild
     
-    # Generate HTML pages recursively
-    logging.info("Generating HTML pages")
-    generate_pages_recursive(content_dir, template_path, docs_dir, base_path)  # Added base_path
-    logging.info("Finished generating HTML pages")
+    with MultiSiteBuild.from_config(config_path, cache_dir, mtime, drafts, future, today) as build:
+        results = build.build()
+    outputs = set()
+    for name, result in results.items():
+        logging.info(f"Build summary for {name}: {result.summary()}")
+        outputs |= result.writer.outputs
+    build_state.save(state_path, key, build.inputs() + [config_path, SRC_DIR], outputs)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,97 @@
+import os
+import sys
+import json
+import argparse
+import mimetypes
+
+MANIFEST_VERSION = 1
+MANIFEST_NAME = "build-manifest.json"
+
+def build_manifest(writer):
+    """
+    Build a manifest describing every output produced through a writer.
+
+    Args:
+        writer (OutputWriter): The writer used for the build
+
+    Returns:
+        dict: Manifest with a "files" map of relative path to hash, size and
+            content type
+    """
+    files = {}
+    for path, (digest, size) in writer.records.items():
+        rel_path = os.path.relpath(path, writer.root).replace(os.sep, "/")
+        content_type, _ = mimetypes.guess_type(rel_path)
+        files[rel_path] = {
+            "hash": f"sha256:{digest}",
+            "size": size,
+            "content_type": content_type or "application/octet-stream",
+        }
+    return {"version": MANIFEST_VERSION, "files": dict(sorted(files.items()))}
+
+def manifest_to_json(manifest):
+    """Serialize a manifest to stable, diff-friendly JSON."""
+    return json.dumps(manifest, indent=2, sort_keys=True) + "\n"
+
+def load_manifest(path):
+    """
+    Load a manifest from disk.
+
+    Args:
+        path (str): Path to the manifest file
+
+    Returns:
+        dict: The manifest
+
+    Raises:
+        ValueError: If the file is not a manifest this version understands
+    """
+    with open(path, 'r') as f:
+        manifest = json.load(f)
+    if manifest.get("version") != MANIFEST_VERSION or "files" not in manifest:
+        raise ValueError(f"Unsupported manifest: {path}")
+    return manifest
+
+def diff_manifests(old, new):
+    """
+    Compare two manifests.
+
+    Args:
+        old (dict): Manifest of the currently deployed build
+        new (dict): Manifest of the build about to be deployed
+
+    Returns:
+        dict: Sorted lists of "added", "changed" and "removed" paths
+    """
+    old_files = old["files"]
+    new_files = new["files"]
+    added = [path for path in new_files if path not in old_files]
+    removed = [path for path in old_files if path not in new_files]
+    changed = [
+        path for path, entry in new_files.items()
+        if path in old_files and old_files[path]["hash"] != entry["hash"]
+    ]
+    return {
+        "added": sorted(added),
+        "changed": sorted(changed),
+        "removed": sorted(removed),
+    }
+
+def main(argv=None):
+    """Command line entry point: diff two manifests into an upload list."""
+    parser = argparse.ArgumentParser(description="Diff two build manifests.")
+    parser.add_argument("old", help="manifest of the deployed build")
+    parser.add_argument("new", help="manifest of the new build")
+    parser.add_argument("--json", action="store_true", help="print the delta as JSON")
+    args = parser.parse_args(argv)
+
+    delta = diff_manifests(load_manifest(args.old), load_manifest(args.new))
+    if args.json:
+        sys.stdout.write(json.dumps(delta, indent=2) + "\n")
+        return
+    for status, key in (("A", "added"), ("M", "changed"), ("D", "removed")):
+        for path in delta[key]:
+            print(f"{status} {path}")
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,22 @@
 import re
 from textnode import TextNode, TextType, text_node_to_html_node
 from inline_markdown import split_nodes_delimiter
-from markdown_to_blocks import markdown_to_blocks, block_to_block_type, BlockType
+from markdown_to_blocks import (
+    iter_numbered_blocks, block_to_block_type, BlockType,
+    FOOTNOTE_DEFINITION, ListBlock, parse_list, split_lines, split_table_row,
+)
 from htmlnode import ParentNode, LeafNode
+from highlight import default_highlighter
+from escape import Markup
+from toc import TableOfContents, slugify
+from extensions import default_registry
+from footnotes import Footnotes
+
+_FOOTNOTE_REFERENCE = re.compile(r"\[\^([^\]\s]+)\]")
+
+_IMAGE = re.compile(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)")
+# The negative lookbehind (?<!) keeps images from matching as links
+_LINK = re.compile(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)")
 
 def extract_markdown_images(text):
     """
@@ -14,8 +28,7 @@ def extract_markdown_images(text):
     Returns:
         list[tuple]: List of tuples containing (alt_text, url)
     """
-    pattern = r"!\[([^\[\]]*)\]\(([^\(\)]*)\)"
-    matches = re.findall(pattern, text)
+    matches = _IMAGE.findall(text)
     return [(alt.strip(), url.strip()) for alt, url in matches]
 
 def extract_markdown_links(text):
@@ -28,11 +41,35 @@ def extract_markdown_links(text):
     Returns:
         list[tuple]: List of tuples containing (anchor_text, url)
     """
-    # Use negative lookbehind (?<!) to ensure we don't match image links
-    pattern = r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)"
-    matches = re.findall(pattern, text)
+    matches = _LINK.findall(text)
     return [(text.strip(), url.strip()) for text, url in matches]
 
+def _split_nodes_pattern(old_nodes, pattern, text_type):
+    new_nodes = []
+    
+    for old_node in old_nodes:
+        # If the node is not a text node, keep it as is
+        if old_node.text_type != TextType.TEXT:
+            new_nodes.append(old_node)
+            continue
+        
+        # Slice around each match in one pass; splitting the rest of the
+        # text again after every match is quadratic in the number of them
+        text = old_node.text
+        position = 0
+        for match in pattern.finditer(text):
+            if match.start() > position:
+                new_nodes.append(TextNode(text[position:match.start()], TextType.TEXT))
+            new_nodes.append(TextNode(match.group(1).strip(), text_type, match.group(2).strip()))
+            position = match.end()
+        
+        if position == 0:
+            new_nodes.append(old_node)
+        elif position < len(text):
+            new_nodes.append(TextNode(text[position:], TextType.TEXT))
+            
+    return new_nodes
+
 def split_nodes_image(old_nodes):
     """
     Split text nodes based on markdown image syntax.
@@ -43,113 +80,106 @@ def split_nodes_image(old_nodes):
     Returns:
         list[TextNode]: New list of nodes with images split into separate nodes
     """
-    new_nodes = []
+    return _split_nodes_pattern(old_nodes, _IMAGE, TextType.IMAGE)
+
+def split_nodes_link(old_nodes):
+    """
+    Split text nodes based on markdown link syntax.
+    
+    Args:
+        old_nodes (list[TextNode]): List of nodes to process
+        
+    Returns:
+        list[TextNode]: New list of nodes with links split into separate nodes
+    """
+    return _split_nodes_pattern(old_nodes, _LINK, TextType.LINK)
+
+def split_nodes_extensions(old_nodes):
+    """
+    Split text nodes on the syntax of registered inline extensions.
     
+    Args:
+        old_nodes (list[TextNode]): List of nodes to process
+        
+    Returns:
+        list[TextNode]: New list of nodes, with each extension's output as a
+            node the other splitters leave alone
+    """
+    if not default_registry.inlines:
+        return old_nodes
+    new_nodes = []
     for old_node in old_nodes:
-        # If the node is not a text node, keep it as is
         if old_node.text_type != TextType.TEXT:
             new_nodes.append(old_node)
             continue
-            
-        # Find all images in the text
-        images = extract_markdown_images(old_node.text)
-        if not images:
+        text = old_node.text
+        position = 0
+        split_nodes = []
+        for extension, match in default_registry.iter_inline(text):
+            if match.start() > position:
+                split_nodes.append(TextNode(text[position:match.start()], TextType.TEXT))
+            node = extension.render(match)
+            if not isinstance(node, TextNode):
+                node = TextNode(match.group(0), TextType.HTML, node=node)
+            split_nodes.append(node)
+            position = match.end()
+        if not split_nodes:
             new_nodes.append(old_node)
             continue
-            
-        # Process the text, splitting on each image
-        current_text = old_node.text
-        for alt_text, url in images:
-            # Split on the image markdown
-            image_markdown = f"![{alt_text}]({url})"
-            parts = current_text.split(image_markdown, 1)
-            
-            # Add the text before the image if it's not empty
-            if parts[0]:
-                new_nodes.append(TextNode(parts[0], TextType.TEXT))
-                
-            # Add the image node
-            new_nodes.append(TextNode(alt_text, TextType.IMAGE, url))
-            
-            # Update the remaining text
-            if len(parts) > 1:
-                current_text = parts[1]
-            else:
-                current_text = ""
-                
-        # Add any remaining text
-        if current_text:
-            new_nodes.append(TextNode(current_text, TextType.TEXT))
-            
+        if position < len(text):
+            split_nodes.append(TextNode(text[position:], TextType.TEXT))
+        new_nodes.extend(split_nodes)
     return new_nodes
 
-def split_nodes_link(old_nodes):
+def split_nodes_footnotes(old_nodes):
     """
-    Split text nodes based on markdown link syntax.
+    Split text nodes on footnote references such as [^1].
     
     Args:
         old_nodes (list[TextNode]): List of nodes to process
         
     Returns:
-        list[TextNode]: New list of nodes with links split into separate nodes
+        list[TextNode]: New list of nodes with references split into
+            FOOTNOTE nodes holding the label
     """
     new_nodes = []
-    
     for old_node in old_nodes:
-        # If the node is not a text node, keep it as is
-        if old_node.text_type != TextType.TEXT:
-            new_nodes.append(old_node)
-            continue
-            
-        # Find all links in the text
-        links = extract_markdown_links(old_node.text)
-        if not links:
+        if old_node.text_type != TextType.TEXT or "[^" not in old_node.text:
             new_nodes.append(old_node)
             continue
-            
-        # Process the text, splitting on each link
-        current_text = old_node.text
-        for anchor_text, url in links:
-            # Split on the link markdown
-            link_markdown = f"[{anchor_text}]({url})"
-            parts = current_text.split(link_markdown, 1)
-            
-            # Add the text before the link if it's not empty
-            if parts[0]:
-                new_nodes.append(TextNode(parts[0], TextType.TEXT))
-                
-            # Add the link node
-            new_nodes.append(TextNode(anchor_text, TextType.LINK, url))
-            
-            # Update the remaining text
-            if len(parts) > 1:
-                current_text = parts[1]
-            else:
-                current_text = ""
-                
-        # Add any remaining text
-        if current_text:
-            new_nodes.append(TextNode(current_text, TextType.TEXT))
-            
-    return new_nodes 
+        text = old_node.text
+        position = 0
+        for match in _FOOTNOTE_REFERENCE.finditer(text):
+            if match.start() > position:
+                new_nodes.append(TextNode(text[position:match.start()], TextType.TEXT))
+            new_nodes.append(TextNode(match.group(1), TextType.FOOTNOTE))
+            position = match.end()
+        if position < len(text):
+            new_nodes.append(TextNode(text[position:], TextType.TEXT))
+    return new_nodes
 
-def text_to_textnodes(text):
+def text_to_textnodes(text, diagnostics=None):
     """
     Convert a markdown-formatted text string into a list of TextNode objects.
     
     Args:
         text (str): The markdown text to convert
+        diagnostics (Diagnostics): If given, malformed markup is reported
+            there and kept as text instead of raising ValueError
         
     Returns:
         list[TextNode]: List of TextNode objects representing the text
     """
 
-    nodes = [TextNode(text, TextType.TEXT)]
-    
     # Split on delimiters for basic markdown
-    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
-    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
-    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
+    nodes = split_nodes_delimiter([TextNode(text, TextType.TEXT)], "**", TextType.BOLD, diagnostics)
+    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC, diagnostics)
+    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE, diagnostics)
+    
+    # Extensions and footnote references only see the text left between
+    # delimiters, so they never split a pair or rewrite inline code
+    nodes = split_nodes_extensions(nodes)
+    nodes = split_nodes_footnotes(nodes)
     
     # Split on images and links
     nodes = split_nodes_image(nodes)
@@ -157,109 +187,283 @@ def text_to_textnodes(text):
     
     return nodes 
 
-def text_to_children(text):
-    nodes = text_to_textnodes(text)
+def text_to_children(text, stats=None, footnotes=None, diagnostics=None, urls=None):
+    nodes = text_to_textnodes(text, diagnostics)
+    if stats is not None:
+        stats.break_words()
 
-    return [text_node_to_html_node(node) for node in nodes]
+    if footnotes is None:
+        return [text_node_to_html_node(node, stats, urls) for node in nodes]
+    line = diagnostics.line if diagnostics is not None else None
+    return [
+        footnotes.reference(node.text, line) if node.text_type == TextType.FOOTNOTE else text_node_to_html_node(node, stats, urls)
+        for node in nodes
+    ]
 
 def extract_heading_level(block):
     matches = re.match(r"#{1,6}", block.strip())
     return len(matches[0])
 
-def extract_list_items(block):
-    """Extract list items from a list block."""
-    lines = block.split("\n")
-    items = []
-    for line in lines:
-        line = line.strip()
-        # For ordered list, remove the number and dot
-        match = re.match(r"(\d+)[.)]", line)
-        if match:
-            line = line[len(match[0])+1:]
-        # For unordered list, remove the dash
-        else:
-            line = line[2:]  # Remove "- "
-        items.append(line)
-    return items
+def extract_code_block_content(block):
+    """
+    Extract the content from a code block, preserving indentation.
 
-import textwrap
+    Args:
+        block (str): A fenced code block, fences included
 
-def extract_code_block_content(block):
-    """Extract the content from a code block, preserving indentation correctly."""
+    Returns:
+        str: The code between the fences with a trailing newline
+    """
     lines = block.split("\n")
     if len(lines) < 3:  # Minimum: ```\ncontent\n```
         return ""
         
     # Remove first and last lines (```)
-    content_lines = lines[1:-1]
-    
-    # Add proper indentation for Python code
-    indented_lines = []
-    for line in content_lines:
-        if ":" in line:  # Line that starts a new block
-            indented_lines.append(line)
-        else:
-            # Indent non-empty lines that follow a block
-            if line.strip() and indented_lines and ":" in indented_lines[-1]:
-                indented_lines.append("    " + line)
+    return "\n".join(lines[1:-1]) + "\n"
+
+def extract_code_block_language(block):
+    """
+    Extract the language from a code block's fence info string.
+
+    Args:
+        block (str): A fenced code block, fences included
+
+    Returns:
+        str | None: The first word after the opening fence, if any
+    """
+    info = block.split("\n", 1)[0][3:].strip()
+    return info.split()[0] if info else None
+
+def heading_text(children):
+    """Return the plain text of a heading's rendered inline nodes."""
+    return "".join(child.props["alt"] if child.tag == "img" else child.value or "" for child in children)
+
+class _BlockContext:
+    """What the renderer of one block needs besides the block itself."""
+
+    def __init__(self, highlighter, toc, stats, footnotes, diagnostics, metrics=None, urls=None):
+        self.highlighter = highlighter
+        self.toc = toc
+        self.stats = stats
+        self.footnotes = footnotes
+        self.diagnostics = diagnostics
+        self.metrics = metrics
+        self.urls = urls
+
+    def children(self, text):
+        """Render inline markdown, see text_to_children()."""
+        children = text_to_children(text, self.stats, self.footnotes, self.diagnostics, self.urls)
+        if self.metrics is not None:
+            self.metrics.inc("inline_nodes", len(children))
+        return children
+
+def _paragraph_to_html_node(block, context):
+    text = " ".join(line for line in block.split("\n"))
+    return ParentNode("p", context.children(text))
+
+def _heading_to_html_node(block, context):
+    level = extract_heading_level(block)
+    text = block[level+1:]
+    children = context.children(text)
+    # The id and TOC entry come from the nodes just built, not a re-parse
+    plain = heading_text(children).strip()
+    slug = context.toc.add(level, plain) if context.toc is not None else slugify(plain)
+    return ParentNode(f"h{level}", children, {"id": slug})
+
+def _code_to_html_node(block, context):
+    language = extract_code_block_language(block)
+    content = extract_code_block_content(block)
+    highlighter = context.highlighter or default_highlighter
+    props = {"class": f"language-{language}"} if language else None
+    code_node = LeafNode("code", Markup(highlighter.highlight(content, language)), props)
+    return ParentNode("pre", [code_node])
+
+def _quote_to_html_node(block, context):
+    text = " ".join(line[1:].strip() for line in block.split("\n"))
+    return ParentNode("quote", context.children(text))
+
+def _list_to_html_node(block, context):
+    return _list_block_to_html_node(parse_list(block), context)
+
+def _list_block_to_html_node(list_block, context):
+    items = []
+    for item in list_block.items:
+        children = []
+        for content in item.blocks:
+            if isinstance(content, ListBlock):
+                children.append(_list_block_to_html_node(content, context))
+            elif list_block.loose:
+                children.append(ParentNode("p", context.children(content)))
             else:
-                indented_lines.append(line)
-    
-    # Join the lines and ensure trailing newline
-    return "\n".join(indented_lines) + "\n"
+                children.extend(context.children(content))
+        props = None
+        if item.task is not None:
+            checkbox = {"type": "checkbox", "disabled": ""}
+            if item.task:
+                checkbox["checked"] = ""
+            # The box goes before the text, inside the first paragraph if any
+            first = children[0].children if list_block.loose else children
+            first[:0] = [LeafNode("input", "", checkbox), LeafNode(None, " ")]
+            props = {"class": "task-list-item"}
+        items.append(ParentNode("li", children, props))
 
-def block_to_html_node(block):
-    block_type = block_to_block_type(block)
+    props = {}
+    if list_block.ordered and list_block.start != 1:
+        props["start"] = str(list_block.start)
+    if any(item.task is not None for item in list_block.items):
+        props["class"] = "contains-task-list"
+    return ParentNode("ol" if list_block.ordered else "ul", items, props or None)
 
-    if block_type == BlockType.PARAGRAPH:
-        text = " ".join(line for line in block.split("\n"))
-        return ParentNode("p", text_to_children(text))
-    
-    elif block_type == BlockType.HEADING:
-        level = extract_heading_level(block)
-        text = block[level+1:]
-        return ParentNode(f"h{level}", text_to_children(text))
-    
-    elif block_type == BlockType.CODE:
-        content = extract_code_block_content(block)
-        code_node = LeafNode("code", content)
-        return ParentNode("pre", [code_node])
-    
-    elif block_type == BlockType.QUOTE:
-        text = " ".join(line[1:].strip() for line in block.split("\n"))
+def _table_alignments(delimiter):
+    alignments = []
+    for cell in split_table_row(delimiter):
+        if cell.startswith(":") and cell.endswith(":"):
+            alignments.append({"align": "center"})
+        elif cell.endswith(":"):
+            alignments.append({"align": "right"})
+        elif cell.startswith(":"):
+            alignments.append({"align": "left"})
+        else:
+            alignments.append(None)
+    return alignments
 
-        return ParentNode("quote", text_to_children(text))
+def _table_row(line, tag, alignments, context):
+    cells = split_table_row(line)
+    # Rows are cut or padded to the header's width
+    cells = cells[:len(alignments)] + [""] * (len(alignments) - len(cells))
+    return ParentNode("tr", [
+        ParentNode(tag, context.children(cell), props)
+        for cell, props in zip(cells, alignments)
+    ])
 
+def _table_to_html_node(block, context):
+    # One pass over the rows, each split once; nothing is re-scanned
+    lines = block.split("\n")
+    alignments = _table_alignments(lines[1])
+    head = ParentNode("thead", [_table_row(lines[0], "th", alignments, context)])
+    if len(lines) == 2:
+        return ParentNode("table", [head])
+    rows = [_table_row(line, "td", alignments, context) for line in lines[2:]]
+    return ParentNode("table", [head, ParentNode("tbody", rows)])
 
-    
-    elif block_type == BlockType.UNORDERED_LIST:
-        items = extract_list_items(block)
-        item_nodes = [
-            ParentNode("li", text_to_children(item))
-            for item in items
-        ]
-
-        return ParentNode("ul", item_nodes)
-    
-    elif block_type == BlockType.ORDERED_LIST:
-        items = extract_list_items(block)
-        item_nodes = [
-            ParentNode("li", text_to_children(item))
-            for item in items
-        ]
-        return ParentNode("ol", item_nodes)
-        
-    raise ValueError(f"Invalid block type: {block_type}")
-    
+def _footnote_to_html_node(block, context):
+    # A block may hold several definitions; lines up to the next one
+    # continue the current definition
+    definitions = []
+    for line in block.split("\n"):
+        match = FOOTNOTE_DEFINITION.match(line)
+        if match is not None:
+            definitions.append((match.group(1), [line[match.end():]]))
+        else:
+            definitions[-1][1].append(line)
+    collector = context.footnotes if context.footnotes is not None else Footnotes()
+    for label, lines in definitions:
+        collector.define(label, text_to_children(" ".join(lines), context.stats, collector, context.diagnostics, context.urls))
+    # Collected definitions are rendered at the end of the page
+    return None if context.footnotes is not None else collector.to_htmlnode()
+
+# One entry per built-in block type, looked up instead of testing each in turn
+_BLOCK_RENDERERS = {
+    BlockType.PARAGRAPH: _paragraph_to_html_node,
+    BlockType.HEADING: _heading_to_html_node,
+    BlockType.CODE: _code_to_html_node,
+    BlockType.QUOTE: _quote_to_html_node,
+    BlockType.UNORDERED_LIST: _list_to_html_node,
+    BlockType.ORDERED_LIST: _list_to_html_node,
+    BlockType.TASK_LIST: _list_to_html_node,
+    BlockType.TABLE: _table_to_html_node,
+    BlockType.FOOTNOTE: _footnote_to_html_node,
+}
 
+def block_to_html_node(block, highlighter=None, toc=None, stats=None, footnotes=None, diagnostics=None, metrics=None, urls=None):
+    """
+    Convert one markdown block to an HTMLNode.
+
+    Registered block extensions are tried first, through the registry's
+    combined regex; everything else goes by block_to_block_type().
+
+    Args:
+        block (str): The block
+        highlighter (Highlighter): Code block highlighter
+        toc (TableOfContents): Collects headings
+        stats (PageStats): Collects word count and excerpt
+        footnotes (Footnotes): Numbers references and collects definitions;
+            without it, definitions are rendered where they appear
+        diagnostics (Diagnostics): If given, problems are reported there,
+            against the block set by diagnostics.at_block(), and the block
+            is rendered as well as possible instead of raising ValueError
+        metrics (Metrics): Counts blocks by type and inline nodes
+        urls (PageUrls): Resolves the site-absolute URLs of links and
+            images as their nodes are built; without it they stay as
+            written
+
+    Returns:
+        HTMLNode | None: The block's node, or None for footnote definitions
+            collected into footnotes
+    """
+    context = _BlockContext(highlighter, toc, stats, footnotes, diagnostics, metrics, urls)
+    if diagnostics is None:
+        return _render_block(block, context)
+    try:
+        return _render_block(block, context)
+    except ValueError as e:
+        # Whatever failed, the block's text still belongs on the page
+        diagnostics.block_error(str(e))
+        return ParentNode("p", [LeafNode(None, block)])
+
+def _render_block(block, context):
+    stats = context.stats
+    extension = default_registry.match_block(block)
+    if extension is not None:
+        if stats is not None:
+            stats.start_block(False)
+        extension, match = extension
+        if context.metrics is not None:
+            context.metrics.inc("blocks", type=extension.name)
+        if context.urls is None:
+            return extension.render(block, match, context.children)
+        # The extension may build links of its own, so resolve the whole
+        # node once, with the inline children left as written until then
+        plain = _BlockContext(context.highlighter, context.toc, stats, context.footnotes, context.diagnostics, context.metrics)
+        node = extension.render(block, match, plain.children)
+        context.urls.resolve_tree(node)
+        return node
+
+    block_type = block_to_block_type(block)
+    if context.metrics is not None:
+        context.metrics.inc("blocks", type=block_type.value)
+    if stats is not None:
+        stats.start_block(block_type == BlockType.PARAGRAPH)
+    renderer = _BLOCK_RENDERERS.get(block_type)
+    if renderer is None:
+        raise ValueError(f"Invalid block type: {block_type}")
+    return renderer(block, context)
+
+def markdown_to_htmlnode(markdown, highlighter=None, toc=None, stats=None, footnotes=None, diagnostics=None, metrics=None, urls=None):
+    highlighter = highlighter or default_highlighter
+    # Heading ids must be unique within the document even without a TOC
+    toc = toc if toc is not None else TableOfContents()
+    footnotes = footnotes if footnotes is not None else Footnotes()
+    numbered = [(line, block) for line, block in iter_numbered_blocks(split_lines(markdown)) if block.strip()]
+    blocks = [block for _, block in numbered]
+
+    # Highlight all code blocks in one batch so large ones share the pool
+    highlighter.prefetch([
+        (extract_code_block_content(block), extract_code_block_language(block))
+        for block in blocks
+        if block.startswith("```") and block_to_block_type(block) == BlockType.CODE
+    ])
 
-def markdown_to_htmlnode(markdown):
-    blocks = markdown_to_blocks(markdown)
     childrens = []
-    for block in blocks:
-        
-        if block.strip():
-            node = block_to_html_node(block)
+    for line, block in numbered:
+        if diagnostics is not None:
+            diagnostics.at_block(line, block)
+        node = block_to_html_node(block, highlighter, toc, stats, footnotes, diagnostics, metrics, urls)
+        if node is not None:
             childrens.append(node)
 
+    footnote_list = footnotes.to_htmlnode(diagnostics)
+    if footnote_list is not None:
+        childrens.append(footnote_list)
+
     return ParentNode("div", childrens)
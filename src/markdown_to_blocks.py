@@ -8,25 +8,166 @@ class BlockType(Enum):
     QUOTE = "quote"
     UNORDERED_LIST = "unordered_list"
     ORDERED_LIST = "ordered_list"
+    TASK_LIST = "task_list"
+    TABLE = "table"
+    FOOTNOTE = "footnote"
+
+# A table's second line: | :--- | :---: | ---: |
+TABLE_DELIMITER = re.compile(r"\|?\s*:?-+:?\s*(?:\|\s*:?-+:?\s*)*\|?")
+# A footnote definition line: [^label]: text
+FOOTNOTE_DEFINITION = re.compile(r"\[\^([^\]\s]+)\]:[ \t]?")
+# A list item line: indentation, then a "-" or "1." / "1)" marker and a space
+LIST_ITEM = re.compile(r"( *)(?:(-)|(\d{1,9})[.)]) ")
+# The checkbox opening a task list item's text: [ ] or [x]
+TASK_ITEM = re.compile(r"\[([ xX])\] ")
+_CELL_SEPARATOR = re.compile(r"(?<!\\)\|")
+
+def split_table_row(line):
+    """
+    Split one table row into cell texts. Leading and trailing pipes are
+    optional and an escaped pipe (\\|) stays in the cell as a plain pipe.
+
+    Args:
+        line (str): The row
+
+    Returns:
+        list[str]: The stripped cell texts
+    """
+    line = line.strip()
+    if line.startswith("|"):
+        line = line[1:]
+    if line.endswith("|") and not line.endswith("\\|"):
+        line = line[:-1]
+    return [cell.strip().replace("\\|", "|") for cell in _CELL_SEPARATOR.split(line)]
 
 def markdown_to_blocks(markdown):
-    blocks = markdown.split("\n\n")
-    
-    new_blocks = []
+    """
+    Split markdown into blocks separated by blank lines.
+
+    Lines are stripped, except inside fenced code blocks, which keep their
+    indentation (relative to the fence) and their blank lines, and inside
+    lists, which keep their indentation (relative to the first item) for
+    nesting. A blank line followed by an indented line does not end a
+    list: the item goes on with another paragraph. Nor does one followed
+    by another item with the same kind of marker: the list is loose.
+
+    Args:
+        markdown (str): The markdown document
+
+    Returns:
+        list[str]: The non-empty blocks
+    """
+    return list(iter_blocks(split_lines(markdown)))
+
+def split_lines(markdown):
+    """
+    Split markdown into lines the way reading it from a file would.
+
+    A final newline ends the last line rather than starting an empty one,
+    which would otherwise become a blank line in a code block left open at
+    the end, so a page renders the same from a string and from a stream.
+
+    Args:
+        markdown (str): The markdown document
+
+    Returns:
+        list[str]: The lines, without newlines
+    """
+    lines = markdown.split("\n")
+    if markdown.endswith("\n"):
+        lines.pop()
+    return lines
+
+def iter_blocks(lines):
+    """
+    Lazily split lines of markdown into blocks, as markdown_to_blocks does.
+
+    Only the block being built is held in memory, so this works on an open
+    file of any size.
+
+    Args:
+        lines (iterable[str]): Lines of markdown, with or without newlines
+
+    Yields:
+        str: The non-empty blocks
+    """
+    for _, block in iter_numbered_blocks(lines):
+        yield block
+
+def iter_numbered_blocks(lines):
+    """
+    Split lines of markdown into blocks like iter_blocks(), along with the
+    line each block starts on, for error messages.
+
+    Args:
+        lines (iterable[str]): Lines of markdown, with or without newlines
+
+    Yields:
+        tuple[int, str]: The 1-based line number and the block
+    """
+    block_lines = []
+    start = 0
+    fence_indent = None
+    # Indentation of the list being built, None outside lists, and whether
+    # its items are numbered
+    list_indent = None
+    list_ordered = False
+    blank = False
     
-    for block in blocks:
-        block = block.strip()
+    for number, line in enumerate(lines, 1):
+        line = line.rstrip("\r\n")
+        stripped = line.strip()
 
-        if not block:
+        if fence_indent is not None:
+            if stripped.startswith("```"):
+                block_lines.append(stripped)
+                fence_indent = None
+            else:
+                # Drop at most the fence's own indentation from code lines
+                indent = len(line) - len(line.lstrip(" "))
+                block_lines.append(line[min(indent, fence_indent):].rstrip())
             continue
 
-        lines = block.split("\n")
-        block = "\n".join(line.strip() for line in lines)
+        if not stripped:
+            if list_indent is not None:
+                # Whether the list goes on depends on the next line
+                blank = True
+            elif block_lines:
+                yield start, "\n".join(block_lines)
+                block_lines = []
+            continue
 
-        new_blocks.append(block)
-    
-    return new_blocks
+        if list_indent is not None:
+            line = line.expandtabs(4)
+            indent = len(line) - len(line.lstrip(" "))
+            if blank and indent <= list_indent and not _continues_list(line, list_indent, list_ordered):
+                yield start, "\n".join(block_lines)
+                block_lines = []
+                list_indent = None
+            elif blank:
+                block_lines.append("")
+            blank = False
 
+        if stripped.startswith("```") and not stripped.endswith("```", 3):
+            fence_indent = len(line) - len(line.lstrip(" "))
+        if list_indent is not None:
+            block_lines.append(line[min(indent, list_indent):].rstrip())
+            continue
+        if not block_lines:
+            start = number
+            match = LIST_ITEM.match(stripped)
+            if match is not None:
+                list_indent = len(line.expandtabs(4)) - len(line.expandtabs(4).lstrip(" "))
+                list_ordered = match.group(2) is None
+        block_lines.append(stripped)
+
+    if block_lines:
+        yield start, "\n".join(block_lines)
+
+def _continues_list(line, list_indent, list_ordered):
+    # After a blank line, a sibling item with the same kind of marker
+    match = LIST_ITEM.match(line)
+    return match is not None and len(match.group(1)) == list_indent and (match.group(2) is None) == list_ordered
 
 def block_to_block_type(block):
 
@@ -36,26 +177,158 @@ def block_to_block_type(block):
     if re.fullmatch(r"#{1,6} .+", block.strip()):
         return BlockType.HEADING
     
+    if block.startswith("[^") and FOOTNOTE_DEFINITION.match(block):
+        return BlockType.FOOTNOTE
+
+    # Tables are recognized by their first two lines only, so a 10k-row
+    # table costs no more to classify than a small one
+    first_end = block.find("\n")
+    if first_end != -1 and "|" in block[:first_end]:
+        second_end = block.find("\n", first_end + 1)
+        delimiter = block[first_end + 1:second_end if second_end != -1 else len(block)].strip()
+        if TABLE_DELIMITER.fullmatch(delimiter) and len(split_table_row(delimiter)) == len(split_table_row(block[:first_end])):
+            return BlockType.TABLE
+
     lines = block.split('\n')
 
     if all(re.fullmatch(r">\s?.*", line) for line in lines):
         return BlockType.QUOTE
 
-    if all(re.fullmatch(r"[-] .+", line) for line in lines):
-        return BlockType.UNORDERED_LIST
-    
-    ordered_list_pattern = re.compile(r"(\d+)[.)] .+")
-
-    if all(ordered_list_pattern.fullmatch(line.strip()) for line in lines):
-    
-        numbers = [int(ordered_list_pattern.match(line.strip()).group(1)) for line in lines]
-        
-        # Ensure numbers are sequential (1, 2, 3, ...)
-        is_sequential = numbers == list(range(1, len(numbers) + 1))
-        
-        if is_sequential:
-            return BlockType.ORDERED_LIST
-    
+    list_type = _list_type(lines)
+    if list_type is not None:
+        return list_type
 
     return BlockType.PARAGRAPH
 
+def _list_type(lines):
+    # Top-level items share one kind of marker, ordered ones count up by
+    # one from any start; every other line is nested, so indented, or a
+    # blank line between paragraphs of an item
+    first = LIST_ITEM.match(lines[0])
+    if first is None or first.group(1) or not lines[0][first.end():].strip():
+        return None
+    ordered = first.group(2) is None
+    number = int(first.group(3)) if ordered else None
+    task = False
+    for line in lines:
+        match = LIST_ITEM.match(line)
+        if not line or line[0] == " ":
+            pass
+        elif match is None or (match.group(2) is None) != ordered:
+            return None
+        elif ordered:
+            if int(match.group(3)) != number:
+                return None
+            number += 1
+        if match is not None and TASK_ITEM.match(line, match.end()):
+            task = True
+    if ordered:
+        return BlockType.ORDERED_LIST
+    return BlockType.TASK_LIST if task else BlockType.UNORDERED_LIST
+
+class ListBlock:
+    """
+    A list parsed by parse_list().
+
+    Attributes:
+        ordered (bool): Numbered rather than bulleted
+        start (int): Number of the first item of an ordered list
+        items (list[ListItem]): The items
+        loose (bool): Blank lines separate the items or their paragraphs,
+            so each paragraph is rendered as one
+        indent (int): Column of the list's markers
+    """
+
+    def __init__(self, ordered, start, indent):
+        self.ordered = ordered
+        self.start = start
+        self.indent = indent
+        self.items = []
+        self.loose = False
+
+class ListItem:
+    """
+    One item of a ListBlock.
+
+    Attributes:
+        blocks (list[str | ListBlock]): The item's content in order:
+            paragraph text and nested lists
+        task (bool | None): None for plain items, else whether the task's
+            box is checked
+        content_indent (int): Column the item's text starts at; lines
+            indented this far belong to the item
+    """
+
+    def __init__(self, content_indent, text):
+        self.content_indent = content_indent
+        self.task = None
+        match = TASK_ITEM.match(text)
+        if match is not None:
+            self.task = match.group(1) != " "
+            text = text[match.end():]
+        self.blocks = [[text]]
+
+def parse_list(block):
+    """
+    Parse a list block into nested lists in one pass over its lines.
+
+    A stack holds the lists that are open at the current line: an item
+    indented to at least the content of the item above starts a nested
+    list, a less indented one closes lists until one it belongs to, and
+    an indented line without a marker continues the deepest item whose
+    content it reaches. Paragraph lines are joined with spaces.
+
+    Args:
+        block (str): A list block as iter_blocks() yields it
+
+    Returns:
+        ListBlock: The top-level list
+    """
+    stack = []
+    items = []
+    blank = False
+    for line in block.split("\n"):
+        if not line.strip():
+            blank = True
+            continue
+        match = LIST_ITEM.match(line)
+        indent = len(line) - len(line.lstrip(" "))
+        if match is not None:
+            ordered = match.group(2) is None
+            while len(stack) > 1 and indent < stack[-1].indent:
+                stack.pop()
+            start = int(match.group(3)) if ordered else 1
+            if not stack:
+                stack.append(ListBlock(ordered, start, indent))
+            elif indent >= stack[-1].items[-1].content_indent:
+                # Deeper than the item above: a list nested in it
+                nested = ListBlock(ordered, start, indent)
+                stack[-1].items[-1].blocks.append(nested)
+                stack[-1].loose = stack[-1].loose or blank
+                stack.append(nested)
+            elif stack[-1].ordered != ordered and len(stack) > 1:
+                # Another kind of marker ends a nested list and starts a new one
+                nested = ListBlock(ordered, start, indent)
+                stack[-2].items[-1].blocks.append(nested)
+                stack[-1] = nested
+            elif blank:
+                stack[-1].loose = True
+            item = ListItem(match.end(), line[match.end():].strip())
+            stack[-1].items.append(item)
+            items.append(item)
+        else:
+            while len(stack) > 1 and indent < stack[-1].items[-1].content_indent:
+                stack.pop()
+            item = stack[-1].items[-1]
+            if blank or not isinstance(item.blocks[-1], list):
+                if blank:
+                    stack[-1].loose = True
+                item.blocks.append([line.strip()])
+            else:
+                item.blocks[-1].append(line.strip())
+        blank = False
+    # Paragraph lines were collected as lists; join them now, without
+    # recursing, so any depth of nesting works
+    for item in items:
+        item.blocks = [" ".join(content) if isinstance(content, list) else content for content in item.blocks]
+    return stack[0]
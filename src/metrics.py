@@ -0,0 +1,189 @@
+import json
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Prefix of every exported metric name
+NAMESPACE = "ssg"
+
+# Upper bounds in seconds of the duration histograms' buckets
+DURATION_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class Histogram:
+    """
+    Counts of observed values per bucket, plus their sum and count.
+
+    Args:
+        buckets (tuple[float]): Sorted upper bounds; values above the last
+            one are only counted in the total
+    """
+
+    def __init__(self, buckets=DURATION_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        index = bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+    def merge(self, other):
+        """Add the observations of another histogram with the same buckets."""
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.sum += other.sum
+        self.count += other.count
+
+    def cumulative(self):
+        """Return (upper bound, observations at or below it) pairs, ending with +Inf."""
+        pairs = []
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            pairs.append((bound, total))
+        pairs.append((float("inf"), self.count))
+        return pairs
+
+class Metrics:
+    """
+    Counters and histograms describing builds, cheap enough to keep on in
+    every build.
+
+    Values are keyed by a name and optional labels, e.g.
+    inc("blocks", type="code"). Counters only go up over the life of the
+    object, so a long-running session can be scraped at any time.
+
+    Example:
+        metrics = Metrics()
+        with metrics.time("phase_seconds", phase="pages"):
+            ...
+        print(metrics.to_prometheus())
+    """
+
+    def __init__(self):
+        self.counters = {}
+        self.histograms = {}
+        # Counters owned by other objects, read when exporting
+        self._sources = []
+
+    def inc(self, name, amount=1, **labels):
+        """Add amount to a counter."""
+        key = (name, _label_key(labels))
+        self.counters[key] = self.counters.get(key, 0) + amount
+
+    def observe(self, name, value, **labels):
+        """Record one value, e.g. a duration in seconds, in a histogram."""
+        key = (name, _label_key(labels))
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram()
+        histogram.observe(value)
+
+    @contextmanager
+    def time(self, name, **labels):
+        """Observe how many seconds the with block takes."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def merge(self, other):
+        """
+        Add the counters and histograms of another Metrics, e.g. one filled
+        in a worker process. Its sources are not read.
+
+        Args:
+            other (Metrics): The values to add
+        """
+        for key, value in other.counters.items():
+            self.counters[key] = self.counters.get(key, 0) + value
+        for key, histogram in other.histograms.items():
+            mine = self.histograms.get(key)
+            if mine is None:
+                mine = self.histograms[key] = Histogram(histogram.buckets)
+            mine.merge(histogram)
+
+    def add_source(self, source):
+        """
+        Export counters kept elsewhere, e.g. by a DiskCache.
+
+        Args:
+            source (callable): Returns (name, labels, value) tuples
+        """
+        self._sources.append(source)
+
+    def snapshot(self):
+        """
+        Return every value as it is now.
+
+        Returns:
+            tuple[dict, dict]: Counters and histograms, keyed by (name,
+            labels); safe to call while another thread updates them
+        """
+        # Copying a dict is atomic, iterating one that grows is not
+        counters = dict(self.counters)
+        for source in self._sources:
+            for name, labels, value in source():
+                counters[(name, _label_key(labels))] = value
+        return counters, dict(self.histograms)
+
+    def to_dict(self):
+        """Return the metrics as plain data, for JSON."""
+        counters, histograms = self.snapshot()
+        result = {"counters": [], "histograms": []}
+        for (name, labels), value in sorted(counters.items()):
+            result["counters"].append({"name": name, "labels": dict(labels), "value": value})
+        for (name, labels), histogram in sorted(histograms.items()):
+            result["histograms"].append({
+                "name": name, "labels": dict(labels), "count": histogram.count, "sum": histogram.sum,
+                "buckets": {_format_bound(bound): count for bound, count in histogram.cumulative()},
+            })
+        return result
+
+    def to_json(self):
+        """Serialize the metrics as JSON."""
+        return json.dumps(self.to_dict(), indent=2, sort_keys=True) + "\n"
+
+    def to_prometheus(self):
+        """Serialize the metrics in the Prometheus text exposition format."""
+        counters, histograms = self.snapshot()
+        lines = []
+        typed = set()
+        for (name, labels), value in sorted(counters.items()):
+            name = f"{NAMESPACE}_{name}_total"
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+        for (name, labels), histogram in sorted(histograms.items()):
+            name = f"{NAMESPACE}_{name}"
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} histogram")
+            for bound, count in histogram.cumulative():
+                lines.append(f"{name}_bucket{_format_labels(labels + (('le', _format_bound(bound)),))} {count}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {histogram.sum:.6f}")
+            lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+def _label_key(labels):
+    # Called for every block, so skip sorting in the usual case
+    if len(labels) < 2:
+        return tuple(labels.items())
+    return tuple(sorted(labels.items()))
+
+def _format_bound(bound):
+    return "+Inf" if bound == float("inf") else repr(bound)
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    pairs = []
+    for name, value in labels:
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
@@ -0,0 +1,133 @@
+import re
+from collections import OrderedDict
+
+from cache import cache_key
+
+# Bump when the minified output changes so stale cache entries are ignored
+MINIFY_VERSION = "2"
+
+_MEMORY_ENTRIES = 256
+
+# Elements whose whitespace matters: line breaks end // comments in
+# scripts, and preformatted text shows every space
+_PRESERVED_HTML = re.compile(r"(<(pre|textarea|script|style)\b.*?</\2\s*>)", re.IGNORECASE | re.DOTALL)
+_SPACE_BETWEEN_TAGS = re.compile(r">\s*\n\s*<")
+_SPACE_AFTER_PRESERVED = re.compile(r"^\s*\n\s*(?=<|$)")
+_SPACE_BEFORE_PRESERVED = re.compile(r"(?:(?<=>)|^)\s*\n\s*$")
+_WHITESPACE = re.compile(r"\s+")
+
+_CSS_STRINGS = re.compile(r"""("(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')""")
+_CSS_COMMENT = re.compile(r"/\*.*?\*/", re.DOTALL)
+_CSS_PUNCTUATION = re.compile(r"\s*([{};,>])\s*")
+_CSS_COLON = re.compile(r":\s+")
+
+def minify_html(html):
+    """
+    Collapse whitespace in HTML, leaving <pre>, <textarea>, <script> and
+    <style> content alone.
+
+    Whitespace between tags that spans a line break (template indentation)
+    is removed; any other run of whitespace becomes a single space.
+
+    Args:
+        html (str): The HTML to minify
+
+    Returns:
+        str: The minified HTML
+    """
+    parts = _PRESERVED_HTML.split(html)
+    result = []
+    # split() yields text, then the two groups of each preserved element
+    for i in range(0, len(parts), 3):
+        text = _SPACE_BETWEEN_TAGS.sub("><", parts[i])
+        # Line breaks next to a preserved element are between tags as well
+        if i > 0:
+            text = _SPACE_AFTER_PRESERVED.sub("", text)
+        if i + 1 < len(parts):
+            text = _SPACE_BEFORE_PRESERVED.sub("", text)
+        result.append(_WHITESPACE.sub(" ", text))
+        if i + 1 < len(parts):
+            result.append(parts[i + 1])
+    return "".join(result).strip()
+
+def minify_css(css):
+    """
+    Strip comments and redundant whitespace from a stylesheet.
+
+    Args:
+        css (str): The stylesheet
+
+    Returns:
+        str: The minified stylesheet
+    """
+    parts = _CSS_STRINGS.split(css)
+    result = []
+    # Odd indexes are string literals, which are kept verbatim
+    for i, part in enumerate(parts):
+        if i % 2:
+            result.append(part)
+            continue
+        part = _CSS_COMMENT.sub("", part)
+        part = _WHITESPACE.sub(" ", part)
+        part = _CSS_PUNCTUATION.sub(r"\1", part)
+        part = _CSS_COLON.sub(":", part)
+        result.append(part.replace(";}", "}"))
+    return "".join(result).strip()
+
+class Minifier:
+    """
+    Cached front end for minify_html() and minify_css() that keeps track of
+    the bytes saved during a build.
+
+    Results are cached by content hash in memory and, when a DiskCache is
+    given, on disk across builds.
+    """
+
+    def __init__(self, cache=None):
+        self.cache = cache
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self._memory = OrderedDict()
+
+    def _minify(self, kind, func, text, cached):
+        result = self._cached(kind, func, text) if cached else func(text)
+        self.bytes_in += len(text.encode("utf-8"))
+        self.bytes_out += len(result.encode("utf-8"))
+        return result
+
+    def _cached(self, kind, func, text):
+        key = cache_key(MINIFY_VERSION, kind, text)
+        result = self._memory.get(key)
+        if result is None and self.cache is not None:
+            data = self.cache.get(key)
+            if data is not None:
+                result = data.decode("utf-8")
+        if result is None:
+            result = func(text)
+            if self.cache is not None:
+                self.cache.put(key, result.encode("utf-8"))
+        self._memory[key] = result
+        if len(self._memory) > _MEMORY_ENTRIES:
+            self._memory.popitem(last=False)
+        return result
+
+    def html(self, text, cached=True):
+        """
+        Return text minified as HTML.
+
+        Args:
+            text (str): The HTML to minify
+            cached (bool): Whether to look up and store the result in the
+                cache; pass False for one-off fragments of streamed pages
+        """
+        return self._minify("html", minify_html, text, cached)
+
+    def css(self, text):
+        """Return text minified as CSS."""
+        return self._minify("css", minify_css, text, True)
+
+    def summary(self):
+        """Return a one-line summary of the bytes saved so far."""
+        saved = self.bytes_in - self.bytes_out
+        percent = saved / self.bytes_in * 100 if self.bytes_in else 0.0
+        return f"saved {saved} bytes ({percent:.1f}% of {self.bytes_in})"
@@ -0,0 +1,301 @@
+import os
+import json
+import time
+import datetime
+import logging
+from pathlib import Path
+
+from cache import DiskCache
+from front_matter import split_front_matter
+from highlight import Highlighter
+from manifest import MANIFEST_NAME, build_manifest, manifest_to_json
+from markdown_parser import markdown_to_htmlnode
+from minify import Minifier
+from output_writer import OutputWriter
+from page import css_path_for, extract_title, fill_template
+from page_stats import PageStats
+from session import BuildResult
+from toc import TableOfContents
+
+class SiteConfig:
+    """
+    One site of a multi-site build.
+
+    Args:
+        name (str): Name used in logs
+        output_dir (str): Directory the site is built into
+        base_path (str): Base path for URLs (default: "/")
+        template_path (str): HTML template for every page of this site
+        locales (list[str]): Locales to build. The first is the default and
+            is built at the root of output_dir, the others under
+            <locale>/ (default: only pages without a locale suffix)
+        minify (bool): Minify HTML pages and CSS assets
+    """
+
+    def __init__(self, name, output_dir, base_path="/", template_path=None, locales=None, minify=False):
+        self.name = name
+        self.output_dir = output_dir
+        self.base_path = base_path
+        self.template_path = template_path
+        self.locales = list(locales or [None])
+        self.minify = minify
+
+    def locale_dir(self, locale):
+        """Return where a locale is built, relative to output_dir."""
+        return "" if locale == self.locales[0] else locale
+
+    def __repr__(self):
+        return f"SiteConfig({self.name}, {self.output_dir}, {self.base_path})"
+
+class MultiSiteBuild:
+    """
+    Build several sites, each in one or more locales, from one content
+    directory.
+
+    Every markdown file is parsed once per build no matter how many sites
+    and locales include it; the sites only differ in template, base path
+    and minification, which are applied to the shared parse. Static files
+    are read once and hard-linked into every site after the first.
+
+    A page for locale "fr" is read from name.fr.md if present and from
+    name.md otherwise.
+
+    Args:
+        sites (list[SiteConfig]): The sites to build
+        content_dir (str): Directory of markdown pages
+        static_dir (str): Directory of assets copied as is
+        template_path (str): Template for sites that do not set their own
+        cache_dir (str): Directory for caches kept across builds, or None
+        mtime (int): If given, the mtime of every output, see OutputWriter
+        drafts (bool): Also build pages marked "draft: true"
+        future (bool): Also build pages dated after today
+        today (datetime.date): The date scheduled pages are published by,
+            or None for the current date
+    """
+
+    def __init__(self, sites, content_dir, static_dir, template_path, cache_dir=None, mtime=None,
+                 drafts=False, future=False, today=None):
+        self.sites = sites
+        self.mtime = mtime
+        self.drafts = drafts
+        self.future = future
+        self.today = today
+        self.content_dir = content_dir
+        self.static_dir = static_dir
+        self.template_path = template_path
+        disk_cache = (lambda name: DiskCache(cache_dir, name)) if cache_dir else (lambda name: None)
+        self.highlighter = Highlighter(cache=disk_cache("highlight"))
+        self.minifier = Minifier(cache=disk_cache("minify"))
+        self.locales = {locale for site in sites for locale in site.locales if locale}
+        self.parses = 0
+        self._templates = {}
+
+    @classmethod
+    def from_config(cls, config_path, cache_dir=None, mtime=None, drafts=False, future=False, today=None):
+        """
+        Load a multi-site build from a JSON config such as:
+
+            {
+              "content_dir": "content",
+              "static_dir": "static",
+              "template": "template.html",
+              "sites": [
+                {"name": "github", "output_dir": "docs", "base_path": "/blog/",
+                 "locales": ["en", "fr"], "template": "template.html",
+                 "minify": true}
+              ]
+            }
+
+        Paths are relative to the config file; only "sites", and "name" and
+        "output_dir" of each site, are required.
+
+        Args:
+            config_path (str): Path to the config file
+            cache_dir (str): Directory for caches kept across builds
+            mtime (int): If given, the mtime of every output
+            drafts (bool): Also build pages marked "draft: true"
+            future (bool): Also build pages dated after today
+            today (datetime.date): The build date, or None for the current
+                date
+
+        Raises:
+            ValueError: If the config is malformed
+        """
+        root_dir = os.path.dirname(os.path.abspath(config_path))
+        with open(config_path, 'r') as f:
+            config = json.load(f)
+
+        def path(value):
+            return os.path.join(root_dir, value)
+
+        if not isinstance(config, dict) or not config.get("sites"):
+            raise ValueError(f"No sites in {config_path}")
+        template_path = path(config.get("template", "template.html"))
+        sites = []
+        names = set()
+        for entry in config["sites"]:
+            if "name" not in entry or "output_dir" not in entry:
+                raise ValueError(f"Site without name or output_dir in {config_path}: {entry}")
+            if entry["name"] in names:
+                raise ValueError(f"Duplicate site name in {config_path}: {entry['name']}")
+            names.add(entry["name"])
+            sites.append(SiteConfig(
+                entry["name"],
+                path(entry["output_dir"]),
+                entry.get("base_path", "/"),
+                path(entry["template"]) if "template" in entry else template_path,
+                entry.get("locales"),
+                entry.get("minify", False),
+            ))
+        return cls(
+            sites,
+            path(config.get("content_dir", "content")),
+            path(config.get("static_dir", "static")),
+            template_path,
+            cache_dir,
+            mtime,
+            drafts,
+            future,
+            today,
+        )
+
+    def inputs(self):
+        """Return every file and directory the build reads."""
+        templates = {site.template_path for site in self.sites}
+        return [self.content_dir, self.static_dir] + sorted(templates)
+
+    def discover_sources(self):
+        """
+        Map every page to its markdown sources.
+
+        Returns:
+            dict: (path relative to content_dir without locale suffix,
+                locale or None) -> absolute source path
+        """
+        sources = {}
+        for item in sorted(Path(self.content_dir).rglob("*.md")):
+            rel_path = item.relative_to(self.content_dir)
+            stem, locale = os.path.splitext(rel_path.stem)
+            locale = locale[1:]
+            if locale in self.locales:
+                rel_path = rel_path.with_name(stem + ".md")
+            else:
+                locale = None
+            sources[(rel_path.as_posix(), locale)] = os.path.abspath(item)
+        return sources
+
+    def build(self):
+        """
+        Build every site.
+
+        Returns:
+            dict: Site name -> BuildResult
+        """
+        start = time.perf_counter()
+        self.minifier.bytes_in = self.minifier.bytes_out = 0
+        writers = {site.name: OutputWriter(site.output_dir, self.mtime) for site in self.sites}
+        self._templates = {}
+
+        logging.info("Starting static file copy")
+        self._copy_static(writers)
+
+        logging.info("Generating HTML pages")
+        sources = self.discover_sources()
+        pages = sorted({key for key, _ in sources})
+        parsed = {}
+        results = {}
+        for site in self.sites:
+            writer = writers[site.name]
+            rendered = 0
+            for locale in site.locales:
+                for key in pages:
+                    source = sources.get((key, locale)) or sources.get((key, None))
+                    if source is None:
+                        continue
+                    if source not in parsed:
+                        parsed[source] = self._parse(source)
+                    if parsed[source] is None:
+                        continue
+                    title, html, toc, stats = parsed[source]
+                    to_path = os.path.join(site.output_dir, site.locale_dir(locale), Path(key).with_suffix(".html"))
+                    self._write_page(site, locale, writer, to_path, title, html, toc, stats)
+                    rendered += 1
+
+            manifest_path = os.path.join(site.output_dir, MANIFEST_NAME)
+            writer.write(manifest_path, manifest_to_json(build_manifest(writer)))
+            writer.prune()
+            results[site.name] = BuildResult(
+                writer, rendered, rendered, time.perf_counter() - start,
+                self.minifier if site.minify else None,
+            )
+        logging.info(f"Parsed {len(parsed)} sources for {len(self.sites)} sites")
+        return results
+
+    def _parse(self, source):
+        self.parses += 1
+        with open(source, 'r') as f:
+            markdown = f.read()
+        meta, markdown = split_front_matter(markdown)
+        if not meta.is_published(self.today or datetime.date.today(), self.drafts, self.future):
+            logging.info(f"Skipping unpublished page: {source}")
+            return None
+        toc = TableOfContents()
+        stats = PageStats()
+        html = markdown_to_htmlnode(markdown, self.highlighter, toc, stats).to_html()
+        return extract_title(markdown), html, toc.to_html(), stats
+
+    def _template(self, site):
+        key = (site.template_path, site.minify)
+        if key not in self._templates:
+            with open(site.template_path, 'r') as f:
+                template = f.read()
+            self._templates[key] = self.minifier.html(template) if site.minify else template
+        return self._templates[key]
+
+    def _write_page(self, site, locale, writer, to_path, title, html, toc, stats):
+        template = self._template(site)
+        if site.minify:
+            html = self.minifier.html(html)
+        # Links stay within the locale; assets are shared by all locales
+        locale_dir = site.locale_dir(locale)
+        base_path = site.base_path + locale_dir + "/" if locale_dir else site.base_path
+        css_path = css_path_for(to_path, site.output_dir)
+        writer.make_dirs([os.path.dirname(to_path)])
+        writer.write(to_path, fill_template(template, title, html, css_path, base_path, site.base_path, toc, stats))
+
+    def _copy_static(self, writers):
+        # The first site to need a file (minified or not) writes it; every
+        # other site gets a hard link to that copy
+        first_copies = {}
+        for dirpath, dirnames, filenames in os.walk(self.static_dir):
+            dirnames.sort()
+            for name in sorted(filenames):
+                src_path = os.path.join(dirpath, name)
+                rel_path = os.path.relpath(src_path, self.static_dir)
+                data = None
+                for site in self.sites:
+                    writer = writers[site.name]
+                    dst_path = os.path.join(site.output_dir, rel_path)
+                    variant = site.minify and name.endswith(".css")
+                    first = first_copies.get(rel_path, {}).get(variant)
+                    if first is not None:
+                        writer.link(first[0], dst_path, first[1])
+                        continue
+                    if data is None:
+                        with open(src_path, 'rb') as f:
+                            data = f.read()
+                    content = self.minifier.css(data.decode("utf-8")) if variant else data
+                    writer.write(dst_path, content)
+                    record = writer.records[os.path.abspath(dst_path)]
+                    first_copies.setdefault(rel_path, {})[variant] = (dst_path, record)
+
+    def close(self):
+        """Release the highlighter's worker pool."""
+        self.highlighter.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
@@ -0,0 +1,311 @@
+import os
+import filecmp
+import hashlib
+import tempfile
+
+class OutputWriter:
+    """
+    Write build outputs under a root directory.
+
+    Files whose bytes are already identical on disk are left untouched, so
+    their mtimes do not change. Everything else is written to a temporary
+    file in the destination directory and renamed into place, so a build
+    that dies partway never leaves a half-written page behind.
+
+    Args:
+        root (str): The output directory
+        mtime (int): If given, every output and, on prune(), every
+            directory gets this mtime in seconds since the epoch, so two
+            builds of the same sources match down to file metadata
+    """
+
+    TEMP_PREFIX = ".tmp-"
+
+    def __init__(self, root, mtime=None):
+        self.root = os.path.abspath(root)
+        self.mtime_ns = None if mtime is None else int(mtime) * 1_000_000_000
+        self.written = 0
+        self.unchanged = 0
+        # Bytes of the files written; unchanged files and links cost none
+        self.bytes_written = 0
+        self.deleted = 0
+        self.outputs = set()
+        self.records = {}
+        # Paths this build wrote or deleted, in order
+        self.changed = []
+        self._dirs = set()
+
+        # mkstemp creates files as 0600; give outputs the usual umask mode
+        umask = os.umask(0)
+        os.umask(umask)
+        self._file_mode = 0o666 & ~umask
+
+    def make_dirs(self, dirs):
+        """
+        Create a batch of directories, each at most once per build.
+
+        Args:
+            dirs (iterable[str]): Directory paths to create
+        """
+        for directory in sorted(set(os.path.abspath(d) for d in dirs)):
+            if directory in self._dirs:
+                continue
+            os.makedirs(directory, exist_ok=True)
+            # Parents were created along the way, remember them too
+            while directory not in self._dirs:
+                self._dirs.add(directory)
+                parent = os.path.dirname(directory)
+                if parent == directory:
+                    break
+                directory = parent
+
+    def write(self, path, content):
+        """
+        Write content to path unless the file already holds the same bytes.
+
+        Args:
+            path (str): Destination file path
+            content (str | bytes): Content to write, str is encoded as UTF-8
+
+        Returns:
+            bool: True if the file was written, False if it was unchanged
+        """
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        path = os.path.abspath(path)
+        self.outputs.add(path)
+        self.records[path] = (hashlib.sha256(content).hexdigest(), len(content))
+
+        if self._is_identical(path, content):
+            self._set_mtime(path)
+            self.unchanged += 1
+            return False
+
+        directory = os.path.dirname(path)
+        self.make_dirs([directory])
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=self.TEMP_PREFIX)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+            os.chmod(tmp_path, self._file_mode)
+            self._set_mtime(tmp_path)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+        self.written += 1
+        self.bytes_written += len(content)
+        self.changed.append(path)
+        return True
+
+    def keep(self, path, record, stat):
+        """
+        Mark an output as produced by this build without rendering it again,
+        provided the file on disk is still the one written earlier.
+
+        Args:
+            path (str): Destination file path
+            record (tuple): The (sha256, size) recorded when it was written
+            stat (tuple): The (st_mtime_ns, st_size) it had after writing
+
+        Returns:
+            bool: True if the file was kept, False if it must be rewritten
+        """
+        path = os.path.abspath(path)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return False
+        if (st.st_mtime_ns, st.st_size) != tuple(stat):
+            return False
+        self.outputs.add(path)
+        self.records[path] = tuple(record)
+        self.unchanged += 1
+        return True
+
+    def open(self, path):
+        """
+        Open path for writing piece by piece, for outputs too large to hold
+        in memory. The content goes to a temporary file that replaces path
+        when the returned object is closed, unless the bytes turn out to be
+        identical to the existing file.
+
+        Args:
+            path (str): Destination file path
+
+        Returns:
+            StreamingOutput: Context manager with a write() method
+        """
+        path = os.path.abspath(path)
+        directory = os.path.dirname(path)
+        self.make_dirs([directory])
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=self.TEMP_PREFIX)
+        return StreamingOutput(self, path, tmp_path, os.fdopen(fd, "wb"))
+
+    def _commit_stream(self, path, tmp_path, digest, size):
+        self.outputs.add(path)
+        self.records[path] = (digest, size)
+        try:
+            identical = os.path.getsize(path) == size and filecmp.cmp(tmp_path, path, shallow=False)
+        except OSError:
+            identical = False
+        if identical:
+            os.unlink(tmp_path)
+            self._set_mtime(path)
+            self.unchanged += 1
+            return False
+        os.chmod(tmp_path, self._file_mode)
+        self._set_mtime(tmp_path)
+        os.replace(tmp_path, path)
+        self.written += 1
+        self.bytes_written += size
+        self.changed.append(path)
+        return True
+
+    def remove(self, path):
+        """
+        Delete one output whose source is gone.
+
+        Args:
+            path (str): Output file path
+
+        Returns:
+            bool: True if a file was deleted
+        """
+        path = os.path.abspath(path)
+        self.outputs.discard(path)
+        self.records.pop(path, None)
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            return False
+        self.deleted += 1
+        self.changed.append(path)
+        return True
+
+    def link(self, src_path, path, record):
+        """
+        Make path a hard link to an output that was already written, so
+        identical files built for several sites share one copy on disk.
+        Falls back to copying where hard links are not possible. Later
+        writes to either path replace the file rather than modify it, so
+        the other path never changes underneath.
+
+        Args:
+            src_path (str): The existing output
+            path (str): Destination file path
+            record (tuple): The (sha256, size) recorded for src_path
+
+        Returns:
+            bool: True if path was (re)linked, False if it already was one
+        """
+        src_path = os.path.abspath(src_path)
+        path = os.path.abspath(path)
+        self.outputs.add(path)
+        self.records[path] = tuple(record)
+        try:
+            if os.path.samefile(src_path, path):
+                self.unchanged += 1
+                return False
+        except OSError:
+            pass
+
+        directory = os.path.dirname(path)
+        self.make_dirs([directory])
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=self.TEMP_PREFIX)
+        os.close(fd)
+        os.unlink(tmp_path)
+        try:
+            os.link(src_path, tmp_path)
+        except OSError:
+            # Another filesystem, or links not supported
+            with open(src_path, "rb") as f:
+                return self.write(path, f.read())
+        try:
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self.written += 1
+        self.changed.append(path)
+        return True
+
+    def prune(self):
+        """
+        Delete files under the root that were not produced by this build,
+        along with any directories left empty.
+
+        Returns:
+            int: Number of files deleted
+        """
+        deleted = 0
+        for dirpath, dirnames, filenames in os.walk(self.root, topdown=False):
+            for name in sorted(filenames):
+                path = os.path.join(dirpath, name)
+                if path not in self.outputs:
+                    os.unlink(path)
+                    self.changed.append(path)
+                    deleted += 1
+            if dirpath != self.root and not os.listdir(dirpath):
+                os.rmdir(dirpath)
+                self._dirs.discard(dirpath)
+            else:
+                # Last, as deleting entries touches the directory
+                self._set_mtime(dirpath)
+        self.deleted += deleted
+        return deleted
+
+    def _set_mtime(self, path):
+        if self.mtime_ns is not None and os.stat(path).st_mtime_ns != self.mtime_ns:
+            os.utime(path, ns=(self.mtime_ns, self.mtime_ns))
+
+    def summary(self):
+        """Return a one-line summary of what this build did on disk."""
+        return f"{self.written} written, {self.unchanged} unchanged, {self.deleted} deleted"
+
+    @staticmethod
+    def _is_identical(path, content):
+        try:
+            if os.path.getsize(path) != len(content):
+                return False
+            with open(path, "rb") as f:
+                return f.read() == content
+        except OSError:
+            return False
+
+class StreamingOutput:
+    """An output file being written in pieces, see OutputWriter.open()."""
+
+    def __init__(self, writer, path, tmp_path, file):
+        self.path = path
+        self._writer = writer
+        self._tmp_path = tmp_path
+        self._file = file
+        self._hash = hashlib.sha256()
+        self._size = 0
+
+    def write(self, content):
+        """
+        Append content to the output.
+
+        Args:
+            content (str | bytes): Content to write, str is encoded as UTF-8
+        """
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        self._file.write(content)
+        self._hash.update(content)
+        self._size += len(content)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._file.close()
+        if exc_type is not None:
+            os.unlink(self._tmp_path)
+            return False
+        self._writer._commit_stream(self.path, self._tmp_path, self._hash.hexdigest(), self._size)
+        return False
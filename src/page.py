@@ -1,6 +1,23 @@
 import os
+import re
+import mmap
 from pathlib import Path
-from markdown_parser import markdown_to_htmlnode
+from escape import escape_text
+from footnotes import Footnotes
+from front_matter import blank_front_matter, split_front_matter
+from htmlnode import ParentNode
+from markdown_parser import markdown_to_htmlnode, block_to_html_node
+from markdown_to_blocks import BlockType, block_to_block_type, iter_blocks, iter_numbered_blocks
+from output_writer import OutputWriter
+from renderers import HtmlRenderer, render_tree, walk_tree
+from page_stats import TEMPLATE_VARIABLES, PageStats
+from toc import TableOfContents
+from urls import UrlResolver
+
+# Markdown files at least this large are rendered block by block
+STREAM_THRESHOLD = 64 * 1024 * 1024
+
+_TITLE_PATTERN = re.compile(rb"^[ \t\r\f\v]*# [ \t\r\f\v]*(\S[^\n]*)", re.MULTILINE)
 
 def extract_title(markdown):
     """
@@ -22,72 +39,318 @@ def extract_title(markdown):
             return line[2:].strip()
     raise ValueError("No h1 header found in markdown file")
 
-def generate_page(from_path, template_path, to_path, base_path="/"):
+def extract_title_from_file(path):
     """
-    Generate an HTML page from a markdown file.
+    Extract the title (h1) from a markdown file without reading it into
+    memory. The file is memory-mapped and searched up to the first h1 only.
     
     Args:
-        from_path (str): Path to the markdown file
-        template_path (str): Path to the template file
-        to_path (str): Path where the HTML file will be written
-        base_path (str): Base path for URLs (default: "/")
+        path (str): Path to the markdown file
+        
+    Returns:
+        str: The title text without the # prefix
+        
+    Raises:
+        ValueError: If no h1 header is found
     """
-    print(f"Generating page from {from_path} to {to_path} using {template_path}")
+    title = None
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size > 0:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                match = _TITLE_PATTERN.search(mapped)
+                if match:
+                    title = match.group(1)
+    if title is None:
+        raise ValueError("No h1 header found in markdown file")
+    return title.decode("utf-8").strip()
+
+def _rewrite_urls(html, base_path, asset_base_path=None):
+    # Replace absolute URLs with base path, for pages rendered without a
+    # UrlResolver
+    html = html.replace('href="/', f'href="{base_path}')
+    return html.replace('src="/', f'src="{asset_base_path or base_path}')
+
+def css_path_for(to_path, output_dir):
+    """
+    Return the URL of the site stylesheet relative to a page.
     
-    # Calculate the relative path to the CSS file
-    depth = len(os.path.relpath(to_path, os.path.dirname(template_path)).split(os.sep)) - 1
-    css_path = "../" * (depth - 1) + "index.css" if depth > 0 else "index.css"
+    Args:
+        to_path (str): Path of the page being generated
+        output_dir (str): The site's root directory, holding index.css
+        
+    Returns:
+        str: The relative stylesheet URL
+    """
+    depth = len(os.path.relpath(to_path, output_dir).split(os.sep)) - 1
+    return "../" * depth + "index.css"
+
+def fill_template(template, title, content, css_path, base_path="/", asset_base_path=None, toc="", stats=None, urls=None):
+    """
+    Substitute a rendered page into an HTML template and point its absolute
+    URLs at the base path.
     
-    # Read the markdown file
-    with open(from_path, 'r') as f:
-        markdown = f.read()
+    Args:
+        template (str): The template text
+        title (str): The page title
+        content (str): The rendered HTML content
+        css_path (str): The stylesheet URL
+        base_path (str): Base path for href URLs (default: "/")
+        asset_base_path (str): Base path for src URLs (default: base_path)
+        toc (str): The table of contents HTML for {{ TOC }}
+        stats (PageStats): Fills {{ WordCount }}, {{ ReadingTime }} and
+            {{ Excerpt }}
+        urls (PageUrls): If given, content was parsed with it, so only the
+            template's URLs are left to resolve, through its cache; the
+            base paths are then unused. Otherwise every href="/ and src="/
+            of the finished page is rewritten
         
-    # Read the template
-    with open(template_path, 'r') as f:
-        template = f.read()
+    Returns:
+        str: The finished page
+    """
+    if urls is not None:
+        template = urls.template(template)
+    # The title is the h1's text as written, escaped like the h1 itself
+    template = template.replace('{{ Title }}', escape_text(title))
+    template = template.replace('{{ TOC }}', toc)
+    if stats is not None:
+        template = _fill_variables(template, stats.variables())
+    template = template.replace('{{ Content }}', content)
+    template = template.replace('{{ css_path }}', css_path)
+    if urls is not None:
+        return template
+    return _rewrite_urls(template, base_path, asset_base_path)
+
+def _fill_variables(template, variables):
+    for name, value in variables.items():
+        template = template.replace(name, value)
+    return template
+
+def _write_targets(targets, renderers, results, title, writer):
+    # Extra outputs rendered in the same pass as the page, see OutputTarget
+    for (target, to_path), renderer, content in zip(targets, renderers, results):
+        writer.write(to_path, renderer.fill(target.template(), title, content))
+
+def _default_output_dir(to_path, template_path):
+    # The site is taken to be built into a directory beside the template,
+    # like docs/, as in the standard layout
+    template_dir = os.path.dirname(os.path.abspath(template_path))
+    parts = os.path.relpath(os.path.abspath(to_path), template_dir).split(os.sep)
+    return os.path.join(template_dir, parts[0]) if len(parts) > 1 else template_dir
+
+def render_page(markdown, template, css_path, base_path="/", highlighter=None, minifier=None, targets=None, toc=None, stats=None, diagnostics=None, from_path=None, metrics=None, urls=None):
+    """
+    Render a markdown page into its template without touching the disk, so
+    a pipeline can read and write pages on other threads.
+    
+    Args:
+        markdown (str): The page source
+        template (str): The template text
+        css_path (str): The stylesheet URL
+        base_path (str): Base path for URLs (default: "/")
+        highlighter (Highlighter): Code block highlighter
+        minifier (Minifier): If given, the template and the rendered content
+            are minified
+        targets (list[tuple[OutputTarget, str]]): Extra outputs rendered
+            from the same parse
+        toc (TableOfContents): Collects the page's headings if given
+        stats (PageStats): Collects the page's stats if given
+        diagnostics (Diagnostics): See generate_page()
+        from_path (str): The source file, titling the page if it has no h1
+        metrics (Metrics): Counts blocks by type and inline nodes
+        urls (PageUrls): Resolves the page's site-absolute URLs, in the
+            content and the template, see UrlResolver.for_page() (default:
+            base_path in place of the leading "/")
         
+    Returns:
+        tuple[str, str, list[str]]: The title, the finished page and the
+        finished content of each target
+    """
+    targets = targets or []
+    if urls is None:
+        urls = UrlResolver(base_path).for_page("")
+    renderers = [target.renderer() for target, _ in targets]
+    if toc is None:
+        toc = TableOfContents()
+    if stats is None:
+        stats = PageStats()
+    if minifier is not None:
+        template = minifier.html(template)
+    
+    # Front matter is for the build, not part of the content
+    _, markdown = split_front_matter(markdown, diagnostics)
+    
     # Convert markdown to HTML
-    html_node = markdown_to_htmlnode(markdown)
-    html = html_node.to_html()
+    html_node = markdown_to_htmlnode(markdown, highlighter, toc, stats, diagnostics=diagnostics, metrics=metrics, urls=urls)
+    if renderers:
+        # One walk of the tree feeds the page and every extra target
+        html, *results = render_tree(html_node, [HtmlRenderer()] + renderers)
+    else:
+        html, results = html_node.to_html(), []
+    if minifier is not None:
+        html = minifier.html(html)
     
     # Get the title from the first line of markdown
-    title = extract_title(markdown)
+    title = _title(extract_title, markdown, from_path, diagnostics)
     
     # Replace placeholders in template
-    template = template.replace('{{ Title }}', title)
-    template = template.replace('{{ Content }}', html)
-    template = template.replace('{{ css_path }}', css_path)
-    
-    # Replace absolute URLs with base path
-    template = template.replace('href="/', f'href="{base_path}')
-    template = template.replace('src="/', f'src="{base_path}')
-    
-    # Write the output file
-    os.makedirs(os.path.dirname(to_path), exist_ok=True)
-    with open(to_path, 'w') as f:
-        f.write(template)
+    page = fill_template(template, title, html, css_path, toc=toc.to_html(), stats=stats, urls=urls)
+    results = [
+        renderer.fill(target.template(), title, content)
+        for (target, _), renderer, content in zip(targets, renderers, results)
+    ]
+    return title, page, results
 
-def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, base_path="/"):
+def generate_page(from_path, template_path, to_path, base_path="/", writer=None, highlighter=None, minifier=None, stream=None, template=None, targets=None, toc=None, stats=None, diagnostics=None, metrics=None, urls=None, output_dir=None):
     """
-    Recursively generate HTML pages from markdown files in a directory.
+    Generate an HTML page from a markdown file.
     
     Args:
-        dir_path_content (str): Path to the content directory
+        from_path (str): Path to the markdown file
         template_path (str): Path to the template file
-        dest_dir_path (str): Path to the destination directory
+        to_path (str): Path where the HTML file will be written
         base_path (str): Base path for URLs (default: "/")
+        writer (OutputWriter): Writer used for the output file (default: a
+            new writer rooted at output_dir)
+        highlighter (Highlighter): Code block highlighter (default: the
+            shared in-memory highlighter)
+        minifier (Minifier): If given, the template and the rendered content
+            are minified
+        stream (bool): Render block by block so memory use is bounded by the
+            largest block rather than the file (default: only for files of
+            STREAM_THRESHOLD bytes or more)
+        template (str): Contents of template_path, if already loaded
+        targets (list[tuple[OutputTarget, str]]): Extra outputs rendered
+            from the same parse, each with the path to write it to
+        toc (TableOfContents): Collects the page's headings if given; the
+            template's {{ TOC }} is filled from it either way
+        stats (PageStats): Collects the page's word count, reading time and
+            excerpt if given; the template's variables for them are filled
+            either way
+        diagnostics (Diagnostics): If given, problems in the page are
+            reported there and the page is still written, titled after its
+            file if it has no h1; otherwise they raise ValueError
+        metrics (Metrics): Counts blocks by type and inline nodes
+        urls (PageUrls): Resolves the page's URLs and gives its stylesheet
+            path (default: base_path in place of the leading "/", and the
+            stylesheet at output_dir)
+        output_dir (str): The site's root directory, holding index.css
+            (default: the writer's root, or without a writer the top
+            directory of to_path beside the template, like docs/)
+            
+    Returns:
+        str: The page title
     """
-    # Convert paths to Path objects for easier manipulation
-    content_path = Path(dir_path_content)
-    dest_path = Path(dest_dir_path)
-    
-    # Walk through all files and directories in content_path
-    for item in content_path.rglob("*.md"):
-        # Get the relative path from content directory
-        rel_path = item.relative_to(content_path)
-        
-        # Create the destination path with .html extension
-        dest_file = dest_path / rel_path.with_suffix('.html')
-        
-        # Generate the HTML page
-        generate_page(str(item), template_path, str(dest_file), base_path)
\ No newline at end of file
+    print(f"Generating page from {from_path} to {to_path} using {template_path}")
+    
+    # Read the template
+    if template is None:
+        with open(template_path, 'r') as f:
+            template = f.read()
+    
+    if output_dir is None:
+        output_dir = writer.root if writer is not None else _default_output_dir(to_path, template_path)
+    if writer is None:
+        writer = OutputWriter(output_dir)
+    if urls is None:
+        # Paths are relative to the output root, wherever the template is
+        urls = UrlResolver(base_path).for_page(Path(os.path.relpath(to_path, output_dir)).as_posix())
+    css_path = urls.css_path
+    if stream is None:
+        stream = os.path.getsize(from_path) >= STREAM_THRESHOLD
+    targets = targets or []
+    if stream:
+        if minifier is not None:
+            template = minifier.html(template)
+        renderers = [target.renderer() for target, _ in targets]
+        if toc is None:
+            toc = TableOfContents()
+        if stats is None:
+            stats = PageStats()
+        return _generate_page_streaming(from_path, template, to_path, css_path, urls, writer, highlighter, minifier, targets, renderers, toc, stats, diagnostics, metrics)
+    
+    # Read the markdown file
+    with open(from_path, 'r') as f:
+        markdown = f.read()
+    
+    title, page, results = render_page(markdown, template, css_path, base_path, highlighter, minifier, targets, toc, stats, diagnostics, from_path, metrics, urls)
+    
+    # Write the output files, skipping them if the bytes are unchanged
+    writer.write(to_path, page)
+    for (_, path), content in zip(targets, results):
+        writer.write(path, content)
+    return title
+
+def _prescan(from_path, highlighter, stats=None):
+    # Variables above the content are written before any block is rendered,
+    # so collect them in a quick pass over the source first: the headings
+    # only, or with stats every block but code, which adds no words
+    toc = TableOfContents()
+    with open(from_path, 'r') as f:
+        for block in iter_blocks(blank_front_matter(f)):
+            if stats is not None and not block.startswith("```"):
+                block_to_html_node(block, highlighter, toc, stats)
+            elif block.startswith("#") and block_to_block_type(block) == BlockType.HEADING:
+                block_to_html_node(block, highlighter, toc)
+    return toc
+
+def _title(extract, source, from_path, diagnostics):
+    try:
+        return extract(source)
+    except ValueError as e:
+        if diagnostics is None:
+            raise
+        diagnostics.error(str(e))
+        return Path(from_path).stem
+
+def _iter_nodes(f, highlighter, toc, stats, diagnostics, metrics, urls):
+    footnotes = Footnotes()
+    for line, block in iter_numbered_blocks(f):
+        if diagnostics is not None:
+            diagnostics.at_block(line, block)
+        node = block_to_html_node(block, highlighter, toc, stats, footnotes, diagnostics, metrics, urls)
+        if node is not None:
+            yield node
+    # Definitions were collected along the way; they go after the last block
+    footnote_list = footnotes.to_htmlnode(diagnostics)
+    if footnote_list is not None:
+        yield footnote_list
+
+def _generate_page_streaming(from_path, template, to_path, css_path, urls, writer, highlighter, minifier, targets, renderers, toc, stats, diagnostics, metrics):
+    """
+    Render a page one block at a time, producing the same bytes as the
+    in-memory path of generate_page(). Only the HTML is streamed; extra
+    targets are built up in memory as the blocks go by.
+    """
+    title = _title(extract_title_from_file, from_path, from_path, diagnostics)
+    head, _, tail = urls.template(template).partition('{{ Content }}')
+    head = head.replace('{{ Title }}', escape_text(title)).replace('{{ css_path }}', css_path)
+    tail = tail.replace('{{ Title }}', escape_text(title)).replace('{{ css_path }}', css_path)
+    if any(name in head for name in TEMPLATE_VARIABLES):
+        head_stats = PageStats(stats.excerpt_length)
+        head_toc = _prescan(from_path, highlighter, head_stats)
+        head = _fill_variables(head.replace('{{ TOC }}', head_toc.to_html()), head_stats.variables())
+    elif '{{ TOC }}' in head:
+        head = head.replace('{{ TOC }}', _prescan(from_path, highlighter).to_html())
+    
+    root = ParentNode("div", [])
+    for renderer in renderers:
+        renderer.enter(root)
+    
+    with open(from_path, 'r') as f, writer.open(to_path) as out:
+        out.write(head)
+        out.write("<div>")
+        for node in _iter_nodes(blank_front_matter(f), highlighter, toc, stats, diagnostics, metrics, urls):
+            walk_tree(node, renderers)
+            html = node.to_html()
+            if minifier is not None:
+                html = minifier.html(html, cached=False)
+            out.write(html)
+        out.write("</div>")
+        out.write(_fill_variables(tail.replace('{{ TOC }}', toc.to_html()), stats.variables()))
+    
+    if renderers:
+        for renderer in renderers:
+            renderer.leave(root)
+        results = [renderer.result() for renderer in renderers]
+        _write_targets(targets, renderers, results, title, writer)
+    return title
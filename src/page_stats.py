@@ -0,0 +1,135 @@
+import json
+import math
+
+from escape import escape_text
+
+PAGE_INDEX_NAME = "page-index.json"
+
+WORDS_PER_MINUTE = 200
+EXCERPT_LENGTH = 200
+
+# Template variables filled from PageStats, see PageStats.variables()
+TEMPLATE_VARIABLES = ("{{ WordCount }}", "{{ ReadingTime }}", "{{ Excerpt }}")
+
+class PageStats:
+    """
+    Word count, reading time and excerpt of one page, collected from the
+    text leaves as text_node_to_html_node() produces them.
+
+    Words are counted in every block except code blocks. The excerpt is
+    taken from paragraphs only, so the title and other headings stay out
+    of it, and stops collecting text once it has excerpt_length characters.
+
+    Args:
+        excerpt_length (int): Target length of the excerpt in characters
+    """
+
+    def __init__(self, excerpt_length=EXCERPT_LENGTH):
+        self.words = 0
+        self.excerpt_length = excerpt_length
+        self._joined = False
+        self._in_paragraph = False
+        self._excerpt = []
+        self._excerpt_size = 0
+
+    def start_block(self, paragraph):
+        """
+        Note that a new block starts; words never run across blocks.
+
+        Args:
+            paragraph (bool): Whether the block's text belongs in the excerpt
+        """
+        self.break_words()
+        self._in_paragraph = paragraph and self._excerpt_size < self.excerpt_length
+        if self._in_paragraph and self._excerpt:
+            self._excerpt.append(" ")
+            self._excerpt_size += 1
+
+    def break_words(self):
+        """Note that the next text does not continue the last word, e.g. in a new list item."""
+        self._joined = False
+
+    def add_text(self, text):
+        """
+        Count the words of one text leaf and feed the excerpt.
+
+        Args:
+            text (str): The leaf's text
+        """
+        if not text:
+            return
+        words = len(text.split())
+        # "foo**bar**" is one word split over two leaves
+        if words and self._joined and not text[0].isspace():
+            words -= 1
+        self.words += words
+        self._joined = not text[-1].isspace()
+
+        if self._in_paragraph:
+            self._excerpt.append(text)
+            self._excerpt_size += len(text)
+            if self._excerpt_size >= self.excerpt_length:
+                self._in_paragraph = False
+
+    @property
+    def reading_time(self):
+        """Minutes to read the page, at least 1."""
+        return max(1, math.ceil(self.words / WORDS_PER_MINUTE))
+
+    @property
+    def excerpt(self):
+        """Plain-text excerpt, cut at a word boundary and ending in an ellipsis if shortened."""
+        text = " ".join("".join(self._excerpt).split())
+        if len(text) <= self.excerpt_length:
+            return text
+        cut = text.rfind(" ", 0, self.excerpt_length + 1)
+        text = text[:cut if cut > 0 else self.excerpt_length]
+        return text.rstrip(" ,.;:") + "…"
+
+    def variables(self):
+        """Return the template variables, with the excerpt escaped for HTML."""
+        return {
+            "{{ WordCount }}": str(self.words),
+            "{{ ReadingTime }}": str(self.reading_time),
+            "{{ Excerpt }}": escape_text(self.excerpt),
+        }
+
+    def to_dict(self):
+        return {"words": self.words, "reading_time": self.reading_time, "excerpt": self.excerpt}
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild the stats of a page rendered earlier, see to_dict()."""
+        stats = cls()
+        stats.words = data["words"]
+        stats._excerpt = [data["excerpt"]]
+        stats._excerpt_size = len(data["excerpt"])
+        # A shortened excerpt ends in "…" past the limit; keep it as it is
+        stats.excerpt_length = max(stats.excerpt_length, stats._excerpt_size)
+        return stats
+
+def build_page_index(pages, base_path="/"):
+    """
+    Build a site-wide listing of pages for listing pages and feeds.
+
+    Args:
+        pages (iterable[PageInfo]): Rendered pages with their stats
+        base_path (str): Base path for URLs (default: "/")
+
+    Returns:
+        dict: A "pages" list of url, title, words, reading_time and
+            excerpt, and the front matter date of pages that have one
+    """
+    index = []
+    for page in sorted(pages, key=lambda page: page.url):
+        entry = {"url": base_path + page.url[1:], "title": page.title}
+        if page.stats is not None:
+            entry.update(page.stats.to_dict())
+        if page.meta is not None and page.meta.date is not None:
+            entry["date"] = page.meta.date.isoformat()
+        index.append(entry)
+    return {"pages": index}
+
+def page_index_to_json(index):
+    """Serialize a page index to stable JSON."""
+    return json.dumps(index, indent=2, sort_keys=True, ensure_ascii=False) + "\n"
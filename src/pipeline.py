@@ -0,0 +1,107 @@
+import queue
+import threading
+from collections import deque
+
+# Items each stage may run ahead of the next, bounding memory to a few
+# pages at a time
+PIPELINE_DEPTH = 8
+
+_DONE = object()
+
+class _Failure:
+    """Carries an exception from a stage's thread to the caller."""
+
+    def __init__(self, error):
+        self.error = error
+
+def _put(q, value, stop):
+    # A plain put() blocks forever if the consumer has given up
+    while not stop.is_set():
+        try:
+            q.put(value, timeout=0.1)
+            return
+        except queue.Full:
+            continue
+
+def run_pipeline(items, read, render, write, executor=None, depth=PIPELINE_DEPTH):
+    """
+    Push items through three stages joined by bounded queues, so reading
+    and writing files overlap with rendering. read() runs on a reader
+    thread, render() on the calling thread or in executor, and write() on
+    a writer thread, in the order of items.
+
+    Args:
+        items (iterable): The work items
+        read (callable): item -> value, does the input I/O
+        render (callable): value -> value, the CPU work; must be picklable
+            when executor is a process pool
+        write (callable): value -> None, does the output I/O
+        executor (Executor): If given, render() calls are submitted to it,
+            at most depth at a time
+        depth (int): Size of each queue between stages
+
+    Raises:
+        Exception: The first error raised by any stage; the other stages
+            stop early
+    """
+    read_queue = queue.Queue(depth)
+    write_queue = queue.Queue(depth)
+    stop = threading.Event()
+    write_error = []
+
+    def reader():
+        try:
+            for item in items:
+                if stop.is_set():
+                    return
+                _put(read_queue, read(item), stop)
+            _put(read_queue, _DONE, stop)
+        except BaseException as e:
+            _put(read_queue, _Failure(e), stop)
+
+    def writer():
+        while True:
+            value = write_queue.get()
+            if value is _DONE:
+                return
+            if write_error:
+                # Keep draining so the render stage never blocks
+                continue
+            try:
+                write(value)
+            except BaseException as e:
+                write_error.append(e)
+                stop.set()
+
+    threads = [threading.Thread(target=reader, daemon=True), threading.Thread(target=writer, daemon=True)]
+    for thread in threads:
+        thread.start()
+    pending = deque()
+    try:
+        while not write_error:
+            try:
+                value = read_queue.get(timeout=0.1)
+            except queue.Empty:
+                # The reader stops early if the writer failed
+                continue
+            if value is _DONE:
+                break
+            if isinstance(value, _Failure):
+                raise value.error
+            if executor is None:
+                write_queue.put(render(value))
+                continue
+            pending.append(executor.submit(render, value))
+            if len(pending) >= depth:
+                write_queue.put(pending.popleft().result())
+        while pending and not write_error:
+            write_queue.put(pending.popleft().result())
+    finally:
+        stop.set()
+        for future in pending:
+            future.cancel()
+        write_queue.put(_DONE)
+        for thread in threads:
+            thread.join()
+    if write_error:
+        raise write_error[0]
@@ -0,0 +1,312 @@
+import os
+import json
+import asyncio
+import logging
+import argparse
+import mimetypes
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from build_state import snapshot
+from session import BuildConfig, BuildSession
+
+EVENTS_PATH = "/__livereload"
+# The session's build metrics, in the Prometheus text format or, with
+# ?format=json, as JSON
+METRICS_PATH = "/__metrics"
+
+# Clients whose socket buffer grows past this are too slow and are dropped
+MAX_CLIENT_BUFFER = 256 * 1024
+
+# Appended to every HTML page served. Pages reload only when their own URL
+# changed; stylesheets are swapped in place by bumping a query string.
+CLIENT_SCRIPT = """<script>
+(function () {
+  var source = new EventSource("%s");
+  function here(urls) {
+    var path = location.pathname;
+    return urls.some(function (url) {
+      return url === path || url === path + "/" || url + "index.html" === path;
+    });
+  }
+  source.addEventListener("reload", function (e) {
+    if (here(JSON.parse(e.data).urls)) location.reload();
+  });
+  source.addEventListener("css", function (e) {
+    var urls = JSON.parse(e.data).urls;
+    document.querySelectorAll('link[rel="stylesheet"]').forEach(function (link) {
+      var url = new URL(link.href);
+      if (urls.indexOf(url.pathname) < 0) return;
+      url.searchParams.set("livereload", Date.now());
+      link.href = url.href;
+    });
+  });
+})();
+</script>
+""" % EVENTS_PATH
+
+def output_url(output_dir, path):
+    """
+    Return the URL an output file is served at.
+
+    Args:
+        output_dir (str): The directory the site is built into
+        path (str): An output file under output_dir
+
+    Returns:
+        str: The URL path, with index.html reduced to its directory
+    """
+    rel_path = os.path.relpath(path, output_dir).replace(os.sep, "/")
+    if rel_path == "index.html":
+        return "/"
+    if rel_path.endswith("/index.html"):
+        return "/" + rel_path[:-len("index.html")]
+    return "/" + rel_path
+
+def reload_events(output_dir, changed):
+    """
+    Turn the outputs a rebuild changed into live-reload events.
+
+    Stylesheets get a "css" event so pages can swap them in place; every
+    other output gets a "reload" event for its own URL only.
+
+    Args:
+        output_dir (str): The directory the site is built into
+        changed (list[str]): Output files written or deleted
+
+    Returns:
+        list[tuple[str, dict]]: (event name, data) pairs, possibly empty
+    """
+    css, reload = [], []
+    for path in changed:
+        url = output_url(output_dir, path)
+        (css if url.endswith(".css") else reload).append(url)
+    events = []
+    if reload:
+        events.append(("reload", {"urls": sorted(set(reload))}))
+    if css:
+        events.append(("css", {"urls": sorted(set(css))}))
+    return events
+
+class LiveReloadHub:
+    """
+    The open server-sent event streams of a preview server.
+
+    Each event is encoded once and written to every client without waiting
+    on any of them; clients that stop reading are dropped instead of
+    holding up the others.
+    """
+
+    def __init__(self, max_buffer=MAX_CLIENT_BUFFER):
+        self.clients = set()
+        self.max_buffer = max_buffer
+
+    def add(self, writer):
+        self.clients.add(writer)
+
+    def discard(self, writer):
+        self.clients.discard(writer)
+
+    def broadcast(self, event, data):
+        """
+        Send one event to every connected client.
+
+        Args:
+            event (str): The event name
+            data (dict): The event payload, sent as JSON
+
+        Returns:
+            int: The number of clients the event was sent to
+        """
+        message = f"event: {event}\ndata: {json.dumps(data)}\n\n".encode("utf-8")
+        sent = 0
+        for writer in list(self.clients):
+            transport = writer.transport
+            if transport.is_closing() or transport.get_write_buffer_size() > self.max_buffer:
+                self.discard(writer)
+                transport.abort()
+                continue
+            writer.write(message)
+            sent += 1
+        return sent
+
+class PreviewServer:
+    """
+    Serve a built site over HTTP and rebuild it as its sources change,
+    pushing live-reload events to open pages.
+
+    Sources are checked every interval seconds; a rebuild goes through
+    BuildSession.rebuild(), so only pages that depend on a changed file are
+    rendered and only their URLs are reloaded.
+
+    Args:
+        session (BuildSession): The session that builds the site
+        interval (float): Seconds between checks of the sources
+    """
+
+    def __init__(self, session, interval=0.25):
+        self.session = session
+        self.interval = interval
+        self.hub = LiveReloadHub()
+        config = session.config
+        self.root = os.path.abspath(config.output_dir)
+        self.sources = [config.content_dir, config.static_dir, config.template_path]
+        self._stamps = snapshot(self.sources)
+
+    async def serve(self, host="127.0.0.1", port=8888):
+        """Serve until cancelled."""
+        server = await asyncio.start_server(self._handle, host, port)
+        watcher = asyncio.create_task(self._watch())
+        logging.info(f"Serving {self.root} on http://{host}:{port}/")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            watcher.cancel()
+
+    async def _watch(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.check()
+            except Exception:
+                logging.exception("Rebuild failed")
+
+    async def check(self):
+        """
+        Rebuild whatever changed since the last check and notify clients.
+
+        Returns:
+            list[tuple[str, dict]]: The events sent
+        """
+        stamps = await asyncio.to_thread(snapshot, self.sources)
+        changed = [path for path in stamps.keys() | self._stamps.keys()
+                   if stamps.get(path) != self._stamps.get(path)]
+        self._stamps = stamps
+        if not changed:
+            return []
+        result = await asyncio.to_thread(self.session.rebuild, sorted(changed))
+        logging.info(f"Rebuilt: {result.summary()}")
+        events = reload_events(self.root, result.writer.changed)
+        for event, data in events:
+            self.hub.broadcast(event, data)
+        return events
+
+    async def _handle(self, reader, writer):
+        try:
+            request_line = await reader.readline()
+            # Headers are not needed; read past them
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            parts = request_line.decode("latin-1").split()
+            if len(parts) != 3:
+                return
+            url = urlsplit(parts[1])
+            method, target = parts[0], url.path
+            if method not in ("GET", "HEAD"):
+                await self._respond(writer, 405, b"Method not allowed")
+            elif target == EVENTS_PATH:
+                await self._stream_events(reader, writer)
+            elif target == METRICS_PATH:
+                await self._serve_metrics(writer, "json" in parse_qs(url.query).get("format", []), method == "HEAD")
+            else:
+                await self._serve_file(writer, unquote(target), method == "HEAD")
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _stream_events(self, reader, writer):
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type: text/event-stream\r\n"
+            b"Cache-Control: no-cache\r\n"
+            b"Connection: keep-alive\r\n\r\n"
+            b"retry: 1000\n\n"
+        )
+        await writer.drain()
+        self.hub.add(writer)
+        try:
+            # EventSource never sends anything, so EOF means the tab is gone
+            await reader.read()
+        finally:
+            self.hub.discard(writer)
+
+    async def _serve_metrics(self, writer, as_json, head_only):
+        metrics = self.session.metrics
+        if as_json:
+            body, content_type = metrics.to_json(), "application/json"
+        else:
+            body, content_type = metrics.to_prometheus(), "text/plain; version=0.0.4"
+        await self._respond(writer, 200, body.encode("utf-8"), {"Content-Type": content_type}, head_only)
+
+    async def _serve_file(self, writer, target, head_only):
+        path = os.path.normpath(os.path.join(self.root, target.lstrip("/")))
+        if os.path.commonpath([path, self.root]) != self.root:
+            await self._respond(writer, 404, b"Not found")
+            return
+        if os.path.isdir(path):
+            if not target.endswith("/"):
+                await self._respond(writer, 301, b"", {"Location": target + "/"})
+                return
+            path = os.path.join(path, "index.html")
+        try:
+            with open(path, 'rb') as f:
+                body = f.read()
+        except OSError:
+            await self._respond(writer, 404, b"Not found")
+            return
+        content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        if content_type == "text/html":
+            body = _inject_script(body)
+            content_type += "; charset=utf-8"
+        await self._respond(writer, 200, body, {"Content-Type": content_type}, head_only)
+
+    @staticmethod
+    async def _respond(writer, status, body, headers=None, head_only=False):
+        reasons = {200: "OK", 301: "Moved Permanently", 404: "Not Found", 405: "Method Not Allowed"}
+        lines = [f"HTTP/1.1 {status} {reasons[status]}", f"Content-Length: {len(body)}",
+                 "Cache-Control: no-cache", "Connection: close"]
+        lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        if not head_only:
+            writer.write(body)
+        await writer.drain()
+
+def _inject_script(html):
+    script = CLIENT_SCRIPT.encode("utf-8")
+    index = html.rfind(b"</body>")
+    if index < 0:
+        return html + script
+    return html[:index] + script + html[index:]
+
+def main(argv=None):
+    """Command line entry point: serve docs/ with live reload."""
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    parser = argparse.ArgumentParser(description="Serve the built site and reload pages as sources change.")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8888, help="port to listen on (default: 8888)")
+    parser.add_argument("--minify", action="store_true", help="minify HTML pages and CSS assets")
+    parser.add_argument("--only", action="append", default=[], metavar="GLOB",
+                        help="build only the pages whose path under content/ matches GLOB (repeatable)")
+    parser.add_argument("--section", action="append", default=[], metavar="NAME",
+                        help="build only the pages under content/NAME/ (repeatable)")
+    parser.add_argument("--drafts", action="store_true", help="also build draft pages")
+    parser.add_argument("--future", action="store_true", help="also build pages dated after today")
+    args = parser.parse_args(argv)
+
+    config = BuildConfig.from_root(
+        root_dir,
+        minify=args.minify,
+        include=args.only + [f"{section.strip('/')}/*" for section in args.section],
+        drafts=args.drafts,
+        future=args.future,
+    )
+    with BuildSession(config) as session:
+        try:
+            asyncio.run(PreviewServer(session).serve(args.host, args.port))
+        except KeyboardInterrupt:
+            pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+import os
+import re
+import json
+import html
+
+from escape import Markup
+from htmlnode import LeafNode
+
+# Tags that end a line of text in the plain-text digest
+_TEXT_BLOCKS = {"p", "pre", "quote", "blockquote", "ul", "ol", "table", "h1", "h2", "h3", "h4", "h5", "h6"}
+_TAGS = re.compile(r"<[^>]*>")
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+class Renderer:
+    """
+    One output backend driven by render_tree().
+
+    The tree is walked once for all renderers: enter() and leave() are
+    called around the children of every ParentNode, leaf() for every
+    LeafNode, and result() once at the end.
+    """
+
+    name = None
+    extension = None
+    # Used when a target has no template file of its own
+    default_template = "{{ Content }}"
+
+    def enter(self, node):
+        pass
+
+    def leave(self, node):
+        pass
+
+    def leaf(self, node):
+        pass
+
+    def result(self):
+        raise NotImplementedError
+
+    def fill(self, template, title, content):
+        """
+        Substitute a rendered page into a template.
+
+        Args:
+            template (str): The target's template
+            title (str): The page title
+            content: What result() returned
+
+        Returns:
+            str: The output file's text
+        """
+        return template.replace("{{ Title }}", title).replace("{{ Content }}", content)
+
+class HtmlRenderer(Renderer):
+    """Serialize the tree as HTML, byte for byte the same as to_html()."""
+
+    name = "html"
+    extension = ".html"
+
+    def __init__(self):
+        self.parts = []
+
+    def enter(self, node):
+        props = node.props_to_html()
+        self.parts.append(f"<{node.tag}{' ' + props if props else ''}>")
+
+    def leave(self, node):
+        self.parts.append(f"</{node.tag}>")
+
+    def leaf(self, node):
+        self.parts.append(node.to_html())
+
+    def result(self):
+        return "".join(self.parts)
+
+class TextRenderer(Renderer):
+    """Render a plain-text digest: one paragraph per block, no markup."""
+
+    name = "text"
+    extension = ".txt"
+    # The title is the page's h1, which is part of the content already
+    default_template = "{{ Content }}\n"
+
+    def __init__(self):
+        self.parts = []
+
+    def enter(self, node):
+        if node.tag == "li":
+            self.parts.append("- ")
+
+    def leave(self, node):
+        if node.tag == "tr" and self.parts and self.parts[-1] == "\t":
+            # Cells are tab-separated, with no tab after the last one
+            self.parts[-1] = "\n"
+        elif node.tag in ("li", "tr"):
+            self.parts.append("\n")
+        elif node.tag in ("th", "td"):
+            self.parts.append("\t")
+        elif node.tag in _TEXT_BLOCKS:
+            self.parts.append("\n\n")
+
+    def leaf(self, node):
+        if node.tag == "img":
+            self.parts.append(node.props["alt"])
+        elif node.tag == "input":
+            self.parts.append("[x]" if "checked" in node.props else "[ ]")
+        else:
+            self.parts.append(_leaf_text(node))
+
+    def result(self):
+        return _BLANK_LINES.sub("\n\n", "".join(self.parts)).strip()
+
+class JsonRenderer(Renderer):
+    """
+    Render the tree as JSON: every element is an object with a "tag",
+    optional "props" and either "children" or "text".
+    """
+
+    name = "json"
+    extension = ".json"
+    default_template = '{"title": {{ Title }}, "content": {{ Content }}}\n'
+
+    def __init__(self):
+        self.stack = [[]]
+
+    def enter(self, node):
+        self.stack.append([])
+
+    def leave(self, node):
+        children = self.stack.pop()
+        self.stack[-1].append(_element(node, children=children))
+
+    def leaf(self, node):
+        self.stack[-1].append(_element(node, text=_leaf_text(node)))
+
+    def result(self):
+        return self.stack[0][0] if len(self.stack[0]) == 1 else self.stack[0]
+
+    def fill(self, template, title, content):
+        # Values are substituted as JSON so the template stays valid JSON
+        return super().fill(template, json.dumps(title), json.dumps(content, ensure_ascii=False))
+
+def _leaf_text(node):
+    if isinstance(node.value, Markup):
+        # Highlighted code: drop the markup, keep the code
+        return html.unescape(_TAGS.sub("", node.value))
+    return node.value
+
+def _element(node, **content):
+    element = {"tag": node.tag}
+    if node.props:
+        element["props"] = {key: str(value) for key, value in node.props.items()}
+    element.update(content)
+    return element
+
+RENDERERS = {renderer.name: renderer for renderer in (HtmlRenderer, TextRenderer, JsonRenderer)}
+
+def render_tree(node, renderers):
+    """
+    Walk a parsed tree once, driving every renderer in the same pass.
+
+    Args:
+        node (HTMLNode): Root of the tree, e.g. from markdown_to_htmlnode()
+        renderers (list[Renderer]): The backends to drive
+
+    Returns:
+        list: Each renderer's result(), in order
+    """
+    walk_tree(node, renderers)
+    return [renderer.result() for renderer in renderers]
+
+def walk_tree(node, renderers):
+    """
+    Feed a tree to renderers without collecting their results, e.g. to
+    render a document one block at a time.
+
+    Args:
+        node (HTMLNode): Root of the (sub)tree
+        renderers (list[Renderer]): The backends to drive
+    """
+    if isinstance(node, LeafNode):
+        for renderer in renderers:
+            renderer.leaf(node)
+        return
+    for renderer in renderers:
+        renderer.enter(node)
+    for child in node.children:
+        walk_tree(child, renderers)
+    for renderer in renderers:
+        renderer.leave(node)
+
+class OutputTarget:
+    """
+    An extra output built from the same parse as the HTML pages.
+
+    Args:
+        name (str): A key of RENDERERS, e.g. "json" or "text"
+        output_dir (str): Directory this target's files are written to,
+            mirroring the content directory
+        template_path (str): Template for every file of this target
+            (default: the renderer's built-in template)
+
+    Raises:
+        ValueError: If there is no renderer called name
+    """
+
+    def __init__(self, name, output_dir, template_path=None):
+        if name not in RENDERERS:
+            raise ValueError(f"Unknown output target: {name}")
+        self.name = name
+        self.renderer_class = RENDERERS[name]
+        self.output_dir = output_dir
+        self.template_path = template_path
+        self._template = None
+
+    @classmethod
+    def from_root(cls, root_dir, name):
+        """
+        Build a target for the standard layout: written to docs/<name>/,
+        with template<extension> under root_dir as its template if present.
+
+        Args:
+            root_dir (str): The site's root directory
+            name (str): A key of RENDERERS
+        """
+        if name not in RENDERERS:
+            raise ValueError(f"Unknown output target: {name}")
+        template_path = os.path.join(root_dir, "template" + RENDERERS[name].extension)
+        return cls(name, os.path.join(root_dir, "docs", name),
+                   template_path if os.path.isfile(template_path) else None)
+
+    def renderer(self):
+        """Return a fresh renderer for one page."""
+        return self.renderer_class()
+
+    def output_path(self, rel_path):
+        """
+        Return where the page at rel_path (relative to the content
+        directory) is written for this target.
+        """
+        rel_path = os.path.splitext(rel_path)[0] + self.renderer_class.extension
+        return os.path.join(self.output_dir, rel_path)
+
+    def template_stamp(self):
+        """What the template was loaded from, for freshness checks."""
+        if self.template_path is None:
+            return None
+        st = os.stat(self.template_path)
+        return (st.st_mtime_ns, st.st_size)
+
+    def template(self):
+        """Return the template text, re-reading the file only when it changed."""
+        if self.template_path is None:
+            return self.renderer_class.default_template
+        stamp = self.template_stamp()
+        if self._template is None or self._template[0] != stamp:
+            with open(self.template_path, 'r') as f:
+                self._template = (stamp, f.read())
+        return self._template[1]
+
+    def __repr__(self):
+        return f"OutputTarget({self.name}, {self.output_dir})"
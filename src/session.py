@@ -0,0 +1,982 @@
+import os
+import json
+import time
+import fnmatch
+import hashlib
+import datetime
+import logging
+from functools import partial
+from pathlib import Path
+
+from cache import DiskCache, cache_key, generator_version
+from diagnostics import Diagnostic, Diagnostics, summarize
+from extensions import default_registry
+from front_matter import PageMeta, read_front_matter
+from highlight import Highlighter
+from manifest import MANIFEST_NAME, build_manifest, manifest_to_json
+from markdown_parser import markdown_to_htmlnode
+from metrics import Metrics
+from minify import Minifier
+from output_writer import OutputWriter
+from page import STREAM_THRESHOLD, generate_page, render_page
+from pipeline import run_pipeline
+from page_stats import PAGE_INDEX_NAME, PageStats, build_page_index, page_index_to_json
+from toc import HEADING_INDEX_NAME, TableOfContents, build_heading_index, heading_index_to_json
+from urls import UrlResolver
+
+def copy_directory(src, dst, writer, minifier=None):
+    """
+    Recursively copy a directory from src to dst through an output writer.
+    Files whose bytes are unchanged in dst are left alone; files in dst that
+    the build did not produce are removed afterwards by writer.prune().
+
+    Args:
+        src (str): Source directory path
+        dst (str): Destination directory path
+        writer (OutputWriter): Writer used for every copied file
+        minifier (Minifier): If given, stylesheets are minified on the way
+    """
+    # Create destination directory
+    logging.info(f"Creating directory: {dst}")
+    writer.make_dirs([dst])
+
+    # Walk through the source directory
+    for item in sorted(os.listdir(src)):
+        src_path = os.path.join(src, item)
+        dst_path = os.path.join(dst, item)
+
+        if os.path.isfile(src_path):
+            copy_file(src_path, dst_path, writer, minifier)
+        else:
+            # Recursively copy directory
+            logging.info(f"Copying directory: {src_path} -> {dst_path}")
+            copy_directory(src_path, dst_path, writer, minifier)
+
+def copy_file(src_path, dst_path, writer, minifier=None):
+    """
+    Copy one static file through an output writer.
+
+    Args:
+        src_path (str): Source file path
+        dst_path (str): Destination file path
+        writer (OutputWriter): Writer used for the copy
+        minifier (Minifier): If given, stylesheets are minified on the way
+    """
+    logging.info(f"Copying file: {src_path} -> {dst_path}")
+    with open(src_path, 'rb') as f:
+        data = f.read()
+    if minifier is not None and src_path.endswith(".css"):
+        data = minifier.css(data.decode("utf-8"))
+    writer.write(dst_path, data)
+
+# Format of the page index kept in the cache directory between builds
+INDEX_VERSION = 1
+
+def _is_within(path, directory):
+    return os.path.commonpath([path, directory]) == directory
+
+def _stat_key(path):
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
+def _diagnostic_entries(diagnostics):
+    # A page's problems without its path, which is stored with the entry
+    entries = []
+    for item in diagnostics:
+        item = item.to_dict()
+        del item["path"]
+        entries.append(item)
+    return entries
+
+class BuildConfig:
+    """
+    Where a site's sources live, where it is built to, and how.
+
+    Args:
+        content_dir (str): Directory of markdown pages
+        static_dir (str): Directory of assets copied as is
+        template_path (str): HTML template for every page
+        output_dir (str): Directory the site is built into
+        cache_dir (str): Directory for caches kept across builds, or None
+        base_path (str): Base path for URLs (default: "/")
+        minify (bool): Minify HTML pages and CSS assets
+        stream (bool): Render every page block by block (default: only
+            huge pages)
+        manifest_path (str): Where to write the build manifest (default:
+            MANIFEST_NAME in output_dir)
+        targets (list[OutputTarget]): Extra outputs, such as JSON or plain
+            text, rendered from the same parse as the HTML pages
+        mtime (int): If given, the mtime of every output and output
+            directory, for reproducible builds; see OutputWriter
+        include (list[str]): If given, build only the pages whose path
+            relative to content_dir matches one of these glob patterns,
+            such as "blog/*". The other pages keep their outputs and index
+            entries from earlier builds, so links and listings still cover
+            the whole site
+        drafts (bool): Also build pages marked "draft: true" in their
+            front matter
+        future (bool): Also build pages whose front matter "date" is after
+            today
+        today (datetime.date): The date scheduled pages are published
+            against (default: the current date)
+        relative_urls (bool): Make the site-absolute URLs of pages and the
+            template relative to each page instead of prefixing base_path,
+            so the output works under any path or opened from disk
+        workers (int): Render pages in this many worker processes
+            (default: 1, render in the building process). Each worker has
+            its own highlighter and minifier, sharing the disk caches
+    """
+
+    def __init__(self, content_dir, static_dir, template_path, output_dir, cache_dir=None,
+                 base_path="/", minify=False, stream=None, manifest_path=None, targets=None, mtime=None,
+                 include=None, drafts=False, future=False, today=None, relative_urls=False,
+                 workers=None):
+        self.content_dir = content_dir
+        self.static_dir = static_dir
+        self.template_path = template_path
+        self.output_dir = output_dir
+        self.cache_dir = cache_dir
+        self.base_path = base_path
+        self.minify = minify
+        self.stream = stream
+        self.manifest_path = manifest_path or os.path.join(output_dir, MANIFEST_NAME)
+        self.targets = list(targets or [])
+        self.mtime = mtime
+        self.include = list(include or [])
+        self.drafts = drafts
+        self.future = future
+        self.today = today
+        self.relative_urls = relative_urls
+        self.workers = workers
+
+    @classmethod
+    def from_root(cls, root_dir, **options):
+        """
+        Build a config for the standard layout: content/, static/,
+        template.html and .cache/ under root_dir, building into docs/.
+
+        Args:
+            root_dir (str): The site's root directory
+            **options: Any other BuildConfig argument, overriding the layout
+        """
+        paths = {
+            "content_dir": os.path.join(root_dir, "content"),
+            "static_dir": os.path.join(root_dir, "static"),
+            "template_path": os.path.join(root_dir, "template.html"),
+            "output_dir": os.path.join(root_dir, "docs"),
+            "cache_dir": os.path.join(root_dir, ".cache"),
+        }
+        paths.update(options)
+        return cls(**paths)
+
+    def render_key(self):
+        """Settings that change the bytes of a rendered page."""
+        return (self.base_path, self.minify, self.relative_urls)
+
+    def includes(self, rel_path):
+        """
+        Tell whether a page is part of the build, see include.
+
+        Args:
+            rel_path (str): The page's source relative to content_dir, with
+                "/" separators
+
+        Returns:
+            bool: True if the page should be built
+        """
+        if not self.include:
+            return True
+        # fnmatch's "*" also matches "/", so "blog/*" takes the whole section
+        return any(fnmatch.fnmatchcase(rel_path, pattern) for pattern in self.include)
+
+    def publishes(self, meta):
+        """
+        Tell whether a page's front matter lets it into the build, see
+        drafts, future and today.
+
+        Args:
+            meta (PageMeta): The page's metadata
+
+        Returns:
+            bool: False for drafts and pages scheduled for later
+        """
+        return meta.is_published(self.today or datetime.date.today(), self.drafts, self.future)
+
+class PageInfo:
+    """An entry of the page index: one markdown source and its output."""
+
+    def __init__(self, source, output, url, title=None):
+        self.source = source
+        self.output = output
+        self.url = url
+        self.title = title
+        # (level, text, id) of every heading, see TableOfContents
+        self.headings = []
+        # Word count, reading time and excerpt
+        self.stats = None
+        # Problems found when the page was last rendered, see Diagnostics
+        self.diagnostics = []
+        # Front matter, read before every build of the page
+        self.meta = None
+        # What the outputs were last rendered from, and each output's
+        # (record, stat) after writing; see BuildSession._is_fresh
+        self.stamp = None
+        self.outputs = {}
+
+    def __repr__(self):
+        return f"PageInfo({self.url}, {self.title})"
+
+class BuildResult:
+    """What one BuildSession.build() call did."""
+
+    def __init__(self, writer, pages_rendered, pages_total, elapsed, minifier=None, diagnostics=None, pages_cached=0):
+        self.writer = writer
+        self.pages_rendered = pages_rendered
+        # Pages copied from the build cache instead of rendered
+        self.pages_cached = pages_cached
+        self.pages_total = pages_total
+        self.elapsed = elapsed
+        self.minifier = minifier
+        # Problems in the pages, sorted by file and line
+        self.diagnostics = diagnostics or []
+
+    def summary(self):
+        """Return a one-line summary of the build."""
+        text = (
+            f"{self.pages_rendered}/{self.pages_total} pages rendered, "
+            f"{self.writer.summary()} in {self.elapsed * 1000:.0f} ms"
+        )
+        if self.pages_cached:
+            text += f", {self.pages_cached} pages from cache"
+        if self.minifier is not None:
+            text += f", minify {self.minifier.summary()}"
+        if self.diagnostics:
+            text += f", {summarize(self.diagnostics)}"
+        return text
+
+class _PageJob:
+    """A page on its way through BuildSession.render_pages()."""
+
+    def __init__(self, page, stamp, targets, template):
+        self.page = page
+        self.stamp = stamp
+        self.targets = targets
+        self.template = template
+        # Set by the reader: the source, or the outputs from the build cache
+        self.markdown = None
+        self.key = None
+        self.cached = None
+        # Set by the renderer: the title, page and target contents, and what
+        # was collected along the way
+        self.result = None
+        self.toc = None
+        self.stats = None
+        self.diagnostics = None
+
+    def request(self):
+        """What rendering the page takes, small and picklable for worker processes."""
+        return self.page.source, self.page.output, self.markdown, self.template, self.targets
+
+def _disk_cache(config, name):
+    return DiskCache(config.cache_dir, name) if config.cache_dir else None
+
+class _Renderer:
+    """Renders the pages of a BuildSession, in its process or in a worker process."""
+
+    def __init__(self, config, highlighter, minifier, urls):
+        self.config = config
+        self.highlighter = highlighter
+        self.minifier = minifier
+        self.urls = urls
+
+    def render(self, request, metrics):
+        """
+        Render a page.
+
+        Args:
+            request (tuple): See _PageJob.request()
+            metrics (Metrics): Counts blocks and inline nodes and times the
+                render
+
+        Returns:
+            tuple: render_page()'s result, then the page's TableOfContents,
+            PageStats and Diagnostics
+        """
+        source, output, markdown, template, targets = request
+        print(f"Generating page from {source} to {output} using {self.config.template_path}")
+        toc = TableOfContents()
+        stats = PageStats()
+        diagnostics = Diagnostics(source)
+        urls = self.urls.for_page(Path(os.path.relpath(output, self.config.output_dir)).as_posix())
+        with metrics.time("page_render_seconds"):
+            result = render_page(
+                markdown, template, urls.css_path, self.config.base_path, self.highlighter, self.minifier,
+                targets, toc, stats, diagnostics, source, metrics, urls,
+            )
+        return result, toc, stats, diagnostics
+
+# The renderer of a worker process, made once when it starts rather than
+# sent with every page
+_worker_renderer = None
+
+def _init_render_worker(config):
+    global _worker_renderer
+    minifier = Minifier(cache=_disk_cache(config, "minify")) if config.minify else None
+    urls = UrlResolver(config.base_path, relative=config.relative_urls)
+    _worker_renderer = _Renderer(config, Highlighter(cache=_disk_cache(config, "highlight")), minifier, urls)
+
+def _render_in_worker(item):
+    # Returns the page's metrics and minified byte counts with it, for the
+    # session to add to its own
+    index, request = item
+    if request is None:
+        return index, None
+    minifier = _worker_renderer.minifier
+    if minifier is not None:
+        minifier.bytes_in = minifier.bytes_out = 0
+    metrics = Metrics()
+    rendered = _worker_renderer.render(request, metrics)
+    minified = None if minifier is None else (minifier.bytes_in, minifier.bytes_out)
+    return index, (rendered, metrics, minified)
+
+class BuildSession:
+    """
+    A long-lived build of one site.
+
+    The session keeps the template, the highlighter and minifier caches and
+    the page index in memory, so repeated builds in the same process only
+    re-render pages whose source, template or settings changed.
+
+    With a cache directory, rendered pages are also stored there by a hash
+    of everything they depend on, so a fresh checkout that restores the
+    directory, such as a CI run, copies unchanged pages instead of
+    rendering them.
+
+    Example:
+        session = BuildSession(BuildConfig.from_root("."))
+        print(session.build().summary())
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.highlighter = Highlighter(cache=_disk_cache(config, "highlight"))
+        self.minifier = Minifier(cache=_disk_cache(config, "minify")) if config.minify else None
+        self.urls = UrlResolver(config.base_path, relative=config.relative_urls)
+        self._renderer = _Renderer(config, self.highlighter, self.minifier, self.urls)
+        # Worker processes rendering pages, started on first use and kept
+        # for the session, so rebuilds skip their start-up
+        self._pool = None
+        # Page entries by render key; the outputs they list are stored by
+        # their own hash, so identical pages share one copy
+        self.page_cache = _disk_cache(config, "pages")
+        self.blob_cache = _disk_cache(config, "blobs")
+        self.pages_cached = 0
+        # The page index of the last build, so a build of some pages can
+        # list the others without reading them
+        self.index_path = None
+        if config.cache_dir:
+            name = f"index-{cache_key(os.path.abspath(config.output_dir))[:16]}.json"
+            self.index_path = os.path.join(config.cache_dir, name)
+        # Counters and timings of every build of this session
+        self.metrics = Metrics()
+        self.metrics.add_source(self._cache_metrics)
+        self.pages = {}
+        self._templates = {}
+
+    def template(self, path=None):
+        """
+        Return the text of a template, re-reading it only when it changed.
+
+        Args:
+            path (str): Template path (default: the configured template)
+
+        Returns:
+            str: The template text
+        """
+        path = path or self.config.template_path
+        stamp = _stat_key(path)
+        cached = self._templates.get(path)
+        if cached is None or cached[0] != stamp:
+            with open(path, 'r') as f:
+                cached = (stamp, f.read())
+            self._templates[path] = cached
+        return cached[1]
+
+    def discover_pages(self):
+        """
+        Refresh the page index from the content directory.
+
+        Returns:
+            list[PageInfo]: Every page, in discovery order
+        """
+        pages = {}
+        for item in sorted(Path(self.config.content_dir).rglob("*.md")):
+            source = os.path.abspath(item)
+            pages[source] = self.pages.get(source) or self._new_page(source)
+        self.pages = pages
+        return list(pages.values())
+
+    def _new_page(self, source):
+        rel_path = Path(source).relative_to(os.path.abspath(self.config.content_dir))
+        output = Path(self.config.output_dir) / rel_path.with_suffix('.html')
+        return PageInfo(source, str(output), self._url_for(rel_path))
+
+    def _targets_for(self, page):
+        rel_path = os.path.relpath(page.source, self.config.content_dir)
+        return [(target, target.output_path(rel_path)) for target in self.config.targets]
+
+    @staticmethod
+    def _url_for(rel_path):
+        html_path = rel_path.with_suffix('.html')
+        if html_path.name == "index.html":
+            parent = html_path.parent.as_posix()
+            return "/" if parent == "." else f"/{parent}/"
+        return "/" + html_path.as_posix()
+
+    def _page_stamp(self, page):
+        targets = tuple(target.template_stamp() for target in self.config.targets)
+        return (
+            _stat_key(page.source), _stat_key(self.config.template_path), targets,
+            self.config.render_key(), default_registry.fingerprint(),
+        )
+
+    def _is_fresh(self, page, stamp, writer):
+        return page.stamp == stamp and self._keep_outputs(page, writer)
+
+    def _keep_outputs(self, page, writer):
+        if not page.outputs:
+            return False
+        # Check every output before keeping any, so a page is either kept
+        # or rendered as a whole
+        for path, (_, stat) in page.outputs.items():
+            try:
+                if _stat_key(path) != stat:
+                    return False
+            except OSError:
+                return False
+        return all(writer.keep(path, record, stat) for path, (record, stat) in page.outputs.items())
+
+    def render_page(self, page, writer):
+        """
+        Render one page of the index through writer, unless it is unchanged
+        since this session last rendered it.
+
+        Args:
+            page (PageInfo): The page to render
+            writer (OutputWriter): Writer for the output file
+
+        Returns:
+            bool: True if the page was rendered, False if it was up to date
+            or copied from the build cache
+        """
+        return self.render_pages([page], writer) == 1
+
+    def render_pages(self, pages, writer):
+        """
+        Render the pages of the index that changed since this session last
+        rendered them, through writer.
+
+        Sources are read, and the build cache looked up, on a reader thread
+        and outputs written on a writer thread while pages render, see
+        run_pipeline(). Pages render on this thread, so every page shares
+        the highlighter's and minifier's in-memory caches, or with
+        config.workers in worker processes.
+
+        Args:
+            pages (list[PageInfo]): The pages to render
+            writer (OutputWriter): Writer for the output files
+
+        Returns:
+            int: Pages rendered; pages up to date or copied from the build
+            cache are not counted
+        """
+        template = self.template()
+        jobs = []
+        for page in pages:
+            stamp = self._page_stamp(page)
+            if not self._is_fresh(page, stamp, writer):
+                jobs.append(_PageJob(page, stamp, self._targets_for(page), template))
+
+        # Streamed pages write as they render, so they skip the pipeline;
+        # they are huge, so they skip the build cache too
+        piped = []
+        for job in jobs:
+            if self._is_streamed(job.page):
+                self._render_streamed(job, writer)
+            else:
+                piped.append(job)
+        write = partial(self._write_job, writer)
+        if len(piped) < 2:
+            for job in piped:
+                write(self._render_job(self._read_job(job)))
+        elif (self.config.workers or 1) > 1:
+            self._render_in_pool(piped, writer)
+        else:
+            run_pipeline(piped, self._read_job, self._render_job, write)
+        return sum(job.cached is None for job in jobs)
+
+    def _is_streamed(self, page):
+        if self.config.stream is not None:
+            return self.config.stream
+        return os.path.getsize(page.source) >= STREAM_THRESHOLD
+
+    def _render_streamed(self, job, writer):
+        page = job.page
+        toc = TableOfContents()
+        stats = PageStats()
+        diagnostics = Diagnostics(page.source)
+        with self.metrics.time("page_render_seconds"):
+            page.title = generate_page(
+                page.source, self.config.template_path, page.output, self.config.base_path,
+                writer, self.highlighter, self.minifier, True, job.template, job.targets, toc, stats,
+                diagnostics, self.metrics, self._page_urls(page),
+            )
+        page.headings = toc.entries
+        page.stats = stats
+        page.diagnostics = diagnostics.items
+        self._finish(job, writer)
+
+    def _read_job(self, job):
+        """Pipeline reader: load the page's source and look it up in the build cache."""
+        with open(job.page.source, 'r') as f:
+            job.markdown = f.read()
+        if self.page_cache is not None:
+            job.key = self._render_key(job)
+            job.cached = self._lookup_page(job.key)
+            if job.cached is not None:
+                job.markdown = None
+        return job
+
+    def _page_urls(self, page):
+        return self.urls.for_page(Path(os.path.relpath(page.output, self.config.output_dir)).as_posix())
+
+    def _render_job(self, job):
+        """Pipeline renderer: render the page, unless the build cache had it."""
+        if job.cached is not None:
+            return job
+        job.result, job.toc, job.stats, job.diagnostics = self._renderer.render(job.request(), self.metrics)
+        job.markdown = None
+        return job
+
+    def _render_in_pool(self, jobs, writer):
+        """
+        Run the pipeline of render_pages() with pages rendered in worker
+        processes. Jobs stay in this process; workers get each job's
+        request and send back what the page rendered to.
+        """
+        def read(index):
+            job = self._read_job(jobs[index])
+            request = job.request() if job.cached is None else None
+            job.markdown = None
+            return index, request
+
+        def write(item):
+            index, rendered = item
+            job = jobs[index]
+            if rendered is not None:
+                (job.result, job.toc, job.stats, job.diagnostics), metrics, minified = rendered
+                self.metrics.merge(metrics)
+                if minified is not None:
+                    self.minifier.bytes_in += minified[0]
+                    self.minifier.bytes_out += minified[1]
+            self._write_job(writer, job)
+
+        run_pipeline(range(len(jobs)), read, _render_in_worker, write, self._render_pool())
+
+    def _render_pool(self):
+        if self._pool is None:
+            # Imported here, like the highlighter's pool: most builds never
+            # need it
+            from concurrent.futures import ProcessPoolExecutor
+            self._pool = ProcessPoolExecutor(
+                self.config.workers, initializer=_init_render_worker, initargs=(self.config,),
+            )
+        return self._pool
+
+    def _write_job(self, writer, job):
+        """Pipeline writer: write the page's outputs and update the index."""
+        page = job.page
+        paths = [page.output] + [path for _, path in job.targets]
+        if job.cached is not None:
+            entry, contents = job.cached
+            logging.info(f"Copying page from build cache: {page.output}")
+            for path, content in zip(paths, contents):
+                writer.write(path, content)
+            page.title = entry["title"]
+            page.headings = [tuple(heading) for heading in entry["headings"]]
+            page.stats = PageStats.from_dict(entry["stats"])
+            page.diagnostics = [Diagnostic(path=page.source, **item) for item in entry["diagnostics"]]
+            self.pages_cached += 1
+        else:
+            title, html, results = job.result
+            contents = [html] + results
+            for path, content in zip(paths, contents):
+                writer.write(path, content)
+            page.title = title
+            page.headings = job.toc.entries
+            page.stats = job.stats
+            page.diagnostics = job.diagnostics.items
+            if job.key is not None:
+                self._store_page(job, contents, writer)
+        self._finish(job, writer)
+
+    def _finish(self, job, writer):
+        page = job.page
+        page.stamp = job.stamp
+        page.outputs = {}
+        for path in [page.output] + [path for _, path in job.targets]:
+            path = os.path.abspath(path)
+            page.outputs[path] = (writer.records[path], _stat_key(path))
+
+    def _render_key(self, job):
+        """
+        Hash everything a page's outputs depend on. Only contents and paths
+        relative to the site go in, so the key is the same on every machine.
+        """
+        page = job.page
+        root = os.path.dirname(os.path.abspath(self.config.template_path))
+        parts = [
+            generator_version(), repr(self.config.render_key()), default_registry.fingerprint(),
+            Path(os.path.relpath(page.output, root)).as_posix(), page.url, job.template,
+        ]
+        for target, _ in job.targets:
+            parts += [target.name, target.template()]
+        return cache_key(*parts, job.markdown)
+
+    def _lookup_page(self, key):
+        """Return a page's entry and outputs from the build cache, if all of them are there."""
+        data = self.page_cache.get(key)
+        if data is None:
+            return None
+        entry = json.loads(data)
+        contents = []
+        for digest, _ in entry["outputs"]:
+            content = self.blob_cache.get(digest)
+            # The directory may come from anywhere; never copy a damaged entry
+            if content is None or hashlib.sha256(content).hexdigest() != digest:
+                return None
+            contents.append(content)
+        return entry, contents
+
+    def _store_page(self, job, contents, writer):
+        """Add a freshly rendered page to the build cache."""
+        page = job.page
+        outputs = []
+        for path, content in zip([page.output] + [path for _, path in job.targets], contents):
+            digest, size = writer.records[os.path.abspath(path)]
+            if digest not in self.blob_cache:
+                self.blob_cache.put(digest, content.encode("utf-8"))
+            outputs.append([digest, size])
+        entry = {
+            "title": page.title,
+            "headings": page.headings,
+            "stats": page.stats.to_dict(),
+            "diagnostics": _diagnostic_entries(page.diagnostics),
+            "outputs": outputs,
+        }
+        self.page_cache.put(job.key, json.dumps(entry).encode("utf-8"))
+
+    def _rel_source(self, page):
+        return Path(os.path.relpath(page.source, self.config.content_dir)).as_posix()
+
+    def _is_buildable(self, page, writer):
+        """
+        Tell whether a page of the index belongs in this build: it matches
+        config.include and is neither a draft nor scheduled for later. The
+        outputs of drafts and scheduled pages are removed.
+        """
+        config = self.config
+        if not config.includes(self._rel_source(page)):
+            return False
+        page.meta = read_front_matter(page.source, Diagnostics(page.source))
+        if config.publishes(page.meta):
+            return True
+        logging.info(f"Skipping {'draft' if page.meta.draft else 'scheduled'} page: {page.source}")
+        for path in [page.output] + [path for _, path in self._targets_for(page)]:
+            writer.remove(path)
+        # Rendered again as a whole once it is published
+        page.stamp = None
+        page.outputs = {}
+        page.diagnostics = []
+        return False
+
+    def _select_pages(self, pages, writer):
+        """
+        Split the index into the pages this build renders and the pages
+        outside config.include whose outputs it keeps from earlier builds.
+        Drafts and scheduled pages are in neither.
+
+        Returns:
+            tuple[list[PageInfo], list[PageInfo]]: Pages to render, and
+            pages kept as they are
+        """
+        built = []
+        kept = []
+        saved = None
+        missing = 0
+        for page in pages:
+            if self.config.includes(self._rel_source(page)):
+                if self._is_buildable(page, writer):
+                    built.append(page)
+                continue
+            if not page.outputs:
+                # Not built by this session: take it from the last build
+                if saved is None:
+                    saved = self._load_index()
+                self._restore_page(page, saved)
+            if self._keep_outputs(page, writer):
+                kept.append(page)
+            else:
+                missing += 1
+        if missing:
+            logging.warning(f"{missing} pages outside this build were never built; a full build lists them")
+        return built, kept
+
+    def _load_index(self):
+        """Return the page entries saved by the last build, by source relative to content_dir."""
+        if self.index_path is None:
+            return {}
+        try:
+            with open(self.index_path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if data.get("version") != INDEX_VERSION:
+            return {}
+        return data["pages"]
+
+    def _restore_page(self, page, saved):
+        """Fill in a page from its entry in the saved index, if it has one."""
+        entry = saved.get(self._rel_source(page))
+        if entry is None:
+            return
+        page.title = entry["title"]
+        page.headings = [tuple(heading) for heading in entry["headings"]]
+        page.stats = PageStats.from_dict(entry["stats"]) if entry["stats"] is not None else None
+        page.diagnostics = [Diagnostic(path=page.source, **item) for item in entry["diagnostics"]]
+        page.meta = PageMeta.from_dict(entry["meta"]) if entry["meta"] is not None else None
+        page.outputs = {
+            os.path.abspath(os.path.join(self.config.output_dir, path)): (tuple(record), tuple(stat))
+            for path, (record, stat) in entry["outputs"].items()
+        }
+
+    def _save_index(self, pages):
+        """Save the entries of the pages listed by this build, see _load_index()."""
+        if self.index_path is None:
+            return
+        entries = {}
+        for page in pages:
+            entries[self._rel_source(page)] = {
+                "title": page.title,
+                "headings": page.headings,
+                "stats": page.stats.to_dict() if page.stats is not None else None,
+                "diagnostics": _diagnostic_entries(page.diagnostics),
+                "meta": page.meta.to_dict() if page.meta is not None else None,
+                "outputs": {
+                    Path(os.path.relpath(path, self.config.output_dir)).as_posix(): [record, stat]
+                    for path, (record, stat) in page.outputs.items()
+                },
+            }
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            # dumps() encodes in C, dump() in Python chunks
+            f.write(json.dumps({"version": INDEX_VERSION, "pages": entries}, sort_keys=True))
+        os.replace(tmp_path, self.index_path)
+
+    def build(self):
+        """
+        Build the whole site: copy static files, render pages, write the
+        manifest and prune stale outputs.
+
+        With config.include, only the matching pages are rendered. The
+        indexes and manifest still list the other pages, from this
+        session's or the last build's page index, and nothing is pruned.
+
+        Returns:
+            BuildResult: What the build did
+        """
+        start = time.perf_counter()
+        config = self.config
+        writer = OutputWriter(config.output_dir, config.mtime)
+        self.pages_cached = 0
+        if self.minifier is not None:
+            self.minifier.bytes_in = self.minifier.bytes_out = 0
+
+        metrics = self.metrics
+
+        # Copy static files
+        logging.info("Starting static file copy")
+        with metrics.time("phase_seconds", phase="static"):
+            copy_directory(config.static_dir, config.output_dir, writer, self.minifier)
+        logging.info("Finished static file copy")
+
+        # Generate HTML pages
+        logging.info("Generating HTML pages")
+        with metrics.time("phase_seconds", phase="pages"):
+            built, kept = self._select_pages(self.discover_pages(), writer)
+            writer.make_dirs(
+                os.path.dirname(path)
+                for page in built
+                for path in [page.output] + [path for _, path in self._targets_for(page)]
+            )
+            rendered = self.render_pages(built, writer)
+        logging.info("Finished generating HTML pages")
+
+        pages = built + kept
+        with metrics.time("phase_seconds", phase="indexes"):
+            # Every heading of the site, for deep-link search
+            index = build_heading_index(pages, config.base_path)
+            writer.write(os.path.join(config.output_dir, HEADING_INDEX_NAME), heading_index_to_json(index))
+            # Titles, reading times and excerpts for listing pages
+            index = build_page_index(pages, config.base_path)
+            writer.write(os.path.join(config.output_dir, PAGE_INDEX_NAME), page_index_to_json(index))
+
+            # Record what was built so deploys can upload only the delta
+            manifest = build_manifest(writer)
+            writer.write(config.manifest_path, manifest_to_json(manifest))
+        logging.info(f"Wrote build manifest: {config.manifest_path}")
+
+        self._save_index(pages)
+
+        # Remove outputs left over from earlier builds
+        if config.include:
+            logging.info("Partial build: keeping every other output")
+        else:
+            with metrics.time("phase_seconds", phase="prune"):
+                writer.prune()
+        result = BuildResult(
+            writer, rendered, len(built), time.perf_counter() - start, self.minifier, self.diagnostics(),
+            self.pages_cached,
+        )
+        self._count_build(result, "build")
+        return result
+
+    def rebuild(self, paths):
+        """
+        Rebuild only what depends on the given source files: a page for a
+        markdown file, the copy of a static file, or every page for the
+        template. Deleted sources have their outputs removed, and so do
+        pages that became drafts or scheduled. Pages outside config.include
+        are left alone. Unlike build(), this neither prunes stale outputs
+        nor rewrites the manifest and indexes.
+
+        Args:
+            paths (list[str]): Changed, added or deleted source files
+
+        Returns:
+            BuildResult: What the rebuild did
+        """
+        start = time.perf_counter()
+        config = self.config
+        writer = OutputWriter(config.output_dir, config.mtime)
+        self.pages_cached = 0
+        if self.minifier is not None:
+            self.minifier.bytes_in = self.minifier.bytes_out = 0
+        content_dir = os.path.abspath(config.content_dir)
+        static_dir = os.path.abspath(config.static_dir)
+
+        rendered = 0
+        for path in paths:
+            path = os.path.abspath(path)
+            if path == os.path.abspath(config.template_path):
+                pages = self.discover_pages()
+            elif _is_within(path, content_dir) and path.endswith(".md"):
+                pages = [self._index_source(path, writer)]
+            elif _is_within(path, static_dir):
+                dst_path = os.path.join(config.output_dir, os.path.relpath(path, static_dir))
+                if os.path.isfile(path):
+                    copy_file(path, dst_path, writer, self.minifier)
+                else:
+                    writer.remove(dst_path)
+                continue
+            else:
+                continue
+            pages = [page for page in pages if page is not None and self._is_buildable(page, writer)]
+            rendered += self.render_pages(pages, writer)
+
+        result = BuildResult(
+            writer, rendered, len(self.pages), time.perf_counter() - start, self.minifier, self.diagnostics(),
+            self.pages_cached,
+        )
+        self._count_build(result, "rebuild")
+        return result
+
+    def _count_build(self, result, kind):
+        metrics = self.metrics
+        writer = result.writer
+        metrics.inc("builds", kind=kind)
+        metrics.observe("build_seconds", result.elapsed, kind=kind)
+        metrics.inc("pages_rendered", result.pages_rendered)
+        metrics.inc("pages_from_cache", result.pages_cached)
+        metrics.inc("files_written", writer.written)
+        metrics.inc("files_unchanged", writer.unchanged)
+        metrics.inc("files_deleted", writer.deleted)
+        metrics.inc("bytes_written", writer.bytes_written)
+        metrics.inc("diagnostics", len(result.diagnostics))
+
+    def _cache_metrics(self):
+        caches = [
+            ("highlight", self.highlighter.cache),
+            ("minify", self.minifier.cache if self.minifier is not None else None),
+            ("pages", self.page_cache),
+            ("blobs", self.blob_cache),
+        ]
+        for name, cache in caches:
+            if cache is not None:
+                yield "cache_hits", {"cache": name}, cache.hits
+                yield "cache_misses", {"cache": name}, cache.misses
+
+    def diagnostics(self):
+        """
+        Return the problems found in every page of the index, including
+        pages kept from earlier builds, so each build reports them all.
+
+        Returns:
+            list[Diagnostic]: Sorted by file, line and column
+        """
+        items = [item for page in self.pages.values() for item in page.diagnostics]
+        return sorted(items, key=lambda item: item.sort_key())
+
+    def _index_source(self, path, writer):
+        """Add, keep or drop a markdown source in the page index."""
+        if os.path.isfile(path):
+            page = self.pages.get(path) or self._new_page(path)
+            self.pages[path] = page
+            return page
+        page = self.pages.pop(path, None)
+        if page is not None:
+            for output in [page.output] + [output for _, output in self._targets_for(page)]:
+                writer.remove(output)
+        return None
+
+    def render_markdown(self, markdown, rel_path="index.html"):
+        """
+        Render a markdown string to HTML with this session's caches.
+
+        Site-absolute URLs are resolved as in the built pages, for a page at
+        rel_path.
+
+        Args:
+            markdown (str): The markdown to render
+            rel_path (str): The output path, relative to the output
+                directory, of the page the fragment is shown on
+
+        Returns:
+            str: The rendered HTML fragment
+        """
+        return markdown_to_htmlnode(markdown, self.highlighter, urls=self.urls.for_page(rel_path)).to_html()
+
+    def close(self):
+        """Release the highlighter's and the page renderers' worker pools."""
+        self.highlighter.close()
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
@@ -1,6 +1,7 @@
 import unittest
 
 from htmlnode import HTMLNode, LeafNode, ParentNode
+from escape import Markup
 
 class TestHTMLNode(unittest.TestCase):
     def test_props_to_html(self):
@@ -39,6 +40,23 @@ class TestHTMLNode(unittest.TestCase):
         node = LeafNode("p", "Hello", {"href": "https://www.google.com", "target": "_blank",})
         self.assertEqual(node.__repr__(), "LeafNode(p, Hello, {'href': 'https://www.google.com', 'target': '_blank'})")
 
+    def test_leaf_to_html_escapes_text(self):
+        node = LeafNode("p", "1 < 2 & 3 > 2")
+        self.assertEqual(node.to_html(), "<p>1 &lt; 2 &amp; 3 &gt; 2</p>")
+
+    def test_leaf_to_html_escapes_reassigned_value(self):
+        node = LeafNode(None, "safe")
+        node.value = "<b>"
+        self.assertEqual(node.to_html(), "&lt;b&gt;")
+
+    def test_leaf_to_html_markup_not_escaped(self):
+        node = LeafNode("code", Markup('<span class="hl-keyword">def</span>'))
+        self.assertEqual(node.to_html(), '<code><span class="hl-keyword">def</span></code>')
+
+    def test_props_to_html_escapes_values(self):
+        node = LeafNode("img", "", {"src": "/a.png?x=1&y=2", "alt": 'a "quote"'})
+        self.assertEqual(node.props_to_html(), 'src="/a.png?x=1&amp;y=2" alt="a &quot;quote&quot;"')
+
     def test_to_html_with_children(self):
         child_node = LeafNode("span", "child")
         parent_node = ParentNode("div", [child_node])
@@ -0,0 +1,65 @@
+import os
+import tempfile
+import unittest
+
+import build_state
+
+class TestBuildState(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.state_path = os.path.join(self.root, ".cache", build_state.STATE_NAME)
+        self.content = os.path.join(self.root, "content")
+        self.source = self.write("content/index.md", "# Home")
+        self.output = self.write("docs/index.html", "<h1>Home</h1>")
+        self.key = (("/base/",), "/cwd")
+        build_state.save(self.state_path, self.key, [self.content], [self.output])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, rel_path, content):
+        path = os.path.join(self.root, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    def test_up_to_date(self):
+        self.assertTrue(build_state.is_up_to_date(self.state_path, self.key))
+
+    def test_warnings_are_recorded(self):
+        self.assertEqual(build_state.recorded_warnings(self.state_path), [])
+        build_state.save(self.state_path, self.key, [self.content], [self.output], ["page.md:3: warning: odd"])
+        self.assertTrue(build_state.is_up_to_date(self.state_path, self.key))
+        self.assertEqual(build_state.recorded_warnings(self.state_path), ["page.md:3: warning: odd"])
+        self.assertEqual(build_state.recorded_warnings(os.path.join(self.root, "missing")), [])
+
+    def test_different_key(self):
+        self.assertFalse(build_state.is_up_to_date(self.state_path, (("/other/",), "/cwd")))
+
+    def test_modified_input(self):
+        self.write("content/index.md", "# Home, edited")
+        self.assertFalse(build_state.is_up_to_date(self.state_path, self.key))
+
+    def test_added_input(self):
+        self.write("content/blog/post.md", "# Post")
+        self.assertFalse(build_state.is_up_to_date(self.state_path, self.key))
+
+    def test_deleted_output(self):
+        os.unlink(self.output)
+        self.assertFalse(build_state.is_up_to_date(self.state_path, self.key))
+
+    def test_pycache_is_ignored(self):
+        self.write("content/__pycache__/x.pyc", "bytecode")
+        self.assertTrue(build_state.is_up_to_date(self.state_path, self.key))
+
+    def test_missing_or_corrupt_state(self):
+        self.assertFalse(build_state.is_up_to_date(os.path.join(self.root, "missing"), self.key))
+        with open(self.state_path, "wb") as f:
+            f.write(b"not marshal data")
+        self.assertFalse(build_state.is_up_to_date(self.state_path, self.key))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import os
+import tempfile
+import unittest
+
+from cache import DiskCache, cache_key, evict, generator_version
+
+class TestDiskCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = DiskCache(self.tmp.name, "pages")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def put(self, key, size, mtime):
+        self.cache.put(key, b"x" * size)
+        os.utime(self.cache._path(key), (mtime, mtime))
+
+    def test_get_and_put(self):
+        key = cache_key("a")
+        self.assertIsNone(self.cache.get(key))
+        self.assertNotIn(key, self.cache)
+        self.cache.put(key, b"value")
+        self.assertIn(key, self.cache)
+        self.assertEqual(self.cache.get(key), b"value")
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_evict_by_age(self):
+        self.put(cache_key("old"), 10, 1000)
+        self.put(cache_key("new"), 10, 5000)
+        self.assertEqual(evict(self.tmp.name, max_age=2000, now=6000), (1, 10))
+        self.assertIsNone(self.cache.get(cache_key("old")))
+        self.assertIsNotNone(self.cache.get(cache_key("new")))
+
+    def test_evict_by_size_drops_least_recently_used(self):
+        for i, name in enumerate(["a", "b", "c"]):
+            self.put(cache_key(name), 100, 1000 + i)
+        # Reading an entry makes it the most recently used
+        self.cache.get(cache_key("a"))
+        self.assertEqual(evict(self.tmp.name, max_bytes=200), (1, 100))
+        self.assertIsNone(self.cache.get(cache_key("b")))
+        self.assertIsNotNone(self.cache.get(cache_key("a")))
+
+    def test_evict_keeps_top_level_files(self):
+        state = os.path.join(self.tmp.name, "build-state.bin")
+        with open(state, "wb") as f:
+            f.write(b"x" * 100)
+        self.put(cache_key("a"), 100, 1000)
+        self.assertEqual(evict(self.tmp.name, max_bytes=0), (1, 100))
+        self.assertTrue(os.path.exists(state))
+
+    def test_generator_version_is_stable(self):
+        self.assertEqual(generator_version(), generator_version())
+        self.assertEqual(len(generator_version()), 64)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import os
+import time
+import tempfile
+import threading
+import unittest
+
+from daemon import BuildDaemon, request
+from session import BuildConfig, BuildSession
+
+class TestBuildDaemon(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.write("content/index.md", "# Home\n\nHello")
+        self.write("static/index.css", "body {}")
+        self.write("template.html", "<title>{{ Title }}</title>{{ Content }}")
+        self.session = BuildSession(BuildConfig.from_root(self.root, cache_dir=None))
+        self.session.build()
+
+        self.socket_path = os.path.join(self.root, "daemon.sock")
+        self.daemon = BuildDaemon(self.session, self.socket_path)
+        self.thread = threading.Thread(target=self.daemon.serve_forever)
+        self.thread.start()
+        for _ in range(200):
+            if os.path.exists(self.socket_path):
+                break
+            time.sleep(0.01)
+
+    def tearDown(self):
+        request(self.socket_path, {"cmd": "shutdown"})
+        self.thread.join(timeout=5)
+        self.session.close()
+        self.tmp.cleanup()
+
+    def write(self, rel_path, content):
+        path = os.path.join(self.root, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    def test_render(self):
+        response = request(self.socket_path, {"cmd": "render", "markdown": "Some **bold** <text>"})
+        self.assertEqual(response["html"], "<div><p>Some <b>bold</b> &lt;text&gt;</p></div>")
+
+    def test_rebuild_new_page(self):
+        path = self.write("content/blog/index.md", "# Blog")
+        response = request(self.socket_path, {"cmd": "rebuild", "paths": [path]})
+        self.assertEqual(response["rendered"], 1)
+        output = os.path.join(self.root, "docs", "blog", "index.html")
+        self.assertEqual(response["changed"], [output])
+        self.assertTrue(os.path.exists(output))
+
+    def test_rebuild_deleted_page(self):
+        path = self.write("content/old/index.md", "# Old")
+        request(self.socket_path, {"cmd": "rebuild", "paths": [path]})
+        os.unlink(path)
+        response = request(self.socket_path, {"cmd": "rebuild", "paths": [path]})
+        self.assertFalse(os.path.exists(os.path.join(self.root, "docs", "old", "index.html")))
+        self.assertEqual(len(response["changed"]), 1)
+
+    def test_rebuild_static_file(self):
+        path = self.write("static/index.css", "body { color: red; }")
+        request(self.socket_path, {"cmd": "rebuild", "paths": [path]})
+        with open(os.path.join(self.root, "docs", "index.css")) as f:
+            self.assertEqual(f.read(), "body { color: red; }")
+
+    def test_stats(self):
+        request(self.socket_path, {"cmd": "render", "markdown": "x"})
+        response = request(self.socket_path, {"cmd": "stats"})
+        self.assertEqual(response["pages"], 1)
+        self.assertEqual(response["requests"]["render"], 1)
+
+    def test_unknown_command(self):
+        with self.assertRaises(RuntimeError):
+            request(self.socket_path, {"cmd": "dance"})
+
+
+if __name__ == "__main__":
+    unittest.main()
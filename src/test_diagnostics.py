@@ -0,0 +1,140 @@
+import os
+import datetime
+import tempfile
+import unittest
+
+from diagnostics import ERROR, Diagnostic, Diagnostics, check_files, check_site, summarize
+from inline_markdown import split_nodes_delimiter
+from markdown_parser import markdown_to_htmlnode
+from markdown_to_blocks import iter_numbered_blocks
+from session import BuildConfig, BuildSession
+from textnode import TextNode, TextType
+
+TEMPLATE = "<html><title>{{ Title }}</title>{{ Content }}</html>"
+
+class TestDiagnostics(unittest.TestCase):
+    def test_iter_numbered_blocks(self):
+        markdown = "# Title\n\nfirst\nparagraph\n\n\n- a\n- b\n"
+        self.assertEqual(
+            list(iter_numbered_blocks(markdown.split("\n"))),
+            [(1, "# Title"), (3, "first\nparagraph"), (7, "- a\n- b")],
+        )
+
+    def test_unclosed_delimiter_is_located(self):
+        diagnostics = Diagnostics("page.md")
+        markdown = "# Title\n\nSome text\nand an _unclosed one\n"
+        html = markdown_to_htmlnode(markdown, diagnostics=diagnostics).to_html()
+        self.assertIn("and an _unclosed one", html)
+        self.assertEqual(diagnostics.items, [Diagnostic(ERROR, "Unclosed delimiter _", "page.md", 4, 8)])
+
+    def test_all_problems_are_reported(self):
+        diagnostics = Diagnostics("page.md")
+        markdown = "# Title\n\n**bold\n\nfine\n\n`code\n"
+        markdown_to_htmlnode(markdown, diagnostics=diagnostics)
+        self.assertEqual([(item.line, item.column) for item in diagnostics.items], [(3, 1), (7, 1)])
+
+    def test_paired_delimiters_before_unclosed_one(self):
+        diagnostics = Diagnostics()
+        nodes = split_nodes_delimiter([TextNode("a *b* c *d", TextType.TEXT)], "*", TextType.ITALIC, diagnostics)
+        self.assertEqual(nodes, [
+            TextNode("a ", TextType.TEXT),
+            TextNode("b", TextType.ITALIC),
+            TextNode(" c *d", TextType.TEXT),
+        ])
+        self.assertEqual(len(diagnostics.errors), 1)
+
+    def test_without_diagnostics_still_raises(self):
+        with self.assertRaises(ValueError):
+            markdown_to_htmlnode("an _unclosed one")
+
+    def test_str(self):
+        item = Diagnostic(ERROR, "Unclosed delimiter _", "page.md", 4, 8)
+        self.assertEqual(str(item), "page.md:4:8: error: Unclosed delimiter _")
+        self.assertEqual(str(Diagnostic(ERROR, "No h1 header found")), "<input>: error: No h1 header found")
+
+    def test_summarize(self):
+        self.assertEqual(summarize([]), "0 errors, 0 warnings")
+        self.assertEqual(summarize([Diagnostic(ERROR, "x")]), "1 error, 0 warnings")
+
+class TestCheckFiles(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.paths = []
+        for i in range(6):
+            body = "# Title\n\nfine" if i % 2 else f"no title\n\nbroken **{i}"
+            self.paths.append(self.write(f"page{i}.md", body))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name, content):
+        path = os.path.join(self.tmp.name, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    def test_reports_every_file(self):
+        diagnostics = check_files(self.paths, workers=1)
+        self.assertEqual(len(diagnostics), 6)
+        self.assertEqual(diagnostics[0].path, self.paths[0])
+        self.assertEqual([item.line for item in diagnostics[:2]], [None, 3])
+
+    def test_parallel_matches_serial(self):
+        self.assertEqual(check_files(reversed(self.paths), workers=2), check_files(self.paths, workers=1))
+
+    def test_writes_nothing(self):
+        before = sorted(os.listdir(self.tmp.name))
+        check_files(self.paths, workers=1)
+        self.assertEqual(sorted(os.listdir(self.tmp.name)), before)
+
+    def test_check_site_follows_the_build_config(self):
+        self.write("blog/post.md", "broken **")
+        self.write("blog/draft.md", "---\ndraft: true\n---\nbroken **")
+        self.write("blog/later.md", "---\ndate: 2030-01-01\n---\nbroken **")
+        today = datetime.date(2029, 12, 31)
+        cases = [
+            ({}, {"page0", "page2", "page4", "post"}),
+            ({"include": ["blog/*"]}, {"post"}),
+            ({"include": ["blog/*"], "drafts": True}, {"post", "draft"}),
+            ({"include": ["blog/*"], "future": True}, {"post", "later"}),
+        ]
+        for options, names in cases:
+            with self.subTest(**options):
+                config = BuildConfig.from_root(self.tmp.name, content_dir=self.tmp.name, today=today, **options)
+                diagnostics = check_site(self.tmp.name, 1, config)
+                self.assertEqual({os.path.basename(item.path)[:-3] for item in diagnostics}, names)
+        self.assertEqual(len(check_site(self.tmp.name, 1)), 12)
+
+class TestBuildDiagnostics(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.write("content/index.md", "# Home\n\nWelcome")
+        self.write("content/broken/index.md", "no title\n\nan _unclosed one")
+        self.write("template.html", TEMPLATE)
+        os.makedirs(os.path.join(self.root, "static"))
+        self.session = BuildSession(BuildConfig.from_root(self.root))
+
+    def tearDown(self):
+        self.session.close()
+        self.tmp.cleanup()
+
+    def write(self, rel_path, content):
+        path = os.path.join(self.root, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(content)
+
+    def test_build_goes_on_past_errors(self):
+        result = self.session.build()
+        self.assertEqual(result.pages_rendered, 2)
+        self.assertEqual([(item.line, item.column) for item in result.diagnostics], [(None, None), (3, 4)])
+        self.assertIn("2 errors", result.summary())
+        with open(os.path.join(self.root, "docs", "broken", "index.html")) as f:
+            html = f.read()
+        self.assertIn("<title>index</title>", html)
+        self.assertIn("an _unclosed one", html)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,30 @@
+import unittest
+
+from escape import Markup, escape_attr, escape_text
+
+class TestEscape(unittest.TestCase):
+    def test_escape_text(self):
+        self.assertEqual(escape_text("a < b & c > d"), "a &lt; b &amp; c &gt; d")
+
+    def test_escape_text_keeps_quotes(self):
+        self.assertEqual(escape_text('"quoted" \'text\''), '"quoted" \'text\'')
+
+    def test_escape_text_fast_path_returns_same_object(self):
+        text = "nothing special here"
+        self.assertIs(escape_text(text), text)
+
+    def test_escape_attr(self):
+        self.assertEqual(escape_attr('say "hi" & <go>'), "say &quot;hi&quot; &amp; &lt;go&gt;")
+
+    def test_escape_attr_converts_non_strings(self):
+        self.assertEqual(escape_attr(3), "3")
+        self.assertEqual(escape_attr(None), "None")
+
+    def test_markup_is_not_escaped(self):
+        markup = Markup("<span>x</span>")
+        self.assertIs(escape_text(markup), markup)
+        self.assertIs(escape_attr(markup), markup)
+
+
+if __name__ == "__main__":
+    unittest.main()
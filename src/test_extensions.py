@@ -0,0 +1,131 @@
+import unittest
+
+from extensions import ExtensionRegistry, default_registry
+from htmlnode import LeafNode, ParentNode
+from markdown_parser import markdown_to_htmlnode, text_to_textnodes
+from textnode import TextNode, TextType
+
+def admonition(block, match, parse_inline):
+    body = block[match.end():].strip()
+    return ParentNode("div", [ParentNode("p", parse_inline(body))], {"class": f"admonition {match['kind']}"})
+
+def embed(match):
+    return LeafNode("iframe", "", {"src": f"https://www.youtube.com/embed/{match['video']}"})
+
+def abbreviation(match):
+    return TextNode(match.group(0), TextType.BOLD)
+
+class TestExtensionRegistry(unittest.TestCase):
+    def test_block_dispatch_picks_the_matching_extension(self):
+        registry = ExtensionRegistry()
+        for i in range(50):
+            registry.register_block(f"ext{i}", rf"@{i}\b", lambda block, match, parse: i)
+        extension, match = registry.match_block("@42 rest")
+        self.assertEqual(extension.name, "ext42")
+        self.assertEqual(match.group(0), "@42")
+        self.assertIsNone(registry.match_block("plain paragraph"))
+
+    def test_earlier_registration_wins(self):
+        registry = ExtensionRegistry()
+        registry.register_block("first", r"!!!", None)
+        registry.register_block("second", r"!!! note", None)
+        self.assertEqual(registry.match_block("!!! note")[0].name, "first")
+
+    def test_own_groups_are_passed_to_render(self):
+        registry = ExtensionRegistry()
+        registry.register_inline("a", r"\[\[(?P<target>[^\]]+)\]\]", None)
+        registry.register_inline("b", r"@(?P<user>\w+)", None)
+        matches = [(ext.name, dict(match.groupdict())) for ext, match in registry.iter_inline("hi @bob, see [[Home]]")]
+        self.assertEqual(matches, [("b", {"user": "bob"}), ("a", {"target": "Home"})])
+
+    def test_triggered_and_untriggered_extensions_mix(self):
+        registry = ExtensionRegistry()
+        registry.register_inline("mention", r"@(?P<user>\w+)", None, trigger="@")
+        registry.register_inline("wiki", r"\[\[(?P<target>[^\]]+)\]\]", None, trigger="[")
+        text = "@ann [x] [[Home]] a@b"
+        names = [ext.name for ext, _ in registry.iter_inline(text)]
+        self.assertEqual(names, ["mention", "wiki", "mention"])
+        registry.register_inline("number", r"\d+", None)
+        names = [ext.name for ext, _ in registry.iter_inline(text + " 42")]
+        self.assertEqual(names, ["mention", "wiki", "mention", "number"])
+
+    def test_block_trigger_selects_candidates(self):
+        registry = ExtensionRegistry()
+        registry.register_block("fence", r":::(?P<kind>\w+)", None, trigger=":")
+        registry.register_block("anything", r"%%", None)
+        self.assertEqual(registry.match_block(":::note")[0].name, "fence")
+        self.assertEqual(registry.match_block("%%")[0].name, "anything")
+        self.assertIsNone(registry.match_block(":: no"))
+
+    def test_duplicate_names_are_rejected(self):
+        registry = ExtensionRegistry()
+        registry.register_inline("x", r"x", None)
+        with self.assertRaises(ValueError):
+            registry.register_block("x", r"x", None)
+
+    def test_changes_recompile(self):
+        registry = ExtensionRegistry()
+        registry.register_block("a", r"a", None)
+        self.assertIsNotNone(registry.match_block("a"))
+        version = registry.version
+        registry.unregister("a")
+        self.assertIsNone(registry.match_block("a"))
+        self.assertGreater(registry.version, version)
+
+    def test_fingerprint_depends_on_extensions_only(self):
+        first, second = ExtensionRegistry(), ExtensionRegistry()
+        second.register_inline("tmp", r"t", abbreviation)
+        second.unregister("tmp")
+        for registry in (first, second):
+            registry.register_block("admonition", r"!!! (?P<kind>\w+)", admonition, trigger="!")
+        # Same extensions after different histories
+        self.assertNotEqual(first.version, second.version)
+        self.assertEqual(first.fingerprint(), second.fingerprint())
+        fingerprint = first.fingerprint()
+        first.register_inline("abbr", r"\bHTML\b", abbreviation)
+        self.assertNotEqual(first.fingerprint(), fingerprint)
+        second.register_inline("abbr", r"\bHTML\b", embed)
+        self.assertNotEqual(second.fingerprint(), first.fingerprint())
+
+class TestParserExtensions(unittest.TestCase):
+    def setUp(self):
+        default_registry.register_block("admonition", r"!!! (?P<kind>\w+)", admonition, trigger="!")
+        default_registry.register_inline("youtube", r"\{youtube (?P<video>[\w-]+)\}", embed, trigger="{")
+        default_registry.register_inline("abbr", r"\bHTML\b", abbreviation)
+
+    def tearDown(self):
+        for name in ("admonition", "youtube", "abbr"):
+            default_registry.unregister(name)
+
+    def test_block_extension(self):
+        html = markdown_to_htmlnode("!!! warning\nMind the **gap**\n\nAfter").to_html()
+        self.assertEqual(
+            html,
+            '<div><div class="admonition warning"><p>Mind the <b>gap</b></p></div><p>After</p></div>',
+        )
+
+    def test_inline_extensions(self):
+        html = markdown_to_htmlnode("Watch {youtube abc-1} about HTML and _more_").to_html()
+        self.assertEqual(
+            html,
+            '<div><p>Watch <iframe src="https://www.youtube.com/embed/abc-1"></iframe>'
+            ' about <b>HTML</b> and <i>more</i></p></div>',
+        )
+
+    def test_inline_extensions_keep_out_of_emphasis_and_code(self):
+        default_registry.register_inline("mention", r"@(\w+)", lambda match: TextNode(match[1], TextType.LINK, f"/u/{match[1]}"))
+        try:
+            self.assertEqual(
+                markdown_to_htmlnode("hi **@bob** there, _thanks @bob_, run `ssh git@host` @ann").to_html(),
+                '<div><p>hi <b>@bob</b> there, <i>thanks @bob</i>, run <code>ssh git@host</code>'
+                ' <a href="/u/ann">ann</a></p></div>',
+            )
+        finally:
+            default_registry.unregister("mention")
+
+    def test_without_matches_nodes_are_unchanged(self):
+        self.assertEqual(text_to_textnodes("plain"), [TextNode("plain", TextType.TEXT)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import os
+import datetime
+import tempfile
+import unittest
+
+from diagnostics import Diagnostics
+from front_matter import PageMeta, blank_front_matter, read_front_matter, split_front_matter
+from page import render_page
+
+class TestFrontMatter(unittest.TestCase):
+    def test_split(self):
+        meta, markdown = split_front_matter("---\ndraft: true\ndate: 2024-05-01\ntags: a, b\n---\n# Title\n")
+        self.assertTrue(meta.draft)
+        self.assertEqual(meta.date, datetime.date(2024, 5, 1))
+        self.assertEqual(meta.fields["tags"], "a, b")
+        # Blank lines in place of the front matter keep line numbers
+        self.assertEqual(markdown, "\n" * 5 + "# Title\n")
+
+    def test_no_front_matter(self):
+        for markdown in ["# Title", "---\n\nA rule above", "---\nnot a field\n---", "---\nkey: value"]:
+            with self.subTest(markdown=markdown):
+                meta, rest = split_front_matter(markdown)
+                self.assertEqual((meta.fields, meta.draft, meta.date), ({}, False, None))
+                self.assertEqual(rest, markdown)
+
+    def test_invalid_values(self):
+        with self.assertRaises(ValueError):
+            split_front_matter("---\ndate: tomorrow\n---\n# Title")
+        diagnostics = Diagnostics("page.md")
+        meta, _ = split_front_matter("---\ndraft: maybe\ndate: 2024-13-01\n---\n# Title", diagnostics)
+        self.assertEqual((meta.draft, meta.date), (False, None))
+        self.assertEqual([item.line for item in diagnostics.items], [2, 3])
+
+    def test_is_published(self):
+        today = datetime.date(2024, 5, 1)
+        self.assertTrue(PageMeta().is_published(today))
+        self.assertTrue(PageMeta(date=today).is_published(today))
+        self.assertFalse(PageMeta(date=datetime.date(2024, 5, 2)).is_published(today))
+        self.assertTrue(PageMeta(date=datetime.date(2024, 5, 2)).is_published(today, future=True))
+        self.assertFalse(PageMeta(draft=True).is_published(today))
+        self.assertTrue(PageMeta(draft=True).is_published(today, drafts=True))
+
+    def test_round_trip(self):
+        meta = PageMeta({"draft": "no", "date": "2024-05-01"}, False, datetime.date(2024, 5, 1))
+        again = PageMeta.from_dict(meta.to_dict())
+        self.assertEqual((again.fields, again.draft, again.date), (meta.fields, meta.draft, meta.date))
+
+    def test_read_and_blank_from_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "page.md")
+            with open(path, "w") as f:
+                f.write("---\ndraft: false\n---\n# Title\n\nText\n")
+            self.assertFalse(read_front_matter(path).draft)
+            with open(path) as f:
+                self.assertEqual(list(blank_front_matter(f)), ["\n"] * 3 + ["# Title\n", "\n", "Text\n"])
+
+    def test_rendered_page_has_no_front_matter(self):
+        title, page, _ = render_page("---\ndate: 2024-05-01\n---\n# Title\n\nText", "{{ Title }}|{{ Content }}", "index.css")
+        self.assertEqual(title, "Title")
+        self.assertEqual(page, 'Title|<div><h1 id="title">Title</h1><p>Text</p></div>')
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import tempfile
+import unittest
+
+from cache import DiskCache
+from highlight import Highlighter, highlight
+
+class TestHighlight(unittest.TestCase):
+    def test_python_tokens(self):
+        html = highlight('def f(x):\n    return "a" # done\n', "python")
+        self.assertEqual(
+            html,
+            '<span class="hl-keyword">def</span> f(x):\n'
+            '    <span class="hl-keyword">return</span> <span class="hl-string">"a"</span> '
+            '<span class="hl-comment"># done</span>\n',
+        )
+
+    def test_escapes_html(self):
+        self.assertEqual(highlight("a < b && c > d", None), "a &lt; b &amp;&amp; c &gt; d")
+        self.assertEqual(
+            highlight('x = "<b>"', "js"),
+            'x = <span class="hl-string">"&lt;b&gt;"</span>',
+        )
+
+    def test_unknown_language_is_only_escaped(self):
+        self.assertEqual(highlight("if <x>", "klingon"), "if &lt;x&gt;")
+
+    def test_language_is_case_insensitive(self):
+        self.assertEqual(highlight("42", "Python"), '<span class="hl-number">42</span>')
+
+
+class TestHighlighter(unittest.TestCase):
+    def test_disk_cache_reused_across_instances(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            first = Highlighter(cache=DiskCache(tmp, "highlight"))
+            html = first.highlight("print(1)", "python")
+            self.assertEqual(first.cache.misses, 1)
+
+            second = Highlighter(cache=DiskCache(tmp, "highlight"))
+            self.assertEqual(second.highlight("print(1)", "python"), html)
+            self.assertEqual(second.cache.hits, 1)
+
+    def test_cache_key_includes_language(self):
+        highlighter = Highlighter()
+        self.assertNotEqual(highlighter.highlight("def", "python"), highlighter.highlight("def", None))
+
+    def test_prefetch_uses_pool_for_large_blocks(self):
+        highlighter = Highlighter(workers=2, pool_threshold=10)
+        blocks = [("x = 1  # first block", "python"), ("y = 2  # second block", "python")]
+        try:
+            highlighter.prefetch(blocks)
+            self.assertIsNotNone(highlighter._pool)
+        finally:
+            highlighter.close()
+        for code, language in blocks:
+            self.assertEqual(highlighter.highlight(code, language), highlight(code, language))
+
+
+if __name__ == "__main__":
+    unittest.main()
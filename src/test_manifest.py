@@ -0,0 +1,55 @@
+import os
+import tempfile
+import unittest
+
+from output_writer import OutputWriter
+from manifest import build_manifest, diff_manifests, load_manifest, manifest_to_json
+
+class TestManifest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def build(self, files):
+        writer = OutputWriter(self.root)
+        for rel_path, content in files.items():
+            writer.write(os.path.join(self.root, rel_path), content)
+        return build_manifest(writer)
+
+    def test_build_manifest_entries(self):
+        manifest = self.build({"index.html": "<p>hi</p>", "images/a.png": b"\x89PNG"})
+        self.assertEqual(list(manifest["files"]), ["images/a.png", "index.html"])
+        entry = manifest["files"]["index.html"]
+        self.assertEqual(entry["size"], 9)
+        self.assertEqual(entry["content_type"], "text/html")
+        self.assertTrue(entry["hash"].startswith("sha256:"))
+        self.assertEqual(manifest["files"]["images/a.png"]["content_type"], "image/png")
+
+    def test_diff_manifests(self):
+        old = self.build({"index.html": "old", "same.css": "body{}", "gone.html": "x"})
+        new = self.build({"index.html": "new", "same.css": "body{}", "added.html": "y"})
+        self.assertEqual(
+            diff_manifests(old, new),
+            {"added": ["added.html"], "changed": ["index.html"], "removed": ["gone.html"]},
+        )
+
+    def test_round_trip(self):
+        manifest = self.build({"index.html": "hi"})
+        path = os.path.join(self.root, "manifest.json")
+        with open(path, "w") as f:
+            f.write(manifest_to_json(manifest))
+        self.assertEqual(load_manifest(path), manifest)
+
+    def test_load_rejects_unknown_version(self):
+        path = os.path.join(self.root, "manifest.json")
+        with open(path, "w") as f:
+            f.write('{"version": 99, "files": {}}')
+        with self.assertRaises(ValueError):
+            load_manifest(path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,4 @@
+import random
 import unittest
 from textnode import TextNode, TextType
 from markdown_parser import (
@@ -8,6 +9,8 @@ from markdown_parser import (
     text_to_textnodes,
     markdown_to_htmlnode
 )
+from diagnostics import Diagnostics
+from test_support import assert_linear
 
 class TestMarkdownParser(unittest.TestCase):
     def test_extract_markdown_images(self):
@@ -326,6 +329,22 @@ the **same** even with inline stuff
             "<div><pre><code>This is text that _should_ remain\nthe **same** even with inline stuff\n</code></pre></div>",
         )
 
+    def test_codeblock_language_and_escaping(self):
+        md = """
+```python
+if a < b:
+
+    print("x")
+```
+"""
+        node = markdown_to_htmlnode(md)
+        html = node.to_html()
+        self.assertEqual(
+            html,
+            '<div><pre><code class="language-python"><span class="hl-keyword">if</span> a &lt; b:\n\n'
+            '    <span class="hl-builtin">print</span>(<span class="hl-string">"x"</span>)\n</code></pre></div>',
+        )
+
     def test_headings(self):
         md = """
 # Heading 1
@@ -338,7 +357,7 @@ the **same** even with inline stuff
         html = node.to_html()
         self.assertEqual(
             html,
-            "<div><h1>Heading 1</h1><h2>Heading 2 with <b>bold</b></h2><h3>Heading <i>3</i> with italic</h3></div>",
+            "<div><h1 id=\"heading-1\">Heading 1</h1><h2 id=\"heading-2-with-bold\">Heading 2 with <b>bold</b></h2><h3 id=\"heading-3-with-italic\">Heading <i>3</i> with italic</h3></div>",
         )
 
     def test_quotes(self):
@@ -383,6 +402,44 @@ the **same** even with inline stuff
             "<div><ol><li>First item with <b>bold</b></li><li>Second item with <i>italic</i></li><li>Third item with <code>code</code></li></ol></div>",
         )
 
+    def test_nested_lists(self):
+        md = """
+2. Second
+   - a **b**
+     - c
+   - d
+3. Third
+"""
+        self.assertEqual(
+            markdown_to_htmlnode(md).to_html(),
+            '<div><ol start="2"><li>Second<ul><li>a <b>b</b><ul><li>c</li></ul></li><li>d</li></ul></li>'
+            '<li>Third</li></ol></div>',
+        )
+
+    def test_multi_paragraph_list_items(self):
+        md = """
+- First paragraph
+  continues here.
+
+  Second paragraph.
+- [x] Done
+
+After
+"""
+        self.assertEqual(
+            markdown_to_htmlnode(md).to_html(),
+            '<div><ul class="contains-task-list"><li><p>First paragraph continues here.</p><p>Second paragraph.</p></li>'
+            '<li class="task-list-item"><p><input type="checkbox" disabled="" checked=""></input> Done</p></li></ul>'
+            '<p>After</p></div>',
+        )
+
+    def test_loose_lists_stay_one_list(self):
+        self.assertEqual(
+            markdown_to_htmlnode("1. a\n\n   - b\n\n2. c").to_html(),
+            '<div><ol><li><p>a</p><ul><li>b</li></ul></li><li><p>c</p></li></ol></div>',
+        )
+        self.assertEqual(markdown_to_htmlnode("- a\n\n\n- b").to_html(), "<div><ul><li><p>a</p></li><li><p>b</p></li></ul></div>")
+
     def test_mixed_content(self):
         self.maxDiff = None
         md = """
@@ -408,9 +465,157 @@ def hello():
         html = node.to_html()
         self.assertEqual(
             html,
-            "<div><h1>Main Heading</h1><p>This is a paragraph with <b>bold</b> and <i>italic</i> text.</p><pre><code>def hello():\n    print(\"world\")\n</code></pre><quote>A quote with <code>code</code> and multiple lines</quote><ol><li>First ordered item</li><li>Second ordered item</li></ol><ul><li>Unordered item 1</li><li>Unordered item 2</li></ul></div>",
+            "<div><h1 id=\"main-heading\">Main Heading</h1><p>This is a paragraph with <b>bold</b> and <i>italic</i> text.</p><pre><code>def hello():\n    print(\"world\")\n</code></pre><quote>A quote with <code>code</code> and multiple lines</quote><ol><li>First ordered item</li><li>Second ordered item</li></ol><ul><li>Unordered item 1</li><li>Unordered item 2</li></ul></div>",
         )
 
+    def test_table(self):
+        md = """
+| Name | Size \\| unit | Note |
+|:-----|:----:|-----:|
+| **a** | 1 |
+| b | 2 | x | extra |
+"""
+        self.assertEqual(
+            markdown_to_htmlnode(md).to_html(),
+            '<div><table><thead><tr><th align="left">Name</th><th align="center">Size | unit</th>'
+            '<th align="right">Note</th></tr></thead><tbody>'
+            '<tr><td align="left"><b>a</b></td><td align="center">1</td><td align="right"></td></tr>'
+            '<tr><td align="left">b</td><td align="center">2</td><td align="right">x</td></tr>'
+            '</tbody></table></div>',
+        )
+
+    def test_table_without_body(self):
+        self.assertEqual(
+            markdown_to_htmlnode("a | b\n--- | ---").to_html(),
+            "<div><table><thead><tr><th>a</th><th>b</th></tr></thead></table></div>",
+        )
+
+    def test_task_list(self):
+        md = "- [ ] Write _docs_\n- [X] Ship\n- Celebrate"
+        self.assertEqual(
+            markdown_to_htmlnode(md).to_html(),
+            '<div><ul class="contains-task-list">'
+            '<li class="task-list-item"><input type="checkbox" disabled=""></input> Write <i>docs</i></li>'
+            '<li class="task-list-item"><input type="checkbox" disabled="" checked=""></input> Ship</li>'
+            '<li>Celebrate</li></ul></div>',
+        )
+
+    def test_footnotes(self):
+        md = """
+Second[^b] then first[^a], second again[^b].
+
+[^a]: Note _a_
+on two lines.
+[^b]: Note b.
+
+[^unused]: Never referenced.
+"""
+        self.assertEqual(
+            markdown_to_htmlnode(md).to_html(),
+            '<div><p>Second<sup class="footnote-ref"><a href="#fn-b" id="fnref-b">1</a></sup>'
+            ' then first<sup class="footnote-ref"><a href="#fn-a" id="fnref-a">2</a></sup>,'
+            ' second again<sup class="footnote-ref"><a href="#fn-b" id="fnref-b-2">1</a></sup>.</p>'
+            '<section class="footnotes"><ol>'
+            '<li id="fn-b"><p>Note b. <a href="#fnref-b" class="footnote-backref">↩</a></p></li>'
+            '<li id="fn-a"><p>Note <i>a</i> on two lines. <a href="#fnref-a" class="footnote-backref">↩</a></p></li>'
+            '<li id="fn-unused"><p>Never referenced.</p></li>'
+            '</ol></section></div>',
+        )
+
+    def test_footnote_markers_in_code_and_bold_stay_literal(self):
+        self.assertEqual(
+            markdown_to_htmlnode("`[^1]` and `x[^1]y` and **[^x]**").to_html(),
+            "<div><p><code>[^1]</code> and <code>x[^1]y</code> and <b>[^x]</b></p></div>",
+        )
+
+    def test_undefined_footnote_is_reported(self):
+        diagnostics = Diagnostics("page.md")
+        html = markdown_to_htmlnode("# Title\n\nA claim[^missing] and[^a].\n\n[^a]: Defined.", diagnostics=diagnostics).to_html()
+        self.assertIn('<li id="fn-a" value="2">', html)
+        self.assertEqual(
+            [str(item) for item in diagnostics.items],
+            ["page.md:3: warning: Footnote [^missing] is referenced but never defined"],
+        )
+
+    def test_large_table_is_linear(self):
+        def render(rows):
+            node = markdown_to_htmlnode("| a | b | c |\n|---|---|---|\n" + "| x | **y** | z |\n" * rows)
+            self.assertEqual(len(node.children[0].children[1].children), rows)
+
+        assert_linear(self, render, 1000)
+
+
+class TestWorstCase(unittest.TestCase):
+    # Inputs that are cheap to write and expensive to parse if any step
+    # rescans the text per match, per delimiter or per nesting level
+    PATHOLOGICAL = {
+        "links": lambda n: "see [a](/b) " * n,
+        "images": lambda n: "see ![a](/b.png) " * n,
+        "links_and_images": lambda n: "[a](/b)![c](/d)" * n,
+        "unclosed_links": lambda n: "[a](" * n,
+        "open_brackets": lambda n: "[" * n + "](" * n,
+        "bold": lambda n: "**a** " * n,
+        "unclosed_delimiters": lambda n: "**a _b `c " * n,
+        "underscores": lambda n: "_" * n,
+        "footnote_references": lambda n: "x[^1]" * n + "\n\n[^1]: note",
+        "headings": lambda n: "# Same title\n\n" * n,
+        "quotes": lambda n: "> > > quoted\n" * n,
+        "paragraphs": lambda n: "p\n\n" * n,
+        "unclosed_fence": lambda n: "```\n" + "code\n" * n,
+    }
+
+    def test_pathological_inputs_are_linear(self):
+        for name, make_markdown in self.PATHOLOGICAL.items():
+            with self.subTest(name):
+                assert_linear(self, lambda n: markdown_to_htmlnode(make_markdown(n), diagnostics=Diagnostics()).to_html(), 250)
+
+    # Long text between matches, so copying the rest of it per match shows
+    def test_split_nodes_link_is_linear(self):
+        def split(count):
+            nodes = split_nodes_link([TextNode(("some words " * 10 + "[a](/b) ") * count, TextType.TEXT)])
+            self.assertEqual(len(nodes), 2 * count + 1)
+
+        assert_linear(self, split, 2000)
+
+    def test_split_nodes_image_is_linear(self):
+        def split(count):
+            nodes = split_nodes_image([TextNode(("some words " * 10 + "![a](/b.png) ") * count, TextType.TEXT)])
+            self.assertEqual(len(nodes), 2 * count + 1)
+
+        assert_linear(self, split, 2000)
+
+    def test_split_keeps_text_around_padded_links(self):
+        nodes = split_nodes_link([TextNode("a [ b ]( /c ) d [e](/f)", TextType.TEXT)])
+        self.assertListEqual(
+            [
+                TextNode("a ", TextType.TEXT),
+                TextNode("b", TextType.LINK, "/c"),
+                TextNode(" d ", TextType.TEXT),
+                TextNode("e", TextType.LINK, "/f"),
+            ],
+            nodes,
+        )
+
+    def test_fuzz(self):
+        # Fragments of every syntax, shuffled into mostly broken markdown
+        fragments = [
+            "#", "# ", "**", "_", "`", "```", "[", "]", "(", ")", "![", "[^", "]:", "|", "---",
+            "- ", "1. ", "> ", "- [ ] ", "  ", "\n", "\n\n", "text", "\\", "<", "&", "\t",
+        ]
+        rng = random.Random(48)
+        for _ in range(300):
+            md = "".join(rng.choice(fragments) for _ in range(rng.randint(1, 60)))
+            with self.subTest(md=md):
+                diagnostics = Diagnostics()
+                html = markdown_to_htmlnode(md, diagnostics=diagnostics).to_html()
+                self.assertTrue(html.startswith("<div>"))
+                try:
+                    markdown_to_htmlnode(md)
+                except ValueError:
+                    # Without diagnostics malformed markup raises, never
+                    # anything else
+                    pass
+
 
 if __name__ == "__main__":
     unittest.main() 
\ No newline at end of file
@@ -1,5 +1,7 @@
+import math
 import unittest
-from markdown_to_blocks import markdown_to_blocks, block_to_block_type, BlockType
+from markdown_to_blocks import markdown_to_blocks, block_to_block_type, parse_list, split_table_row, BlockType
+from test_support import assert_linear
 
 class TestMarkdownToBlocks(unittest.TestCase):
     def test_markdown_to_blocks(self):
@@ -39,6 +41,26 @@ This is the same paragraph on a new line
             ["First block", "Second block"]
         )
 
+    def test_fenced_code_keeps_indentation_and_blank_lines(self):
+        md = "Intro\n\n  ```python\n  def f():\n\n      return 1\n  ```\n\nOutro"
+        self.assertEqual(
+            markdown_to_blocks(md),
+            ["Intro", "```python\ndef f():\n\n    return 1\n```", "Outro"],
+        )
+
+    def test_lists_keep_relative_indentation(self):
+        md = "  - a\n    - nested\n\n    second paragraph\n\n  - b\n\nAfter"
+        self.assertEqual(
+            markdown_to_blocks(md),
+            ["- a\n  - nested\n\n  second paragraph\n\n- b", "After"],
+        )
+
+    def test_blank_lines_between_items(self):
+        self.assertEqual(markdown_to_blocks("- a\n\n\n- b"), ["- a\n\n- b"])
+        self.assertEqual(markdown_to_blocks("1. a\n\n   - b\n\n2. c"), ["1. a\n\n   - b\n\n2. c"])
+        # Another kind of marker starts another list
+        self.assertEqual(markdown_to_blocks("- a\n\n1. b"), ["- a", "1. b"])
+
 class TestBlockToBlockType(unittest.TestCase):
     def test_paragraph(self):
         block = "This is a normal paragraph with **bold** and _italic_ text."
@@ -106,14 +128,95 @@ class TestBlockToBlockType(unittest.TestCase):
         block = "1. First\n3. Third\n2. Second"
         self.assertEqual(block_to_block_type(block), BlockType.PARAGRAPH)
         
-        # Invalid list (not starting with 1)
+        # Lists may start at any number
         block = "2. First\n3. Second"
-        self.assertEqual(block_to_block_type(block), BlockType.PARAGRAPH)
+        self.assertEqual(block_to_block_type(block), BlockType.ORDERED_LIST)
         
         # Invalid list (missing space after number)
         block = "1.First"
         self.assertEqual(block_to_block_type(block), BlockType.PARAGRAPH)
 
+    def test_nested_list(self):
+        block = "1. First\n   - nested\n     1. deeper\n\n   more of First\n2. Second"
+        self.assertEqual(block_to_block_type(block), BlockType.ORDERED_LIST)
+
+        # Unindented lines must be top-level items
+        self.assertEqual(block_to_block_type("- a\nnot an item"), BlockType.PARAGRAPH)
+
+    def test_task_list(self):
+        block = "- [ ] Todo\n- [x] Done\n- Plain"
+        self.assertEqual(block_to_block_type(block), BlockType.TASK_LIST)
+        self.assertEqual(block_to_block_type("- [link](/) item"), BlockType.UNORDERED_LIST)
+
+    def test_table(self):
+        block = "| a | b |\n|:--|--:|\n| 1 | 2 |"
+        self.assertEqual(block_to_block_type(block), BlockType.TABLE)
+
+        # Pipes at the edges are optional
+        self.assertEqual(block_to_block_type("a | b\n--- | ---"), BlockType.TABLE)
+
+        # The delimiter row must have as many cells as the header
+        self.assertEqual(block_to_block_type("| a | b |\n| --- |"), BlockType.PARAGRAPH)
+        self.assertEqual(block_to_block_type("a | b\nnot a delimiter"), BlockType.PARAGRAPH)
+
+    def test_footnote(self):
+        self.assertEqual(block_to_block_type("[^1]: A note\ncontinued"), BlockType.FOOTNOTE)
+        self.assertEqual(block_to_block_type("[^1] is not a definition"), BlockType.PARAGRAPH)
+
+class TestParseList(unittest.TestCase):
+    def test_nesting_and_paragraphs(self):
+        block = "3. Three\n   wraps\n   - a\n     - deep\n   - b\n\n   After the list\n4. Four"
+        top = parse_list(block)
+        self.assertTrue(top.ordered)
+        self.assertEqual(top.start, 3)
+        self.assertTrue(top.loose)
+        three, four = top.items
+        self.assertEqual(three.blocks[0], "Three wraps")
+        nested = three.blocks[1]
+        self.assertFalse(nested.ordered)
+        self.assertEqual([item.blocks[0] for item in nested.items], ["a", "b"])
+        self.assertEqual(nested.items[0].blocks[1].items[0].blocks, ["deep"])
+        self.assertEqual(three.blocks[2], "After the list")
+        self.assertEqual(four.blocks, ["Four"])
+
+    def test_dedent_closes_several_levels(self):
+        lines = [" " * (2 * depth) + f"- level {depth}" for depth in range(50)] + ["- top again"]
+        top = parse_list("\n".join(lines))
+        self.assertEqual([item.blocks[0] for item in top.items], ["level 0", "top again"])
+        depth, item = 0, top.items[0]
+        while len(item.blocks) > 1:
+            item = item.blocks[1].items[0]
+            depth += 1
+        self.assertEqual(depth, 49)
+
+    def test_depth_is_not_limited_by_recursion(self):
+        lines = [" " * (2 * depth) + "- item" for depth in range(5000)]
+        top = parse_list("\n".join(lines))
+        self.assertEqual(top.items[0].blocks[0], "item")
+
+    def test_deeply_nested_list_is_linear(self):
+        def parse(size):
+            # Indentation grows with depth, so the input is about size
+            # characters at the square root of that depth
+            depth = math.isqrt(size)
+            (block,) = markdown_to_blocks("\n".join(" " * (2 * level) + f"- item {level}" for level in range(depth)))
+            self.assertEqual(parse_list(block).items[0].blocks[0], "item 0")
+
+        # Re-splitting the block per level would be quadratic in the input;
+        # building the HTML nodes recurses per level, so only parsing counts
+        assert_linear(self, parse, 1600)
+
+    def test_task_items(self):
+        top = parse_list("- [ ] open\n- [x] done\n- plain")
+        self.assertEqual([item.task for item in top.items], [False, True, None])
+        self.assertEqual(top.items[0].blocks, ["open"])
+
+class TestSplitTableRow(unittest.TestCase):
+    def test_edges_and_escapes(self):
+        self.assertEqual(split_table_row("| a | b \\| c |"), ["a", "b | c"])
+        self.assertEqual(split_table_row("a|b"), ["a", "b"])
+        self.assertEqual(split_table_row("| a | |"), ["a", ""])
+
 if __name__ == '__main__':
     unittest.main()
 
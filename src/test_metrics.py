@@ -0,0 +1,68 @@
+import json
+import unittest
+
+from markdown_parser import markdown_to_htmlnode
+from metrics import Histogram, Metrics
+
+class TestMetrics(unittest.TestCase):
+    def test_counters_by_label(self):
+        metrics = Metrics()
+        metrics.inc("blocks", type="code")
+        metrics.inc("blocks", 2, type="code")
+        metrics.inc("blocks", type="paragraph")
+        self.assertEqual(metrics.counters, {("blocks", (("type", "code"),)): 3, ("blocks", (("type", "paragraph"),)): 1})
+
+    def test_histogram_buckets(self):
+        histogram = Histogram((1, 10))
+        for value in (0.5, 1, 5, 50):
+            histogram.observe(value)
+        self.assertEqual(histogram.cumulative(), [(1, 2), (10, 3), (float("inf"), 4)])
+        self.assertEqual(histogram.sum, 56.5)
+
+    def test_merge(self):
+        metrics, worker = Metrics(), Metrics()
+        metrics.inc("blocks", type="code")
+        worker.inc("blocks", 2, type="code")
+        worker.inc("blocks", type="heading")
+        worker.observe("page_render_seconds", 0.002)
+        metrics.merge(worker)
+        metrics.merge(worker)
+        counters, histograms = metrics.snapshot()
+        self.assertEqual(counters[("blocks", (("type", "code"),))], 5)
+        self.assertEqual(counters[("blocks", (("type", "heading"),))], 2)
+        self.assertEqual(histograms[("page_render_seconds", ())].count, 2)
+
+    def test_prometheus(self):
+        metrics = Metrics()
+        metrics.inc("pages_rendered", 3)
+        metrics.inc("blocks", type='a "b"')
+        metrics.observe("phase_seconds", 0.003, phase="pages")
+        metrics.add_source(lambda: [("cache_hits", {"cache": "highlight"}, 7)])
+        text = metrics.to_prometheus()
+        self.assertIn('# TYPE ssg_blocks_total counter\nssg_blocks_total{type="a \\"b\\""} 1\n', text)
+        self.assertIn('ssg_cache_hits_total{cache="highlight"} 7\n', text)
+        self.assertIn("ssg_pages_rendered_total 3\n", text)
+        self.assertIn('# TYPE ssg_phase_seconds histogram\n', text)
+        self.assertIn('ssg_phase_seconds_bucket{phase="pages",le="0.0025"} 0\n', text)
+        self.assertIn('ssg_phase_seconds_bucket{phase="pages",le="0.005"} 1\n', text)
+        self.assertIn('ssg_phase_seconds_bucket{phase="pages",le="+Inf"} 1\n', text)
+        self.assertIn('ssg_phase_seconds_count{phase="pages"} 1\n', text)
+
+    def test_json(self):
+        metrics = Metrics()
+        with metrics.time("phase_seconds", phase="static"):
+            pass
+        data = json.loads(metrics.to_json())
+        self.assertEqual(data["histograms"][0]["labels"], {"phase": "static"})
+        self.assertEqual(data["histograms"][0]["buckets"]["+Inf"], 1)
+
+    def test_parser_counts_blocks_and_inline_nodes(self):
+        metrics = Metrics()
+        markdown_to_htmlnode("# Title\n\nSome **bold** text\n\n```\ncode\n```\n\n- a\n- b", metrics=metrics)
+        blocks = {dict(labels)["type"]: value for (name, labels), value in metrics.counters.items() if name == "blocks"}
+        self.assertEqual(blocks, {"heading": 1, "paragraph": 1, "code": 1, "unordered_list": 1})
+        # "Title", three nodes for the paragraph, one per list item
+        self.assertEqual(metrics.counters["inline_nodes", ()], 6)
+
+if __name__ == "__main__":
+    unittest.main()
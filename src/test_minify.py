@@ -0,0 +1,60 @@
+import tempfile
+import unittest
+
+from cache import DiskCache
+from minify import Minifier, minify_css, minify_html
+
+class TestMinifyHTML(unittest.TestCase):
+    def test_collapses_template_indentation(self):
+        html = "<html>\n  <head>\n    <title>Hi   there</title>\n  </head>\n</html>\n"
+        self.assertEqual(minify_html(html), "<html><head><title>Hi there</title></head></html>")
+
+    def test_keeps_inline_spacing(self):
+        self.assertEqual(minify_html("<p><b>a</b> <i>b</i></p>"), "<p><b>a</b> <i>b</i></p>")
+
+    def test_leaves_pre_alone(self):
+        html = "<div>\n  <pre><code>def f():\n    return 1\n</code></pre>\n  <p>a   b</p>\n</div>"
+        self.assertEqual(
+            minify_html(html),
+            "<div><pre><code>def f():\n    return 1\n</code></pre><p>a b</p></div>",
+        )
+
+    def test_leaves_multiple_preserved_blocks_alone(self):
+        html = "<PRE>a  b</PRE>\n<p>x  y</p>\n<textarea>c\n  d</textarea>"
+        self.assertEqual(minify_html(html), "<PRE>a  b</PRE><p>x y</p><textarea>c\n  d</textarea>")
+
+    def test_leaves_scripts_and_styles_alone(self):
+        html = "<head>\n  <script>\n    // greet\n    alert(1);\n  </script>\n  <style>\n  p {  }\n  </style>\n</head>"
+        self.assertEqual(
+            minify_html(html),
+            "<head><script>\n    // greet\n    alert(1);\n  </script><style>\n  p {  }\n  </style></head>",
+        )
+
+class TestMinifyCSS(unittest.TestCase):
+    def test_minify_css(self):
+        css = "/* main */\nbody {\n  color: #fff;\n  margin: 0 auto;\n}\n\nh1, h2 > a {\n  font-size: 2em;\n}\n"
+        self.assertEqual(minify_css(css), "body{color:#fff;margin:0 auto}h1,h2>a{font-size:2em}")
+
+    def test_keeps_strings(self):
+        css = 'a::after { content: "  /* not a comment */  "; }'
+        self.assertEqual(minify_css(css), 'a::after{content:"  /* not a comment */  "}')
+
+
+class TestMinifier(unittest.TestCase):
+    def test_tracks_savings(self):
+        minifier = Minifier()
+        minifier.html("<p>\n  a\n</p>")
+        self.assertEqual(minifier.bytes_in, 12)
+        self.assertEqual(minifier.bytes_out, 10)
+        self.assertEqual(minifier.summary(), "saved 2 bytes (16.7% of 12)")
+
+    def test_disk_cache_reused_across_instances(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            Minifier(cache=DiskCache(tmp, "minify")).css("a { color: red; }")
+            minifier = Minifier(cache=DiskCache(tmp, "minify"))
+            self.assertEqual(minifier.css("a { color: red; }"), "a{color:red}")
+            self.assertEqual(minifier.cache.hits, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import os
+import json
+import datetime
+import tempfile
+import unittest
+
+from multisite import MultiSiteBuild
+
+TEMPLATE = "<title>{{ Title }}</title><link href=\"{{ css_path }}\">{{ Content }}"
+
+class TestMultiSiteBuild(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.write("content/index.md", "# Home\n\n[About](/about/) ![logo](/logo.png)")
+        self.write("content/index.fr.md", "# Accueil\n\n[A propos](/about/)")
+        self.write("content/about/index.md", "# About")
+        self.write("static/index.css", "body {\n  color: red;\n}\n")
+        self.write("static/logo.png", "png")
+        self.write("template.html", TEMPLATE)
+        self.config = self.write("sites.json", json.dumps({
+            "sites": [
+                {"name": "main", "output_dir": "out/main", "base_path": "/blog/", "locales": ["en", "fr"]},
+                {"name": "mirror", "output_dir": "out/mirror"},
+                {"name": "min", "output_dir": "out/min", "minify": True},
+            ],
+        }))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, rel_path, content):
+        path = os.path.join(self.root, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    def read(self, rel_path):
+        with open(os.path.join(self.root, rel_path)) as f:
+            return f.read()
+
+    def build(self):
+        with MultiSiteBuild.from_config(self.config) as build:
+            return build, build.build()
+
+    def test_each_source_is_parsed_once(self):
+        build, results = self.build()
+        self.assertEqual(build.parses, 3)
+        self.assertEqual(results["main"].pages_rendered, 4)
+        self.assertEqual(results["mirror"].pages_rendered, 2)
+
+    def test_base_path_per_site_and_locale(self):
+        self.build()
+        main = self.read("out/main/index.html")
+        self.assertIn('<a href="/blog/about/">About</a>', main)
+        self.assertIn('src="/blog/logo.png"', main)
+        self.assertIn('<a href="/about/">About</a>', self.read("out/mirror/index.html"))
+
+        french = self.read("out/main/fr/index.html")
+        self.assertIn("<title>Accueil</title>", french)
+        self.assertIn('<a href="/blog/fr/about/">A propos</a>', french)
+        # Pages without a translation fall back to the default source
+        self.assertIn("<title>About</title>", self.read("out/main/fr/about/index.html"))
+
+    def test_stylesheet_is_shared_by_locales(self):
+        self.build()
+        self.assertIn('<link href="index.css">', self.read("out/main/index.html"))
+        self.assertIn('<link href="../../index.css">', self.read("out/main/fr/about/index.html"))
+
+    def test_assets_are_hard_linked(self):
+        self.build()
+        main = os.stat(os.path.join(self.root, "out/main/logo.png"))
+        mirror = os.stat(os.path.join(self.root, "out/mirror/logo.png"))
+        self.assertEqual((main.st_ino, main.st_dev), (mirror.st_ino, mirror.st_dev))
+        # The minified stylesheet is a different file
+        self.assertEqual(self.read("out/min/index.css"), "body{color:red}")
+        self.assertEqual(self.read("out/main/index.css"), "body {\n  color: red;\n}\n")
+
+    def test_rebuild_leaves_outputs_untouched(self):
+        self.build()
+        _, results = self.build()
+        for result in results.values():
+            self.assertEqual((result.writer.written, result.writer.deleted), (0, 0))
+
+    def test_drafts_and_scheduled_pages(self):
+        self.write("content/draft/index.md", "---\ndraft: true\n---\n# Draft")
+        self.write("content/later/index.md", "---\ndate: 2030-01-01\n---\n# Later")
+        today = datetime.date(2029, 12, 31)
+        cases = [
+            ({}, set()),
+            ({"drafts": True}, {"draft"}),
+            ({"future": True}, {"later"}),
+            ({"today": datetime.date(2030, 1, 1)}, {"later"}),
+        ]
+        for flags, built in cases:
+            with self.subTest(**flags):
+                options = {"today": today, **flags}
+                with MultiSiteBuild.from_config(self.config, **options) as build:
+                    build.build()
+                found = {name for name in ("draft", "later")
+                         if os.path.exists(os.path.join(self.root, "out/mirror", name, "index.html"))}
+                self.assertEqual(found, built)
+
+    def test_bad_config(self):
+        self.write("sites.json", json.dumps({"sites": [{"name": "a"}]}))
+        with self.assertRaises(ValueError):
+            MultiSiteBuild.from_config(self.config)
+
+
+if __name__ == "__main__":
+    unittest.main()
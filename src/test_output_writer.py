@@ -0,0 +1,129 @@
+import os
+import tempfile
+import unittest
+
+from output_writer import OutputWriter
+
+class TestOutputWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def read(self, *parts):
+        with open(os.path.join(self.root, *parts), "rb") as f:
+            return f.read()
+
+    def test_write_creates_file_and_dirs(self):
+        writer = OutputWriter(self.root)
+        self.assertTrue(writer.write(os.path.join(self.root, "a", "b", "index.html"), "<p>hi</p>"))
+        self.assertEqual(self.read("a", "b", "index.html"), b"<p>hi</p>")
+        self.assertEqual(writer.written, 1)
+
+    def test_identical_content_is_not_rewritten(self):
+        path = os.path.join(self.root, "index.html")
+        OutputWriter(self.root).write(path, "same")
+        os.utime(path, (0, 0))
+
+        writer = OutputWriter(self.root)
+        self.assertFalse(writer.write(path, "same"))
+        self.assertEqual(os.stat(path).st_mtime, 0)
+        self.assertEqual(writer.unchanged, 1)
+        self.assertEqual(writer.written, 0)
+
+    def test_changed_content_is_replaced(self):
+        path = os.path.join(self.root, "index.html")
+        OutputWriter(self.root).write(path, "old")
+        writer = OutputWriter(self.root)
+        self.assertTrue(writer.write(path, "new content"))
+        self.assertEqual(self.read("index.html"), b"new content")
+
+    def test_no_temp_files_left_behind(self):
+        writer = OutputWriter(self.root)
+        writer.write(os.path.join(self.root, "index.html"), b"\x00\x01")
+        self.assertEqual(os.listdir(self.root), ["index.html"])
+
+    def test_written_files_use_umask_mode(self):
+        writer = OutputWriter(self.root)
+        path = os.path.join(self.root, "index.html")
+        writer.write(path, "x")
+        self.assertEqual(os.stat(path).st_mode & 0o777, writer._file_mode)
+
+    def test_prune_deletes_stale_outputs(self):
+        first = OutputWriter(self.root)
+        first.write(os.path.join(self.root, "keep.html"), "keep")
+        first.write(os.path.join(self.root, "old", "gone.html"), "gone")
+
+        second = OutputWriter(self.root)
+        second.write(os.path.join(self.root, "keep.html"), "keep")
+        self.assertEqual(second.prune(), 1)
+        self.assertEqual(os.listdir(self.root), ["keep.html"])
+        self.assertEqual(second.summary(), "0 written, 1 unchanged, 1 deleted")
+
+    def test_open_streams_and_skips_identical(self):
+        path = os.path.join(self.root, "big", "index.html")
+        writer = OutputWriter(self.root)
+        with writer.open(path) as out:
+            out.write("<p>")
+            out.write(b"streamed")
+            out.write("</p>")
+        self.assertEqual(self.read("big", "index.html"), b"<p>streamed</p>")
+        self.assertEqual(writer.records[path][1], 15)
+
+        again = OutputWriter(self.root)
+        with again.open(path) as out:
+            out.write("<p>streamed</p>")
+        self.assertEqual((again.written, again.unchanged), (0, 1))
+        self.assertEqual(os.listdir(os.path.join(self.root, "big")), ["index.html"])
+
+    def test_open_discards_output_on_error(self):
+        path = os.path.join(self.root, "index.html")
+        writer = OutputWriter(self.root)
+        with self.assertRaises(RuntimeError):
+            with writer.open(path) as out:
+                out.write("partial")
+                raise RuntimeError("render failed")
+        self.assertEqual(os.listdir(self.root), [])
+
+    def test_link_shares_the_file(self):
+        first = os.path.join(self.root, "a", "logo.png")
+        second = os.path.join(self.root, "b", "logo.png")
+        writer = OutputWriter(self.root)
+        writer.write(first, b"png")
+        self.assertTrue(writer.link(first, second, writer.records[first]))
+        self.assertTrue(os.path.samefile(first, second))
+        self.assertEqual(writer.records[second], writer.records[first])
+
+        again = OutputWriter(self.root)
+        self.assertFalse(again.link(first, second, writer.records[first]))
+        self.assertEqual(again.unchanged, 1)
+
+        # Rewriting one path replaces it and leaves the other alone
+        again.write(second, b"gif")
+        self.assertEqual(self.read("a", "logo.png"), b"png")
+
+    def test_make_dirs_batches(self):
+        writer = OutputWriter(self.root)
+        dirs = [os.path.join(self.root, "x", "y"), os.path.join(self.root, "x", "y"), os.path.join(self.root, "z")]
+        writer.make_dirs(dirs)
+        self.assertTrue(os.path.isdir(os.path.join(self.root, "x", "y")))
+        self.assertTrue(os.path.isdir(os.path.join(self.root, "z")))
+        self.assertIn(os.path.join(self.root, "x"), writer._dirs)
+
+    def test_fixed_mtime(self):
+        path = os.path.join(self.root, "a", "index.html")
+        OutputWriter(self.root).write(path, "same")
+        writer = OutputWriter(self.root, mtime=1000)
+        # Unchanged files get the mtime too, so the result never depends
+        # on what was there before
+        self.assertFalse(writer.write(path, "same"))
+        with writer.open(os.path.join(self.root, "big.html")) as out:
+            out.write("streamed")
+        writer.prune()
+        for rel_path in ("a/index.html", "big.html", "a"):
+            self.assertEqual(os.stat(os.path.join(self.root, rel_path)).st_mtime, 1000)
+
+if __name__ == "__main__":
+    unittest.main()
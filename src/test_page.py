@@ -0,0 +1,155 @@
+import os
+import tempfile
+import unittest
+
+from minify import Minifier
+from output_writer import OutputWriter
+from page import extract_title, extract_title_from_file, generate_page
+from renderers import OutputTarget
+
+MARKDOWN = """
+Intro line before the title
+
+# The  Title 
+
+Some [link](/somewhere) and ![img](/a.png) with **bold** & <angles>.
+
+```python
+def f():
+
+    return 1
+```
+
+- one
+- two
+"""
+
+TEMPLATE = """<html>
+  <head><title>{{ Title }}</title><link href="{{ css_path }}" /></head>
+  <body><a href="/">home</a>{{ Content }}</body>
+</html>
+"""
+
+class TestPage(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.source = self.path("content", "index.md", content=MARKDOWN)
+        self.template = self.path("template.html", content=TEMPLATE)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def path(self, *parts, content=None):
+        path = os.path.join(self.root, *parts)
+        if content is not None:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write(content)
+        return path
+
+    def render(self, stream, minify=False):
+        to_path = self.path("out", "stream" if stream else "memory", "index.html")
+        writer = OutputWriter(self.path("out"))
+        minifier = Minifier() if minify else None
+        generate_page(self.source, self.template, to_path, "/base/", writer, None, minifier, stream)
+        with open(to_path) as f:
+            return f.read()
+
+    def test_extract_title_from_file_matches_extract_title(self):
+        self.assertEqual(extract_title_from_file(self.source), extract_title(MARKDOWN))
+        self.assertEqual(extract_title_from_file(self.source), "The  Title")
+
+    def test_extract_title_from_file_without_h1(self):
+        empty = self.path("empty.md", content="")
+        no_title = self.path("no_title.md", content="## Only h2\n#\n#   \n")
+        for path in (empty, no_title):
+            with self.assertRaises(ValueError):
+                extract_title_from_file(path)
+
+    def test_streaming_matches_in_memory_render(self):
+        self.assertEqual(self.render(stream=True), self.render(stream=False))
+
+    def test_streaming_matches_in_memory_render_minified(self):
+        self.assertEqual(self.render(stream=True, minify=True), self.render(stream=False, minify=True))
+
+    def test_toc_matches_between_streaming_and_in_memory(self):
+        self.path("template.html", content="<nav>{{ TOC }}</nav>" + TEMPLATE + "<footer>{{ TOC }}</footer>")
+        html = self.render(stream=True)
+        self.assertEqual(html, self.render(stream=False))
+        self.assertIn('<nav><ul class="toc"><li><a href="#the--title">The  Title</a></li></ul></nav>', html)
+        self.assertIn('<h1 id="the--title">', html)
+
+    def test_stats_match_between_streaming_and_in_memory(self):
+        variables = "{{ WordCount }}/{{ ReadingTime }}/{{ Excerpt }}"
+        self.path("template.html", content=variables + TEMPLATE + variables)
+        html = self.render(stream=True)
+        self.assertEqual(html, self.render(stream=False))
+        self.assertTrue(html.startswith("16/1/Intro line before the title Some link and with bold &amp; &lt;angles&gt;.<html>"))
+
+    def test_unclosed_fence_at_end_matches_between_streaming_and_in_memory(self):
+        for ending in ("", "\n", "\n\n"):
+            with self.subTest(ending=ending):
+                self.path("content", "index.md", content="# T\n\n```\nrun ```" + ending)
+                html = self.render(stream=True)
+                self.assertEqual(html, self.render(stream=False))
+
+    def test_footnotes_match_between_streaming_and_in_memory(self):
+        self.path("content", "index.md", content=MARKDOWN + "\nA claim[^1].\n\n[^1]: The source.\n\n| a |\n|---|\n| b |\n")
+        html = self.render(stream=True)
+        self.assertEqual(html, self.render(stream=False))
+        self.assertIn('<table><thead><tr><th>a</th></tr></thead><tbody><tr><td>b</td></tr></tbody></table>'
+                      '<section class="footnotes">', html)
+
+    def test_targets_match_between_streaming_and_in_memory(self):
+        outputs = {}
+        for stream in (True, False):
+            out = self.path("targets", str(stream))
+            targets = [(OutputTarget("json", out), os.path.join(out, "index.json")),
+                       (OutputTarget("text", out), os.path.join(out, "index.txt"))]
+            writer = OutputWriter(out)
+            generate_page(self.source, self.template, os.path.join(out, "index.html"), "/", writer, None, None, stream, None, targets)
+            outputs[stream] = sorted(writer.records.values())
+        self.assertEqual(outputs[True], outputs[False])
+        self.assertEqual(len(outputs[True]), 3)
+
+    def test_rendered_page(self):
+        html = self.render(stream=False)
+        self.assertIn("<title>The  Title</title>", html)
+        self.assertIn('<a href="/base/somewhere">link</a>', html)
+        self.assertIn('<a href="/base/">home</a>', html)
+        self.assertIn("&amp; &lt;angles&gt;", html)
+
+    def test_css_path_is_relative_to_the_output_root(self):
+        # The site is built away from the template's directory
+        writer = OutputWriter(self.path("build", "site"))
+        for stream in (False, True):
+            to_path = self.path("build", "site", "blog", str(stream), "index.html")
+            generate_page(self.source, self.template, to_path, "/", writer, stream=stream)
+            with open(to_path) as f:
+                self.assertIn('<link href="../../index.css" />', f.read())
+
+    def test_title_is_escaped(self):
+        self.path("content", "index.md", content="# A <b> & C\n\nText")
+        for stream in (False, True):
+            html = self.render(stream)
+            self.assertIn("<title>A &lt;b&gt; &amp; C</title>", html)
+            self.assertIn('<h1 id="a-b--c">A &lt;b&gt; &amp; C</h1>', html)
+
+    def test_nested_page_without_writer(self):
+        # The site root defaults to the directory beside the template
+        to_path = self.path("docs", "blog", "tom", "index.html")
+        generate_page(self.source, self.template, to_path, "/")
+        with open(to_path) as f:
+            self.assertIn('<link href="../../index.css" />', f.read())
+
+    def test_only_site_absolute_urls_are_resolved(self):
+        self.path("content", "index.md", content="# T\n\n[cdn](//cdn.example/x) [a](/a) `href=\"/code\"`\n\n<p><a href=\"/raw\">raw</a></p>\n")
+        for stream in (False, True):
+            html = self.render(stream)
+            self.assertIn('<a href="//cdn.example/x">cdn</a> <a href="/base/a">a</a>', html)
+            self.assertIn('<code>href="/code"</code>', html)
+            self.assertIn('<a href="/base/">home</a>', html)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+
+from markdown_parser import markdown_to_htmlnode
+from page_stats import PageStats, build_page_index
+from session import PageInfo
+
+def collect(markdown, **options):
+    stats = PageStats(**options)
+    markdown_to_htmlnode(markdown, stats=stats)
+    return stats
+
+class TestPageStats(unittest.TestCase):
+    def test_word_count(self):
+        stats = collect("# A title\n\nOne **two** three[link words](/x) ![alt text](/a.png)\n\n- four\n- five")
+        # "three" and "link" run together as one word; alt text is not read
+        self.assertEqual(stats.words, 8)
+
+    def test_code_blocks_are_not_counted(self):
+        self.assertEqual(collect("Words here\n\n```\nlots of code words\n```").words, 2)
+
+    def test_reading_time(self):
+        self.assertEqual(collect("word").reading_time, 1)
+        self.assertEqual(collect(" ".join(["word"] * 401)).reading_time, 3)
+
+    def test_excerpt_skips_headings(self):
+        stats = collect("# Title\n\nFirst paragraph with _style_.\n\n## Next\n\nSecond one.")
+        self.assertEqual(stats.excerpt, "First paragraph with style. Second one.")
+
+    def test_excerpt_is_cut_at_a_word(self):
+        stats = collect("The quick brown fox, jumps over the lazy dog", excerpt_length=22)
+        self.assertEqual(stats.excerpt, "The quick brown fox…")
+
+    def test_excerpt_stops_collecting_early(self):
+        stats = collect("\n\n".join(["Some words in a paragraph."] * 1000), excerpt_length=40)
+        self.assertLess(len(stats._excerpt), 10)
+        self.assertEqual(stats.words, 5000)
+
+    def test_variables_escape_the_excerpt(self):
+        stats = collect("Use <b> & co")
+        self.assertEqual(stats.variables()["{{ Excerpt }}"], "Use &lt;b&gt; &amp; co")
+
+    def test_page_index(self):
+        page = PageInfo("post.md", "post.html", "/post/", "Post")
+        page.stats = collect("Two words")
+        index = build_page_index([page], "/site/")
+        self.assertEqual(index["pages"], [{"url": "/site/post/", "title": "Post", "words": 2, "reading_time": 1, "excerpt": "Two words"}])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from pipeline import run_pipeline
+
+def square(value):
+    return value * value
+
+class TestPipeline(unittest.TestCase):
+    def test_stages_run_in_order(self):
+        written = []
+        run_pipeline(range(100), lambda item: item + 1, square, written.append)
+        self.assertEqual(written, [(i + 1) ** 2 for i in range(100)])
+
+    def test_executor_keeps_order(self):
+        written = []
+        with ThreadPoolExecutor(4) as pool:
+            run_pipeline(range(100), lambda item: item, square, written.append, pool, depth=3)
+        self.assertEqual(written, [i * i for i in range(100)])
+
+    def test_reader_stays_bounded(self):
+        read = []
+        written = []
+        gate = threading.Event()
+
+        def write(value):
+            gate.wait(5)
+            written.append(value)
+
+        thread = threading.Thread(target=run_pipeline, args=(range(100), read.append, lambda value: value, write),
+                                  kwargs={"depth": 2})
+        thread.start()
+        # The writer is stuck on the first item: at most one item per queue
+        # slot plus one in each stage's hands can be in flight
+        threading.Event().wait(0.2)
+        self.assertLessEqual(len(read), 2 + 2 + 3)
+        gate.set()
+        thread.join(5)
+        self.assertEqual(len(read), 100)
+
+    def test_errors_reach_the_caller(self):
+        def fail(value):
+            if value == 5:
+                raise ValueError("stage failed")
+            return value
+
+        for read, render in ((fail, square), (int, fail)):
+            with self.assertRaisesRegex(ValueError, "stage failed"):
+                run_pipeline(range(1000), read, render, [].append)
+        written = []
+        with self.assertRaisesRegex(ValueError, "stage failed"):
+            run_pipeline(range(1000), int, int, lambda value: written.append(fail(value)))
+        self.assertEqual(written, [0, 1, 2, 3, 4])
+
+if __name__ == "__main__":
+    unittest.main()
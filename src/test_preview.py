@@ -0,0 +1,143 @@
+import os
+import json
+import asyncio
+import tempfile
+import unittest
+
+from preview import EVENTS_PATH, METRICS_PATH, PreviewServer, output_url, reload_events
+from session import BuildConfig, BuildSession
+
+class TestReloadEvents(unittest.TestCase):
+    def test_output_url(self):
+        self.assertEqual(output_url("/site", "/site/index.html"), "/")
+        self.assertEqual(output_url("/site", "/site/blog/index.html"), "/blog/")
+        self.assertEqual(output_url("/site", "/site/blog/post.html"), "/blog/post.html")
+        self.assertEqual(output_url("/site", "/site/index.css"), "/index.css")
+
+    def test_css_only_change_swaps_stylesheets(self):
+        self.assertEqual(reload_events("/site", ["/site/index.css"]), [("css", {"urls": ["/index.css"]})])
+
+    def test_page_change_reloads_only_that_page(self):
+        events = reload_events("/site", ["/site/blog/index.html", "/site/index.css"])
+        self.assertEqual(events, [("reload", {"urls": ["/blog/"]}), ("css", {"urls": ["/index.css"]})])
+
+    def test_nothing_changed(self):
+        self.assertEqual(reload_events("/site", []), [])
+
+class TestPreviewServer(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.write("content/index.md", "# Home\n\nHello")
+        self.write("content/blog/index.md", "# Blog\n\nPosts")
+        self.write("static/index.css", "body {}")
+        self.write("template.html", "<title>{{ Title }}</title><body>{{ Content }}</body>")
+        self.session = BuildSession(BuildConfig.from_root(self.root, cache_dir=None))
+        self.session.build()
+
+        self.preview = PreviewServer(self.session)
+        self.server = await asyncio.start_server(self.preview._handle, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.subscribers = []
+
+    async def asyncTearDown(self):
+        # Let the event streams end before the loop goes away
+        for writer in self.subscribers:
+            writer.close()
+        await self.wait_for_clients(0)
+        self.server.close()
+        await self.server.wait_closed()
+        self.session.close()
+        self.tmp.cleanup()
+
+    def write(self, rel_path, content):
+        path = os.path.join(self.root, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(content)
+        # Make sure the change is visible even on coarse mtime clocks
+        st = os.stat(path)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        return path
+
+    async def get(self, path):
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+        response = await reader.read()
+        writer.close()
+        head, _, body = response.partition(b"\r\n\r\n")
+        return head.decode(), body
+
+    async def subscribe(self):
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        writer.write(f"GET {EVENTS_PATH} HTTP/1.1\r\n\r\n".encode())
+        await reader.readuntil(b"retry: 1000\n\n")
+        self.subscribers.append(writer)
+        return reader
+
+    async def wait_for_clients(self, count):
+        for _ in range(100):
+            if len(self.preview.hub.clients) == count:
+                return
+            await asyncio.sleep(0.01)
+        self.fail(f"expected {count} clients, got {len(self.preview.hub.clients)}")
+
+    async def test_html_pages_get_the_client_script(self):
+        head, body = await self.get("/blog/")
+        self.assertIn("200 OK", head)
+        self.assertIn(EVENTS_PATH.encode(), body)
+        self.assertTrue(body.endswith(b"</script>\n</body>"))
+
+    async def test_directory_without_slash_redirects(self):
+        head, _ = await self.get("/blog")
+        self.assertIn("301", head)
+        self.assertIn("Location: /blog/", head)
+
+    async def test_paths_outside_the_site_are_not_served(self):
+        head, _ = await self.get("/../template.html")
+        self.assertIn("404", head)
+
+    async def test_metrics_update_live(self):
+        head, body = await self.get(METRICS_PATH)
+        self.assertIn("Content-Type: text/plain", head)
+        self.assertIn('ssg_builds_total{kind="build"} 1\n', body.decode())
+        self.write("content/blog/index.md", "# Blog\n\nNew post")
+        await self.preview.check()
+        _, body = await self.get(METRICS_PATH + "?format=json")
+        counters = {(item["name"], tuple(item["labels"].values())): item["value"]
+                    for item in json.loads(body)["counters"]}
+        self.assertEqual(counters["builds", ("rebuild",)], 1)
+        self.assertEqual(counters["pages_rendered", ()], 3)
+
+    async def test_page_edit_reloads_only_that_page(self):
+        events = await self.subscribe()
+        await self.wait_for_clients(1)
+        self.write("content/blog/index.md", "# Blog\n\nNew post")
+        self.assertEqual(await self.preview.check(), [("reload", {"urls": ["/blog/"]})])
+        message = await events.readuntil(b"\n\n")
+        self.assertEqual(message, b'event: reload\ndata: {"urls": ["/blog/"]}\n\n')
+
+    async def test_css_edit_swaps_stylesheet(self):
+        self.write("static/index.css", "body { color: red; }")
+        self.assertEqual(await self.preview.check(), [("css", {"urls": ["/index.css"]})])
+
+    async def test_broadcast_reaches_every_tab(self):
+        streams = [await self.subscribe() for _ in range(50)]
+        await self.wait_for_clients(50)
+        self.assertEqual(self.preview.hub.broadcast("css", {"urls": ["/index.css"]}), 50)
+        for stream in streams:
+            self.assertTrue((await stream.readuntil(b"\n\n")).startswith(b"event: css"))
+
+    async def test_closed_tabs_are_dropped(self):
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        writer.write(f"GET {EVENTS_PATH} HTTP/1.1\r\n\r\n".encode())
+        await self.wait_for_clients(1)
+        writer.close()
+        await self.wait_for_clients(0)
+
+    async def test_no_change_sends_nothing(self):
+        self.assertEqual(await self.preview.check(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import os
+import json
+import tempfile
+import unittest
+
+from htmlnode import LeafNode, ParentNode
+from markdown_parser import markdown_to_htmlnode
+from renderers import HtmlRenderer, JsonRenderer, OutputTarget, Renderer, TextRenderer, render_tree
+
+MARKDOWN = """# Title
+
+Some **bold** text with a [link](/about) and ![a cat](/cat.png)
+
+- one
+- two
+
+```python
+x = 1 < 2
+```
+"""
+
+class CountingRenderer(Renderer):
+    def __init__(self):
+        self.calls = 0
+
+    def enter(self, node):
+        self.calls += 1
+
+    def leaf(self, node):
+        self.calls += 1
+
+    def result(self):
+        return self.calls
+
+class TestRenderTree(unittest.TestCase):
+    def test_html_matches_to_html(self):
+        node = markdown_to_htmlnode(MARKDOWN)
+        self.assertEqual(render_tree(node, [HtmlRenderer()]), [node.to_html()])
+
+    def test_one_walk_drives_every_renderer(self):
+        node = ParentNode("div", [ParentNode("p", [LeafNode(None, "a"), LeafNode("b", "c")])])
+        first, second = render_tree(node, [CountingRenderer(), CountingRenderer()])
+        self.assertEqual((first, second), (4, 4))
+
+    def test_text(self):
+        [text] = render_tree(markdown_to_htmlnode(MARKDOWN), [TextRenderer()])
+        self.assertEqual(
+            text,
+            "Title\n\nSome bold text with a link and a cat\n\n- one\n- two\n\nx = 1 < 2",
+        )
+
+    def test_json(self):
+        [tree] = render_tree(markdown_to_htmlnode(MARKDOWN), [JsonRenderer()])
+        self.assertEqual(tree["tag"], "div")
+        self.assertEqual(tree["children"][0], {"tag": "h1", "props": {"id": "title"}, "children": [{"tag": None, "text": "Title"}]})
+        link = tree["children"][1]["children"][3]
+        self.assertEqual(link, {"tag": "a", "props": {"href": "/about"}, "text": "link"})
+        code = tree["children"][3]["children"][0]
+        self.assertEqual(code["text"], "x = 1 < 2\n")
+
+    def test_json_fill_keeps_template_valid(self):
+        renderer = JsonRenderer()
+        [tree] = render_tree(markdown_to_htmlnode('# "Quoted"'), [renderer])
+        data = json.loads(renderer.fill(JsonRenderer.default_template, '"Quoted"', tree))
+        self.assertEqual(data["title"], '"Quoted"')
+        self.assertEqual(data["content"]["children"][0]["tag"], "h1")
+
+class TestOutputTarget(unittest.TestCase):
+    def test_unknown_target(self):
+        with self.assertRaises(ValueError):
+            OutputTarget("pdf", "out")
+
+    def test_output_path(self):
+        target = OutputTarget("json", "/site/api")
+        self.assertEqual(target.output_path(os.path.join("blog", "index.md")), "/site/api/blog/index.json")
+
+    def test_from_root_uses_template_if_present(self):
+        with tempfile.TemporaryDirectory() as root:
+            self.assertIsNone(OutputTarget.from_root(root, "text").template_path)
+            with open(os.path.join(root, "template.txt"), "w") as f:
+                f.write("== {{ Title }} ==\n{{ Content }}")
+            target = OutputTarget.from_root(root, "text")
+            self.assertEqual(target.output_dir, os.path.join(root, "docs", "text"))
+            self.assertEqual(target.template(), "== {{ Title }} ==\n{{ Content }}")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,362 @@
+import os
+import json
+import shutil
+import datetime
+import hashlib
+import tempfile
+import unittest
+
+from renderers import OutputTarget
+from session import BuildConfig, BuildSession
+
+TEMPLATE = "<html><title>{{ Title }}</title><link href=\"{{ css_path }}\">{{ Content }}</html>"
+
+class TestBuildSession(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.write("content/index.md", "# Home\n\nWelcome [blog](/blog/post)")
+        self.write("content/blog/post/index.md", "# Post\n\n```python\nx = 1\n```")
+        self.write("static/index.css", "body { color: red; }\n")
+        self.write("template.html", TEMPLATE)
+        self.config = BuildConfig.from_root(self.root, base_path="/site/")
+        self.session = BuildSession(self.config)
+
+    def tearDown(self):
+        self.session.close()
+        self.tmp.cleanup()
+
+    def write(self, rel_path, content):
+        path = os.path.join(self.root, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    def read(self, rel_path):
+        with open(os.path.join(self.root, rel_path)) as f:
+            return f.read()
+
+    def bump_mtime(self, rel_path):
+        path = os.path.join(self.root, rel_path)
+        st = os.stat(path)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+    def test_build_renders_site(self):
+        result = self.session.build()
+        self.assertEqual((result.pages_rendered, result.pages_total), (2, 2))
+        self.assertIn('<a href="/site/blog/post">blog</a>', self.read("docs/index.html"))
+        self.assertIn("<title>Post</title>", self.read("docs/blog/post/index.html"))
+        self.assertTrue(os.path.exists(os.path.join(self.root, "docs", "index.css")))
+        self.assertTrue(os.path.exists(self.config.manifest_path))
+        self.assertIn('"url": "/site/blog/post/#post"', self.read("docs/heading-index.json"))
+
+    def test_page_index(self):
+        self.session.build()
+        index = {page.url: page.title for page in self.session.pages.values()}
+        self.assertEqual(index, {"/": "Home", "/blog/post/": "Post"})
+
+    def test_warm_rebuild_skips_unchanged_pages(self):
+        self.session.build()
+        result = self.session.build()
+        self.assertEqual(result.pages_rendered, 0)
+        self.assertEqual(result.writer.written, 0)
+        self.assertEqual(result.writer.deleted, 0)
+
+    def test_warm_rebuild_renders_changed_page(self):
+        self.session.build()
+        self.write("content/index.md", "# Home again")
+        self.bump_mtime("content/index.md")
+        result = self.session.build()
+        self.assertEqual(result.pages_rendered, 1)
+        self.assertIn("<title>Home again</title>", self.read("docs/index.html"))
+
+    def test_template_change_renders_all_pages(self):
+        self.session.build()
+        self.write("template.html", "<main>" + TEMPLATE + "</main>")
+        self.bump_mtime("template.html")
+        result = self.session.build()
+        self.assertEqual(result.pages_rendered, 2)
+        self.assertTrue(self.read("docs/index.html").startswith("<main>"))
+
+    def test_externally_modified_output_is_rendered_again(self):
+        self.session.build()
+        self.write("docs/index.html", "tampered")
+        result = self.session.build()
+        # The page's inputs did not change, so the build cache has it
+        self.assertEqual((result.pages_rendered, result.pages_cached), (0, 1))
+        self.assertIn("<title>Home</title>", self.read("docs/index.html"))
+
+    def test_targets_share_the_page_build(self):
+        self.write("template.txt", "{{ Title }}: {{ Content }}")
+        self.config.targets = [OutputTarget.from_root(self.root, "json"), OutputTarget.from_root(self.root, "text")]
+        result = self.session.build()
+        self.assertEqual(result.pages_rendered, 2)
+        self.assertEqual(self.read("docs/text/blog/post/index.txt"), "Post: Post\n\nx = 1")
+        self.assertIn('"title": "Home"', self.read("docs/json/index.json"))
+
+        self.assertEqual(self.session.build().pages_rendered, 0)
+        self.write("template.txt", "{{ Content }}")
+        self.bump_mtime("template.txt")
+        self.assertEqual(self.session.build().pages_rendered, 2)
+        self.assertEqual(self.read("docs/text/index.txt"), "Home\n\nWelcome blog")
+
+    def test_render_markdown(self):
+        self.assertEqual(self.session.render_markdown("Hello **there**"), "<div><p>Hello <b>there</b></p></div>")
+
+    def test_render_markdown_resolves_urls(self):
+        self.assertEqual(self.session.render_markdown("[blog](/blog/)"), '<div><p><a href="/site/blog/">blog</a></p></div>')
+        config = BuildConfig.from_root(self.root, relative_urls=True)
+        with BuildSession(config) as session:
+            html = session.render_markdown("[blog](/blog/)", "blog/post/index.html")
+        self.assertEqual(html, '<div><p><a href="../../blog/">blog</a></p></div>')
+
+    def test_workers_render_the_same_site(self):
+        for i in range(4):
+            self.write(f"content/post{i}/index.md", f"# Post {i}\n\n```python\nx = {i}\n```\n\n[home](/)")
+        outputs = {}
+        for workers in (1, 2):
+            config = BuildConfig.from_root(self.root, base_path="/site/", minify=True, cache_dir=None, workers=workers)
+            with BuildSession(config) as session:
+                result = session.build()
+                self.assertEqual(result.pages_rendered, 6)
+                counters, histograms = session.metrics.snapshot()
+                timings = histograms[("page_render_seconds", ())].count
+                outputs[workers] = (
+                    sorted((os.path.relpath(path, self.root), record) for path, record in result.writer.records.items()),
+                    {key: value for key, value in counters.items() if key[0] in ("blocks", "inline_nodes")},
+                    timings, result.minifier.bytes_in, [page.title for page in session.pages.values()],
+                )
+        self.assertEqual(outputs[2], outputs[1])
+        self.assertEqual(outputs[1][2], 6)
+
+    def test_relative_urls(self):
+        self.write("content/blog/post/index.md", "# Post\n\n[home](/) ![logo](/logo.png)")
+        outputs = {}
+        for stream in (False, True):
+            config = BuildConfig.from_root(self.root, base_path="/site/", relative_urls=True, stream=stream)
+            with BuildSession(config) as session:
+                session.build()
+            outputs[stream] = self.read("docs/index.html"), self.read("docs/blog/post/index.html")
+        self.assertEqual(outputs[True], outputs[False])
+        home, post = outputs[False]
+        self.assertIn('<a href="./blog/post">blog</a>', home)
+        self.assertIn('<link href="index.css">', home)
+        self.assertIn('<a href="../../">home</a> <img src="../../logo.png" alt="logo">', post)
+        self.assertIn('<link href="../../index.css">', post)
+
+class TestBuildCache(unittest.TestCase):
+    """The build cache as a CI run sees it: a fresh clone with the cache restored."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.tmp.name, "cache")
+        self.first = os.path.join(self.tmp.name, "first")
+        self.write(self.first, "content/index.md", "# Home\n\nWelcome, _unclosed")
+        self.write(self.first, "content/blog/post/index.md", "# Post\n\n## Part\n\nSome words here")
+        self.write(self.first, "static/index.css", "body { color: red; }\n")
+        self.write(self.first, "template.html", TEMPLATE)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, root, rel_path, content):
+        path = os.path.join(root, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(content)
+
+    def build(self, root):
+        with BuildSession(BuildConfig.from_root(root, cache_dir=self.cache_dir)) as session:
+            return session, session.build()
+
+    def clone(self):
+        second = os.path.join(self.tmp.name, "second")
+        shutil.copytree(self.first, second, ignore=shutil.ignore_patterns("docs"))
+        return second
+
+    def read_outputs(self, root):
+        outputs = {}
+        for dirpath, _, filenames in os.walk(os.path.join(root, "docs")):
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                with open(path, "rb") as f:
+                    outputs[os.path.relpath(path, root)] = f.read()
+        return outputs
+
+    def test_fresh_clone_copies_pages_from_cache(self):
+        first_session, _ = self.build(self.first)
+        second = self.clone()
+        second_session, result = self.build(second)
+        self.assertEqual((result.pages_rendered, result.pages_cached), (0, 2))
+        self.assertEqual(self.read_outputs(second), self.read_outputs(self.first))
+        for source, page in first_session.pages.items():
+            cached = second_session.pages[source.replace(self.first, second)]
+            self.assertEqual((cached.title, cached.headings), (page.title, page.headings))
+            self.assertEqual(cached.stats.to_dict(), page.stats.to_dict())
+        self.assertEqual([(item.path, item.line) for item in result.diagnostics],
+                         [(os.path.join(second, "content", "index.md"), 3)])
+
+    def test_only_changed_pages_are_rendered(self):
+        self.build(self.first)
+        second = self.clone()
+        self.write(second, "content/index.md", "# Home\n\nChanged")
+        _, result = self.build(second)
+        self.assertEqual((result.pages_rendered, result.pages_cached), (1, 1))
+
+    def test_settings_are_part_of_the_key(self):
+        self.build(self.first)
+        with BuildSession(BuildConfig.from_root(self.clone(), cache_dir=self.cache_dir, base_path="/site/")) as session:
+            self.assertEqual(session.build().pages_cached, 0)
+
+    def test_damaged_entry_is_rendered(self):
+        self.build(self.first)
+        blobs = os.path.join(self.cache_dir, "blobs")
+        for dirpath, _, filenames in os.walk(blobs):
+            for name in filenames:
+                with open(os.path.join(dirpath, name), "w") as f:
+                    f.write("damaged")
+        second = self.clone()
+        _, result = self.build(second)
+        self.assertEqual((result.pages_rendered, result.pages_cached), (2, 0))
+        self.assertEqual(self.read_outputs(second), self.read_outputs(self.first))
+
+class TestReproducibleBuild(unittest.TestCase):
+    FILES = {
+        "content/index.md": "# Home\n\nWelcome [blog](/blog/)",
+        "content/blog/index.md": "# Blog\n\n- [One](/blog/one/)",
+        "content/blog/one/index.md": "# One\n\n```python\nx = 1\n```",
+        "content/about.md": "# About\n\nText",
+        "static/index.css": "body { color: red; }\n",
+        "static/img/a.txt": "a",
+        "static/img/b.txt": "b",
+        "template.html": TEMPLATE,
+    }
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def build(self, name, order):
+        root = os.path.join(self.tmp.name, name)
+        # Creation order decides the order some filesystems list entries in
+        for rel_path in order(sorted(self.FILES)):
+            path = os.path.join(root, rel_path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write(self.FILES[rel_path])
+        config = BuildConfig.from_root(root, cache_dir=None, mtime=315532800,
+                                       targets=[OutputTarget.from_root(root, "json")])
+        with BuildSession(config) as session:
+            result = session.build()
+        self.assertEqual(list(session.pages), sorted(session.pages))
+        output_dir = os.path.join(root, "docs")
+        files = {}
+        for dirpath, dirnames, filenames in os.walk(output_dir):
+            for name in dirnames + filenames:
+                path = os.path.join(dirpath, name)
+                st = os.stat(path)
+                digest = None
+                if os.path.isfile(path):
+                    with open(path, "rb") as f:
+                        digest = hashlib.sha256(f.read()).hexdigest()
+                files[os.path.relpath(path, output_dir)] = (digest, st.st_mtime_ns, st.st_mode)
+        changed = [os.path.relpath(path, output_dir) for path in result.writer.changed]
+        return files, changed
+
+    def test_builds_are_identical(self):
+        first = self.build("first", list)
+        second = self.build("second", reversed)
+        self.assertEqual(first, second)
+        self.assertEqual(len(first[0]), 20)
+        self.assertEqual({mtime for _, mtime, _ in first[0].values()}, {315532800 * 10**9})
+
+class TestPartialBuild(unittest.TestCase):
+    TODAY = datetime.date(2024, 5, 1)
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.write("content/index.md", "# Home\n\n[Post](/blog/post/)")
+        self.write("content/blog/post/index.md", "---\ndate: 2024-04-30\n---\n# Post\n\nWords")
+        self.write("content/blog/draft/index.md", "---\ndraft: true\n---\n# Draft")
+        self.write("content/blog/later/index.md", "---\ndate: 2024-05-02\n---\n# Later")
+        self.write("static/index.css", "body { color: red; }\n")
+        self.write("template.html", TEMPLATE)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, rel_path, content):
+        path = os.path.join(self.root, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(content)
+
+    def exists(self, rel_path):
+        return os.path.exists(os.path.join(self.root, rel_path))
+
+    def listed(self):
+        with open(os.path.join(self.root, "docs", "page-index.json")) as f:
+            return {entry["url"]: entry.get("date") for entry in json.load(f)["pages"]}
+
+    def build(self, **options):
+        with BuildSession(BuildConfig.from_root(self.root, today=self.TODAY, **options)) as session:
+            return session.build()
+
+    def test_drafts_and_scheduled_pages_are_skipped(self):
+        result = self.build()
+        self.assertEqual(result.pages_total, 2)
+        self.assertFalse(self.exists("docs/blog/draft/index.html"))
+        self.assertFalse(self.exists("docs/blog/later/index.html"))
+        self.assertEqual(self.listed(), {"/": None, "/blog/post/": "2024-04-30"})
+        # Front matter is not content
+        with open(os.path.join(self.root, "docs", "blog", "post", "index.html")) as f:
+            self.assertNotIn("date:", f.read())
+
+    def test_drafts_and_future_options(self):
+        result = self.build(drafts=True, future=True)
+        self.assertEqual(result.pages_total, 4)
+        self.assertTrue(self.exists("docs/blog/draft/index.html"))
+        self.assertTrue(self.exists("docs/blog/later/index.html"))
+
+    def test_page_turned_draft_is_removed(self):
+        with BuildSession(BuildConfig.from_root(self.root, today=self.TODAY)) as session:
+            session.build()
+            self.write("content/index.md", "---\ndraft: yes\n---\n# Home")
+            result = session.rebuild([os.path.join(self.root, "content", "index.md")])
+        self.assertEqual(result.pages_rendered, 0)
+        self.assertFalse(self.exists("docs/index.html"))
+
+    def test_section_build_keeps_the_rest_of_the_site(self):
+        self.build()
+        self.write("docs/stray.html", "left alone")
+        self.write("content/blog/post/index.md", "---\ndate: 2024-04-30\n---\n# Post, edited")
+        result = self.build(include=["blog/*"])
+        self.assertEqual((result.pages_rendered, result.pages_total), (1, 1))
+        self.assertEqual([os.path.relpath(path, self.root) for path in result.writer.changed if path.endswith(".html")],
+                         [os.path.join("docs", "blog", "post", "index.html")])
+        # Listed from the saved index, with outputs kept rather than pruned
+        self.assertEqual(self.listed(), {"/": None, "/blog/post/": "2024-04-30"})
+        self.assertTrue(self.exists("docs/index.html"))
+        self.assertTrue(self.exists("docs/stray.html"))
+        with open(os.path.join(self.root, "docs", "build-manifest.json")) as f:
+            self.assertIn("index.html", json.load(f)["files"])
+
+    def test_section_build_before_any_full_build(self):
+        with self.assertLogs(level="WARNING"):
+            result = self.build(include=["blog/*"])
+        self.assertEqual(result.pages_total, 1)
+        self.assertEqual(self.listed(), {"/blog/post/": "2024-04-30"})
+
+    def test_rebuild_ignores_pages_outside_the_build(self):
+        with BuildSession(BuildConfig.from_root(self.root, today=self.TODAY, include=["blog/*"])) as session:
+            session.build()
+            result = session.rebuild([os.path.join(self.root, "content", "index.md")])
+        self.assertEqual(result.pages_rendered, 0)
+        self.assertFalse(self.exists("docs/index.html"))
+
+if __name__ == "__main__":
+    unittest.main()
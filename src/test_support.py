@@ -0,0 +1,49 @@
+import gc
+import time
+
+# Smallest CPU time a measurement may take: several scheduler ticks and
+# far above the clock's resolution
+MIN_SECONDS = 0.02
+
+def cpu_time(function, size):
+    """
+    Return the CPU time this process spends on function(size), with the
+    garbage collector paused so its runs do not land in one measurement.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start = time.process_time()
+        function(size)
+        return time.process_time() - start
+    finally:
+        if enabled:
+            gc.enable()
+
+def assert_linear(testcase, function, size, factor=8, repeats=3):
+    """
+    Check that function(n) takes time linear in n, not quadratic.
+
+    CPU time is measured rather than wall time, so waiting for the CPU on a
+    busy machine does not count, and size is doubled until one call takes
+    MIN_SECONDS. The larger input may then take up to 3x its share of the
+    time: 24x for 8x the input, where quadratic work would be 64x.
+
+    Args:
+        testcase (unittest.TestCase): Reports the failure
+        function (callable): Does the work for an input of the given size
+        size (int): The smallest input size to try
+        factor (int): How much larger the second input is
+        repeats (int): Measurements to take the fastest of
+    """
+    while cpu_time(function, size) < MIN_SECONDS:
+        size *= 2
+    small = min(cpu_time(function, size) for _ in range(repeats))
+    bound = small * factor * 3
+    # The larger input is measured again only if it looks too slow
+    large = cpu_time(function, size * factor)
+    for _ in range(repeats - 1):
+        if large < bound:
+            break
+        large = min(large, cpu_time(function, size * factor))
+    testcase.assertLess(large, bound, f"{size * factor} took {large:.3f}s, {size} took {small:.3f}s")
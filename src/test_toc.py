@@ -0,0 +1,51 @@
+import unittest
+
+from markdown_parser import markdown_to_htmlnode
+from session import PageInfo
+from toc import TableOfContents, build_heading_index, slugify
+
+class TestSlugify(unittest.TestCase):
+    def test_slugify(self):
+        self.assertEqual(slugify("Hello, World!"), "hello-world")
+        self.assertEqual(slugify("  Why `code` & C++?  "), "why-code--c")
+        self.assertEqual(slugify("Déjà vu"), "déjà-vu")
+        self.assertEqual(slugify("???"), "section")
+
+class TestTableOfContents(unittest.TestCase):
+    def test_repeated_headings_get_unique_ids(self):
+        toc = TableOfContents()
+        ids = [toc.add(2, text) for text in ("Notes", "Notes", "Notes-1", "Notes")]
+        self.assertEqual(ids, ["notes", "notes-1", "notes-1-1", "notes-2"])
+
+    def test_nested_html(self):
+        toc = TableOfContents()
+        for level, text in ((1, "Title"), (2, "A"), (3, "A.1"), (2, "B <b>")):
+            toc.add(level, text)
+        self.assertEqual(
+            toc.to_html(),
+            '<ul class="toc"><li><a href="#title">Title</a><ul>'
+            '<li><a href="#a">A</a><ul><li><a href="#a1">A.1</a></li></ul></li>'
+            '<li><a href="#b-b">B &lt;b&gt;</a></li>'
+            '</ul></li></ul>',
+        )
+
+    def test_empty(self):
+        self.assertEqual(TableOfContents().to_html(), "")
+
+    def test_collected_while_rendering(self):
+        toc = TableOfContents()
+        html = markdown_to_htmlnode("# Intro\n\ntext\n\n## The **bold** part\n\n## Intro", toc=toc).to_html()
+        self.assertEqual(toc.entries, [(1, "Intro", "intro"), (2, "The bold part", "the-bold-part"), (2, "Intro", "intro-1")])
+        self.assertIn('<h2 id="the-bold-part">The <b>bold</b> part</h2>', html)
+        self.assertIn('<h2 id="intro-1">Intro</h2>', html)
+
+    def test_heading_index(self):
+        page = PageInfo("post.md", "post.html", "/blog/post/", "Post")
+        page.headings = [(1, "Post", "post"), (2, "Details", "details")]
+        index = build_heading_index([page], "/site/")
+        self.assertEqual(index["pages"][0]["url"], "/site/blog/post/")
+        self.assertEqual(index["pages"][0]["headings"][1], {"level": 2, "text": "Details", "url": "/site/blog/post/#details"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+
+from htmlnode import LeafNode, ParentNode
+from urls import UrlResolver, is_site_absolute
+
+class TestUrlResolver(unittest.TestCase):
+    def test_is_site_absolute(self):
+        self.assertTrue(is_site_absolute("/blog/"))
+        for url in ("//cdn.example/a.js", "https://example.com/", "about/", "#top", ""):
+            with self.subTest(url=url):
+                self.assertFalse(is_site_absolute(url))
+
+    def test_base_path(self):
+        urls = UrlResolver("/site/", "https://cdn.example/").for_page("blog/post/index.html")
+        self.assertEqual(urls.href("/about/"), "/site/about/")
+        self.assertEqual(urls.src("/a.png"), "https://cdn.example/a.png")
+        self.assertEqual(urls.href("//other.example/"), "//other.example/")
+        self.assertEqual(urls.href("about/"), "about/")
+        self.assertEqual(urls.css_path, "../../index.css")
+
+    def test_relative(self):
+        resolver = UrlResolver("/site/", relative=True)
+        self.assertEqual(resolver.for_page("index.html").href("/about/"), "./about/")
+        self.assertEqual(resolver.for_page("index.html").css_path, "index.css")
+        urls = resolver.for_page("blog/post/index.html")
+        self.assertEqual(urls.href("/"), "../../")
+        self.assertEqual(urls.src("/a.png"), "../../a.png")
+
+    def test_pages_of_a_directory_share_urls(self):
+        resolver = UrlResolver()
+        self.assertIs(resolver.for_page("blog/a.html"), resolver.for_page("blog/b.html"))
+        self.assertIsNot(resolver.for_page("blog/a.html"), resolver.for_page("a.html"))
+
+    def test_resolve_tree(self):
+        node = ParentNode("p", [LeafNode("a", "x", {"href": "/a"}), LeafNode("img", "", {"src": "//cdn/b.png"})], {"title": "/t"})
+        UrlResolver("/site/").for_page("index.html").resolve_tree(node)
+        self.assertEqual(node.to_html(), '<p title="/t"><a href="/site/a">x</a><img src="//cdn/b.png"></img></p>')
+
+    def test_template(self):
+        urls = UrlResolver("/site/").for_page("index.html")
+        template = '<a href="/">home</a><script src="//cdn.example/a.js"></script><img src="/logo.png">'
+        rewritten = urls.template(template)
+        self.assertEqual(rewritten, '<a href="/site/">home</a><script src="//cdn.example/a.js"></script><img src="/site/logo.png">')
+        self.assertIs(urls.template(template), rewritten)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,6 @@
 from enum import Enum
-from htmlnode import LeafNode
+from htmlnode import LeafNode, ParentNode
+from toc import slugify
 
 class TextType(Enum):
     TEXT = "text"
@@ -8,13 +9,18 @@ class TextType(Enum):
     CODE = "code"
     LINK = "link"
     IMAGE = "image"
+    # An HTMLNode rendered by an inline extension, kept in TextNode.node
+    HTML = "html"
+    # A [^label] footnote reference, the label in TextNode.text
+    FOOTNOTE = "footnote"
 
 
 class TextNode:
-    def __init__(self, text, text_type=TextType.TEXT, url=None):
+    def __init__(self, text, text_type=TextType.TEXT, url=None, node=None):
         self.text = text
         self.text_type = text_type
         self.url = url
+        self.node = node
     
     def __eq__(self, other):
         return (
@@ -26,19 +32,24 @@ class TextNode:
     def __repr__(self):
         return f"TextNode({self.text}, {self.text_type}, {self.url})"
 
-def text_node_to_html_node(text_node):
+def text_node_to_html_node(text_node, stats=None, urls=None):
     """
     Convert a TextNode to an HTMLNode.
     
     Args:
         text_node (TextNode): The text node to convert
+        stats (PageStats): If given, counts the node's text
+        urls (PageUrls): If given, resolves site-absolute link and image
+            URLs for the page being rendered
         
     Returns:
-        LeafNode: The converted HTML node
+        HTMLNode: The converted HTML node
         
     Raises:
         ValueError: If the text_node has an invalid text type
     """
+    if stats is not None and text_node.text_type not in (TextType.IMAGE, TextType.HTML, TextType.FOOTNOTE):
+        stats.add_text(text_node.text)
     if text_node.text_type == TextType.TEXT:
         return LeafNode(None, text_node.text, {})
     elif text_node.text_type == TextType.BOLD:
@@ -48,8 +59,18 @@ def text_node_to_html_node(text_node):
     elif text_node.text_type == TextType.CODE:
         return LeafNode("code", text_node.text, {})
     elif text_node.text_type == TextType.LINK:
-        return LeafNode("a", text_node.text, {"href": text_node.url})
+        url = text_node.url if urls is None else urls.href(text_node.url)
+        return LeafNode("a", text_node.text, {"href": url})
     elif text_node.text_type == TextType.IMAGE:
-        return LeafNode("img", "", {"src": text_node.url, "alt": text_node.text})
+        url = text_node.url if urls is None else urls.src(text_node.url)
+        return LeafNode("img", "", {"src": url, "alt": text_node.text})
+    elif text_node.text_type == TextType.HTML:
+        if urls is not None:
+            urls.resolve_tree(text_node.node)
+        return text_node.node
+    elif text_node.text_type == TextType.FOOTNOTE:
+        # Unnumbered outside a page, see Footnotes.reference()
+        link = LeafNode("a", text_node.text, {"href": f"#fn-{slugify(text_node.text)}"})
+        return ParentNode("sup", [link], {"class": "footnote-ref"})
     else:
         raise ValueError(f"Invalid text type: {text_node.text_type}")
\ No newline at end of file
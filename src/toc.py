@@ -0,0 +1,119 @@
+import re
+import json
+
+from htmlnode import LeafNode, ParentNode
+
+HEADING_INDEX_NAME = "heading-index.json"
+
+_NON_SLUG = re.compile(r"[^\w\- ]")
+
+def slugify(text):
+    """
+    Turn heading text into an id the way GitHub does: lowercase, drop
+    punctuation, spaces become hyphens.
+
+    Args:
+        text (str): The heading's plain text
+
+    Returns:
+        str: The slug, or "section" if nothing is left of the text
+    """
+    slug = _NON_SLUG.sub("", text.strip().lower()).replace(" ", "-")
+    return slug or "section"
+
+class TableOfContents:
+    """
+    The headings of one page, collected while the page is rendered.
+
+    Ids depend only on the heading text and, for repeated headings, on
+    their order, so links to a heading survive edits elsewhere in the page.
+    """
+
+    def __init__(self):
+        self.entries = []
+        self._used = {}
+
+    def add(self, level, text):
+        """
+        Record a heading and return its unique id.
+
+        Args:
+            level (int): 1 for h1 through 6 for h6
+            text (str): The heading's plain text
+
+        Returns:
+            str: The id, with -1, -2, ... appended to repeated slugs
+        """
+        slug = slugify(text)
+        count = self._used.get(slug)
+        if count is None:
+            self._used[slug] = 0
+        else:
+            count += 1
+            while f"{slug}-{count}" in self._used:
+                count += 1
+            self._used[slug] = count
+            slug = f"{slug}-{count}"
+            self._used[slug] = 0
+        self.entries.append((level, text, slug))
+        return slug
+
+    def to_htmlnode(self):
+        """
+        Return the table of contents as nested lists, one level per heading
+        level, or None if the page has no headings.
+        """
+        if not self.entries:
+            return None
+        root = []
+        stack = [(0, root)]
+        for level, text, slug in self.entries:
+            while stack[-1][0] >= level:
+                stack.pop()
+            children = []
+            stack[-1][1].append((text, slug, children))
+            stack.append((level, children))
+        return _toc_list(root, {"class": "toc"})
+
+    def to_html(self):
+        """Return the table of contents as HTML, empty without headings."""
+        node = self.to_htmlnode()
+        return node.to_html() if node is not None else ""
+
+def _toc_list(items, props=None):
+    entries = []
+    for text, slug, children in items:
+        item = [LeafNode("a", text, {"href": f"#{slug}"})]
+        if children:
+            item.append(_toc_list(children))
+        entries.append(ParentNode("li", item))
+    return ParentNode("ul", entries, props)
+
+def build_heading_index(pages, base_path="/"):
+    """
+    Build a site-wide index of headings for deep-link search.
+
+    Args:
+        pages (iterable[PageInfo]): Rendered pages with their headings
+        base_path (str): Base path for URLs (default: "/")
+
+    Returns:
+        dict: A "pages" list of url, title and headings, each heading with
+            its level, text and deep-link url
+    """
+    index = []
+    for page in sorted(pages, key=lambda page: page.url):
+        url = base_path + page.url[1:]
+        index.append({
+            "url": url,
+            "title": page.title,
+            "headings": [
+                {"level": level, "text": text, "url": f"{url}#{slug}"}
+                for level, text, slug in page.headings
+            ],
+        })
+    return {"pages": index}
+
+def heading_index_to_json(index):
+    """Serialize a heading index to stable JSON."""
+    return json.dumps(index, indent=2, sort_keys=True, ensure_ascii=False) + "\n"
@@ -0,0 +1,119 @@
+import re
+import posixpath
+
+from htmlnode import ParentNode
+
+# Attributes holding URLs; href takes base_path and src asset_base_path
+URL_ATTRIBUTES = ("href", "src")
+
+_TEMPLATE_URL = re.compile(r'\b(href|src)="/(?!/)')
+
+def is_site_absolute(url):
+    """Tell whether url is a path from the site root, like "/blog/", rather than "//host/" or relative."""
+    return url.startswith("/") and not url.startswith("//")
+
+class UrlResolver:
+    """
+    Maps the site-absolute URLs written in pages and templates, like
+    "/blog/" or "/images/a.png", to the URLs in the built site.
+
+    By default they get base_path in place of the leading "/". With
+    relative=True they become relative to each page instead, so one build
+    works under any base path or straight from disk.
+
+    One resolver serves a whole site. Each output directory's prefixes, and
+    the template with its URLs rewritten, are worked out the first time a
+    page there asks for them, so pages only pay for their own links.
+
+    Example:
+        urls = UrlResolver(relative=True).for_page("blog/post/index.html")
+        urls.href("/about/")  # "../../about/"
+
+    Args:
+        base_path (str): Replaces the leading "/" of href URLs (default: "/")
+        asset_base_path (str): Replaces the leading "/" of src URLs
+            (default: base_path)
+        relative (bool): Make URLs relative to each page instead
+    """
+
+    def __init__(self, base_path="/", asset_base_path=None, relative=False):
+        self.base_path = base_path
+        self.asset_base_path = asset_base_path or base_path
+        self.relative = relative
+        self._directories = {}
+
+    def for_page(self, rel_path):
+        """
+        Return the URLs of one page.
+
+        Args:
+            rel_path (str): The page's output path relative to the site's
+                root, with "/" separators, e.g. "blog/post/index.html"
+
+        Returns:
+            PageUrls: Shared by every page in the same directory
+        """
+        directory = posixpath.dirname(rel_path)
+        urls = self._directories.get(directory)
+        if urls is None:
+            urls = self._directories[directory] = PageUrls(self, directory)
+        return urls
+
+class PageUrls:
+    """The URLs of the pages of one output directory, see UrlResolver.for_page()."""
+
+    def __init__(self, resolver, directory):
+        depth = directory.count("/") + 1 if directory else 0
+        up = "../" * depth
+        if resolver.relative:
+            self.prefixes = {"href": up or "./", "src": up or "./"}
+        else:
+            self.prefixes = {"href": resolver.base_path, "src": resolver.asset_base_path}
+        # The stylesheet at the site's root, relative so any base path works
+        self.css_path = up + "index.css"
+        self._templates = {}
+
+    def href(self, url):
+        """Resolve a link URL."""
+        return self.prefixes["href"] + url[1:] if is_site_absolute(url) else url
+
+    def src(self, url):
+        """Resolve an image or other asset URL."""
+        return self.prefixes["src"] + url[1:] if is_site_absolute(url) else url
+
+    def resolve_props(self, props):
+        """
+        Resolve the URL attributes of a node in place.
+
+        Args:
+            props (dict): The node's attributes, or None
+        """
+        if not props:
+            return
+        for name in URL_ATTRIBUTES:
+            url = props.get(name)
+            if url is not None and is_site_absolute(url):
+                props[name] = self.prefixes[name] + url[1:]
+
+    def resolve_tree(self, node):
+        """Resolve the URL attributes of a node and everything below it, for nodes the parser did not build."""
+        self.resolve_props(node.props)
+        if isinstance(node, ParentNode) and node.children:
+            for child in node.children:
+                self.resolve_tree(child)
+
+    def template(self, template):
+        """
+        Return a template with the site-absolute URLs it contains resolved.
+
+        Args:
+            template (str): The template text
+
+        Returns:
+            str: The template, rewritten once per template and directory
+        """
+        rewritten = self._templates.get(template)
+        if rewritten is None:
+            rewritten = _TEMPLATE_URL.sub(lambda match: f'{match[1]}="{self.prefixes[match[1]]}', template)
+            self._templates[template] = rewritten
+        return rewritten